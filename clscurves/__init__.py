@@ -1,4 +1,5 @@
 # flake8: noqa
 from .generator import MetricsGenerator  # noqa: F401
+from .multilabel import MultilabelMetricsGenerator  # noqa: F401
 
 __version__ = "0.0.0"  # placeholder
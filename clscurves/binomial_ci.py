@@ -1,4 +1,5 @@
-from typing import Iterable, Literal, Tuple, Union
+from collections import OrderedDict
+from typing import Iterable, Literal, Optional, Tuple, Union
 
 import numpy as np
 import pandas as pd
@@ -11,6 +12,7 @@ CIResult = Union[
     Tuple[float, float, float],
     Tuple[np.ndarray, np.ndarray, np.ndarray],
 ]
+CIBuffer = Tuple[np.ndarray, np.ndarray, np.ndarray]
 
 
 class BinomialCI:
@@ -44,13 +46,44 @@ class BinomialCI:
         x   n  avg     lower     upper
     0   1  10  0.1  0.002529  0.445016
     1  10  50  0.2  0.100302  0.337183
+
+    For large arrays of counts (e.g. one per threshold of every curve), the
+    closed-form "wilson" and "agresti_coull" methods are much faster than
+    "beta", and validation can be skipped and the results written into
+    preallocated buffers:
+    >>> out = (np.empty(len(x)), np.empty(len(x)), np.empty(len(x)))
+    >>> ci.get_ci(x, n, method="wilson", validate=False, out=out)
+
+    When the same small counts recur across many calls (e.g. per-bucket
+    calibration counts on every refresh of a dashboard), the exact ("beta")
+    bounds can be memoized in a lookup table:
+    >>> ci = BinomialCI(table_max_n=1000)
+    >>> ci.get_ci(x, n)  # Evaluates and stores the bounds of new (x, n) pairs
+    >>> ci.get_ci(x, n)  # Gathers all bounds from the table
+
+    Parameters
+    ----------
+    table_max_n
+        Largest number of trials `n` for which exact ("beta") bounds are
+        memoized, or 0 to disable memoization. Each confidence level gets a
+        table of ``3 * (table_max_n + 1) ** 2`` values, which is filled in
+        lazily as new integer (x, n) pairs are seen.
+    max_tables
+        Maximum number of confidence levels to keep tables for, evicting the
+        least recently used table beyond that.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, table_max_n: int = 0, max_tables: int = 4) -> None:
+        self.table_max_n = table_max_n
+        self.max_tables = max_tables
+        self._tables: "OrderedDict[float, np.ndarray]" = OrderedDict()
         self.ci_methods = {
             "normal": self._get_ci_normal,
             "beta": self._get_ci_beta,
             "exact": self._get_ci_beta,
+            "wilson": self._get_ci_wilson,
+            "jeffreys": self._get_ci_jeffreys,
+            "agresti_coull": self._get_ci_agresti_coull,
         }
 
     def get_ci(
@@ -59,6 +92,8 @@ class BinomialCI:
         n: Count,
         conf: float = 0.95,
         method: str = "beta",
+        validate: bool = True,
+        out: Optional[CIBuffer] = None,
     ) -> CIResult:
         """
         Compute a confidence interval for a binomial distribution (sequence of
@@ -77,27 +112,46 @@ class BinomialCI:
             Confidence level between 0 and 1.
         method
             Method to use for computing the confidence interval. Options are:
-            "normal", "beta" (= "exact").
+            "normal", "beta" (= "exact"), "wilson", "jeffreys", and
+            "agresti_coull". "wilson" and "agresti_coull" are closed-form, so
+            they are the cheapest per element.
+        validate
+            Whether to check the types and values of `x` and `n`. Pass False
+            to skip these checks (and the coercion of Series to ints) for
+            inputs which are known to be valid.
+        out
+            Tuple of three float arrays, the same length as `x` and `n`, into
+            which to write the average, lower bound, and upper bound (which
+            are then returned).
         """
-        self._validate_x_and_n(x, n)
-        x, n = self._coerce_x_and_n_dtypes(x, n)
+        if method not in self.ci_methods:
+            raise NotImplementedError("Method '%s' is not available." % method)
+        if validate:
+            self._validate_x_and_n(x, n)
+            x, n = self._coerce_x_and_n_dtypes(x, n)
         alpha = self._get_alpha(conf)
-        if method in self.ci_methods:
+        if out is None:
             return self.ci_methods[method](x, n, alpha)
-        else:
-            raise NotImplementedError("Method '%s' is not available." % method)
+
+        # Write into the buffers, reusing them for intermediate results where
+        # the closed-form methods allow it
+        x, n = np.asarray(x), np.asarray(n)
+        result = self.ci_methods[method](x, n, alpha, out)
+        for buffer, values in zip(out, result):
+            if buffer is not values:
+                np.copyto(buffer, values)  # type: ignore
+        return out
 
     @staticmethod
     def _validate_x_and_n(x: Count, n: Count) -> None:
         assert type(x) in typing_extensions.get_args(Count), type(x)
         assert type(n) in typing_extensions.get_args(Count), type(n)
-        _x = np.array([x]) if type(x) in [int, np.int64] else x
-        _n = np.array([n]) if type(n) in [int, np.int64] else n
-        _x = np.array(x.astype(int)) if type(x) == pd.Series else _x
-        _n = np.array(n.astype(int)) if type(n) == pd.Series else _n
-        assert (_x <= _n).all(), "`x` must be less than or equal to `n`"  # type: ignore
-        assert (_x >= 0).all(), "`x` must be greater than or equal to 0"  # type: ignore
-        assert (_n >= 0).all(), "`n` must be greater than or equal to 0"  # type: ignore
+
+        # View (rather than copy) the values to compare them
+        _x, _n = np.asarray(x), np.asarray(n)
+        assert (_x <= _n).all(), "`x` must be less than or equal to `n`"
+        assert (_x >= 0).all(), "`x` must be greater than or equal to 0"
+        assert (_n >= 0).all(), "`n` must be greater than or equal to 0"
 
     @staticmethod
     def _coerce_x_and_n_dtypes(x: Count, n: Count) -> Tuple[Count, Count]:
@@ -118,7 +172,13 @@ class BinomialCI:
         assert conf > 0 and conf < 1, "`conf` must be between 0 and 1"
         return 1 - conf
 
-    def _get_ci_normal(self, x: Count, n: Count, alpha: float) -> CIResult:
+    def _get_ci_normal(
+        self,
+        x: Count,
+        n: Count,
+        alpha: float,
+        out: Optional[CIBuffer] = None,
+    ) -> CIResult:
         avg = self._get_avg(x, n)
         z = stats.norm.isf(alpha / 2)
         std = np.sqrt(avg * (1 - avg) / n)
@@ -127,18 +187,157 @@ class BinomialCI:
         upper = avg + dist
         return (avg, lower, upper)  # type: ignore
 
-    def _get_ci_beta(self, x: Count, n: Count, alpha: float) -> CIResult:
+    def _get_ci_beta(
+        self,
+        x: Count,
+        n: Count,
+        alpha: float,
+        out: Optional[CIBuffer] = None,
+    ) -> CIResult:
         avg = self._get_avg(x, n)
+        if self.table_max_n > 0:
+            return (avg, *self._lookup_ci_beta(x, n, alpha))  # type: ignore
+        return (avg, *self._compute_ci_beta(x, n, alpha))  # type: ignore
+
+    def _compute_ci_beta(
+        self,
+        x: Count,
+        n: Count,
+        alpha: float,
+    ) -> Tuple[Union[float, np.ndarray], Union[float, np.ndarray]]:
+        """Evaluate the exact (Clopper-Pearson) bounds."""
         lower = stats.beta.ppf(alpha / 2, x, n - x + 1)
         upper = stats.beta.isf(alpha / 2, x + 1, n - x)
+        return self._fix_endpoints(x, n, lower, upper)
+
+    def _lookup_ci_beta(
+        self,
+        x: Count,
+        n: Count,
+        alpha: float,
+    ) -> Tuple[Union[float, np.ndarray], Union[float, np.ndarray]]:
+        """Gather the exact bounds from the table of this confidence level,
+        first evaluating any (integer, small) pairs not yet in the table."""
+        _x = np.asarray(x, dtype=float)
+        _n = np.asarray(n, dtype=float)
+        in_table = (
+            (_n <= self.table_max_n) & (_x == np.floor(_x)) & (_n == np.floor(_n))
+        )
+        xi, ni = _x[in_table].astype(int), _n[in_table].astype(int)
+
+        # Table of (filled, lower, upper), indexed by (n, x)
+        table = self._get_table(alpha)
+        missing = table[0, ni, xi] == 0
+        if missing.any():
+            flat = np.unique(ni[missing] * (self.table_max_n + 1) + xi[missing])
+            new_n, new_x = np.divmod(flat, self.table_max_n + 1)
+            table[1:, new_n, new_x] = self._compute_ci_beta(new_x, new_n, alpha)
+            table[0, new_n, new_x] = 1
+
+        lower = np.empty(_x.shape)
+        upper = np.empty(_x.shape)
+        lower[in_table] = table[1, ni, xi]
+        upper[in_table] = table[2, ni, xi]
+        if not in_table.all():
+            lower[~in_table], upper[~in_table] = self._compute_ci_beta(
+                _x[~in_table], _n[~in_table], alpha
+            )
+        return lower[()], upper[()]
+
+    def _get_table(self, alpha: float) -> np.ndarray:
+        """Get (or create) the lookup table of a confidence level, marking it
+        as the most recently used."""
+        if alpha in self._tables:
+            self._tables.move_to_end(alpha)
+        else:
+            size = self.table_max_n + 1
+            self._tables[alpha] = np.zeros((3, size, size))
+            while len(self._tables) > self.max_tables:
+                self._tables.popitem(last=False)
+        return self._tables[alpha]
+
+    def _get_ci_jeffreys(
+        self,
+        x: Count,
+        n: Count,
+        alpha: float,
+        out: Optional[CIBuffer] = None,
+    ) -> CIResult:
+        """Get the equal-tailed interval of the Beta(x + 1/2, n - x + 1/2)
+        posterior under the Jeffreys prior."""
+        avg = self._get_avg(x, n)
+        lower = stats.beta.ppf(alpha / 2, x + 0.5, n - x + 0.5)
+        upper = stats.beta.isf(alpha / 2, x + 0.5, n - x + 0.5)
+        return (avg, *self._fix_endpoints(x, n, lower, upper))  # type: ignore
+
+    @staticmethod
+    def _fix_endpoints(
+        x: Count,
+        n: Count,
+        lower: Union[float, np.ndarray],
+        upper: Union[float, np.ndarray],
+    ) -> Tuple[Union[float, np.ndarray], Union[float, np.ndarray]]:
+        """Set the lower (upper) bound to 0 (1) if x is 0 (n)."""
         if not np.shape(lower):
             lower = 0 if x == 0 else lower
             upper = 1 if x == n else upper
         else:
-            lower[x == 0] = 0
-            upper[x == n] = 1
+            lower[np.asarray(x == 0)] = 0  # type: ignore
+            upper[np.asarray(x == n)] = 1  # type: ignore
+        return lower, upper
+
+    def _get_ci_wilson(
+        self,
+        x: Count,
+        n: Count,
+        alpha: float,
+        out: Optional[CIBuffer] = None,
+    ) -> CIResult:
+        """Get the Wilson score interval, whose center is shrunk towards 1/2
+        and which is always within [0, 1] (up to rounding)."""
+        avg, lower, upper = self._get_out(x, n, out)
+        z = stats.norm.isf(alpha / 2)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            center = (x + z**2 / 2) / (n + z**2)
+            dist = z / (n + z**2) * np.sqrt(x * (n - x) / n + z**2 / 4)
+
+        # Clip rounding error at x = 0 and x = n
+        lower = np.clip(center - dist, 0, 1, out=lower)
+        upper = np.clip(center + dist, 0, 1, out=upper)
         return (avg, lower, upper)  # type: ignore
 
+    def _get_ci_agresti_coull(
+        self,
+        x: Count,
+        n: Count,
+        alpha: float,
+        out: Optional[CIBuffer] = None,
+    ) -> CIResult:
+        """Get the Agresti-Coull interval, which is the normal interval after
+        adding z^2 / 2 successes and failures, clipped to [0, 1]."""
+        avg, lower, upper = self._get_out(x, n, out)
+        z = stats.norm.isf(alpha / 2)
+        n_tilde = n + z**2
+        p_tilde = (x + z**2 / 2) / n_tilde
+        dist = z * np.sqrt(p_tilde * (1 - p_tilde) / n_tilde)
+        lower = np.clip(p_tilde - dist, 0, 1, out=lower)
+        upper = np.clip(p_tilde + dist, 0, 1, out=upper)
+        return (avg, lower, upper)  # type: ignore
+
+    def _get_out(
+        self,
+        x: Count,
+        n: Count,
+        out: Optional[CIBuffer],
+    ) -> Tuple[Union[float, np.ndarray], Optional[np.ndarray], Optional[np.ndarray]]:
+        """Get the average, along with the buffers (if any) to write the lower
+        and upper bounds into."""
+        if out is None:
+            return self._get_avg(x, n), None, None
+        with np.errstate(divide="ignore", invalid="ignore"):
+            avg = np.divide(x, n, out=out[0])
+        return avg, out[1], out[2]
+
 
 class BetaCI:
     """A class to compute the confidence interval for a sequence of proportions.
@@ -184,6 +383,14 @@ class BetaCI:
        a                                                b
     0  1  (0.15, 0.03934782717676056, 0.3514633807376342)
     1  2  (0.2, 0.04331199871732203, 0.48089116422177497)
+
+    The same intervals are computed for all groups at once, without a Python
+    call per group, by ``get_grouped_ci``:
+    >>> ci.get_grouped_ci(df["b"], df["a"])
+       count  mean     lower     upper
+    a
+    1      2  0.15  0.039348  0.351463
+    2      3  0.20  0.043312  0.480891
     """
 
     def __init__(self) -> None:
@@ -213,31 +420,74 @@ class BetaCI:
         """
         return self.ci_methods[method](x, conf)
 
+    def get_grouped_ci(
+        self,
+        x: Union[np.ndarray, pd.Series],
+        groups: Union[np.ndarray, pd.Series],
+        conf: float = 0.95,
+        method: Literal["mom", "normal"] = "mom",
+    ) -> pd.DataFrame:
+        """Compute a confidence interval for each group of values.
+
+        This is equivalent to calling ``get_ci`` on the values of each group,
+        but the per-group means and variances are computed with
+        ``np.bincount``, and the interval bounds of all groups with a single
+        vectorized ``stats.beta`` call.
+
+        Parameters
+        ----------
+        x : Union[np.ndarray, pd.Series]
+            Values between 0 and 1 (nulls are ignored).
+        groups : Union[np.ndarray, pd.Series]
+            Group label of each value, the same length as `x`.
+        conf : float
+            Confidence level between 0 and 1.
+        method : Literal["mom", "normal"]
+            Method to use for computing the confidence interval; see
+            ``get_ci``.
+
+        Returns
+        -------
+        pd.DataFrame
+            DataFrame indexed by (sorted) group label, with the "count" of
+            non-null values, and their "mean" and "lower" and "upper" bounds.
+        """
+        if method not in self.ci_methods:
+            raise NotImplementedError("Method '%s' is not available." % method)
+        codes, uniques = pd.factorize(np.asarray(groups), sort=True)
+        arr = np.asarray(x, dtype=float)
+        valid = ~np.isnan(arr) & (codes >= 0)
+        arr, codes = arr[valid], codes[valid]
+        if (arr < 0).any() or (arr > 1).any():
+            raise ValueError("Values must be between 0 and 1")
+
+        # Two-pass per-group mean and unbiased variance
+        num_groups = len(uniques)
+        count = np.bincount(codes, minlength=num_groups)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            mean = np.bincount(codes, arr, num_groups) / count
+            sq_dev = np.bincount(codes, (arr - mean[codes]) ** 2, num_groups)
+            var = np.where(count > 1, sq_dev / (count - 1), 0)
+
+        bounds = self._get_mom_bounds if method == "mom" else self._get_normal_bounds
+        lower, upper = bounds(mean, var, get_alpha(conf))
+        name = groups.name if isinstance(groups, pd.Series) else None
+        return pd.DataFrame(
+            {"count": count, "mean": mean, "lower": lower, "upper": upper},
+            index=pd.Index(uniques, name=name),
+        )
+
     def _get_ci_mom(
         self,
         x: Iterable[float],
         conf: float = 0.95,
     ) -> Tuple[float, float, float]:
-        """Get the confidence interval using the method of moments.
-
-        Estimate the parameters of a beta distribution using the method of
-        moments, then compute the interval containing the central `conf`
-        fraction of that distribution.
-        """
-        alpha = get_alpha(conf)
+        """Get the confidence interval using the method of moments."""
         sample_mean, sample_var = self._get_mean_and_var(x)
         if sample_var == 0 or len(x) == 1:  # type: ignore
-            lower = upper = sample_mean
-        else:
-            alpha_param = sample_mean * (
-                (sample_mean * (1 - sample_mean)) / sample_var - 1
-            )
-            beta_param = (1 - sample_mean) * (
-                (sample_mean * (1 - sample_mean)) / sample_var - 1
-            )
-            lower = stats.beta.ppf(alpha / 2, alpha_param, beta_param + 1)
-            upper = stats.beta.isf(alpha / 2, alpha_param + 1, beta_param)
-        return sample_mean, lower, upper
+            return sample_mean, sample_mean, sample_mean
+        lower, upper = self._get_mom_bounds(sample_mean, sample_var, get_alpha(conf))
+        return sample_mean, float(lower), float(upper)
 
     def _get_ci_normal(
         self,
@@ -245,14 +495,44 @@ class BetaCI:
         conf: float = 0.95,
     ) -> Tuple[float, float, float]:
         """Get the confidence interval using a normal approximation."""
-        alpha = get_alpha(conf)
         sample_mean, sample_var = self._get_mean_and_var(x)
-        std = np.sqrt(sample_var)
-        z = stats.norm.isf(alpha / 2)
-        dist = z * std
-        lower = sample_mean - dist
-        upper = sample_mean + dist
-        return sample_mean, lower, upper
+        lower, upper = self._get_normal_bounds(sample_mean, sample_var, get_alpha(conf))
+        return sample_mean, float(lower), float(upper)
+
+    @staticmethod
+    def _get_mom_bounds(
+        mean: Union[float, np.ndarray],
+        var: Union[float, np.ndarray],
+        alpha: float,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the method of moments bounds for one or more samples.
+
+        Estimate the parameters of a beta distribution using the method of
+        moments, then compute the interval containing the central `conf`
+        fraction of that distribution. Samples with zero variance get a
+        zero-width interval.
+        """
+        mean, var = np.asarray(mean), np.asarray(var)
+        degenerate = var == 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            common = (mean * (1 - mean)) / np.where(degenerate, 1, var) - 1
+        alpha_param = mean * common
+        beta_param = (1 - mean) * common
+        lower = stats.beta.ppf(alpha / 2, alpha_param, beta_param + 1)
+        upper = stats.beta.isf(alpha / 2, alpha_param + 1, beta_param)
+        lower = np.where(degenerate, mean, lower)
+        upper = np.where(degenerate, mean, upper)
+        return lower, upper
+
+    @staticmethod
+    def _get_normal_bounds(
+        mean: Union[float, np.ndarray],
+        var: Union[float, np.ndarray],
+        alpha: float,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the normal approximation bounds for one or more samples."""
+        dist = stats.norm.isf(alpha / 2) * np.sqrt(var)
+        return np.asarray(mean - dist), np.asarray(mean + dist)
 
     @staticmethod
     def _get_mean_and_var(x: Iterable[float]) -> Tuple[float, float]:
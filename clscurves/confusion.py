@@ -0,0 +1,291 @@
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from clscurves.utils import MetricsResult
+
+
+def compute_confusion_curves(
+    df: pd.DataFrame,
+    offsets: Optional[np.ndarray] = None,
+    imbalance_multiplier: Union[float, np.ndarray] = 1,
+    value_columns: Optional[List[str]] = None,
+) -> MetricsResult:
+    """Compute confusion matrix metrics for one or more curves at once.
+
+    Each curve ("segment") is a contiguous block of rows in ``df`` containing
+    per-threshold aggregates, sorted in threshold order and starting with an
+    extra all-zero row just outside the range of observed thresholds. All
+    cumulative sums, rates, and AUCs are computed segment-wise in a single
+    vectorized pass, so computing many curves costs about the same as
+    computing one long curve.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Per-threshold aggregates with columns "thresh", "label" (number of
+        positive examples), "weight" (sum of weights), "weight_pos" (sum of
+        weights of positive examples), and "num" (number of examples).
+    offsets : Optional[np.ndarray]
+        Array of length ``S + 1`` marking the row at which each of the ``S``
+        segments starts (with the final entry equal to ``len(df)``). If not
+        provided, ``df`` is treated as a single segment.
+    imbalance_multiplier : Union[float, np.ndarray]
+        Multiplicative weighting factor applied to the positive class, either
+        shared by all segments or given as an array with one per segment.
+    value_columns : Optional[List[str]]
+        Names of additional per-example values to accumulate. For each name
+        ``col``, ``df`` must contain per-threshold sums of the values
+        ("value_<col>") and of the values of positive examples
+        ("value_pos_<col>"), from which the "tp_<col>", "fp_<col>",
+        "fn_<col>", and "tn_<col>" columns are computed.
+
+    Returns
+    -------
+    MetricsResult
+        A class containing the computed metrics, with one row of scalars per
+        segment.
+    """
+    df = df.reset_index(drop=True)
+    if offsets is None:
+        offsets = np.array([0, len(df)])
+    starts = offsets[:-1]
+    lengths = np.diff(offsets)
+    m_seg = np.broadcast_to(np.asarray(imbalance_multiplier, dtype=float), len(starts))
+
+    # Compute segment totals
+    _num_examples = np.add.reduceat(df["num"].values, starts)
+    _num_examples_pos = np.add.reduceat(df["label"].values, starts)
+    num_examples_pos = _num_examples_pos * m_seg
+    num_examples_neg = _num_examples - _num_examples_pos
+    num_examples = num_examples_pos + num_examples_neg
+
+    # Take weight totals from the cumulative sums so that they cancel exactly
+    pred_neg_w = segment_cumsum(df["weight"].values, offsets)
+    fn_w = segment_cumsum(df["weight_pos"].values, offsets)
+    _tot_weight = pred_neg_w[offsets[1:] - 1]
+    _tot_weight_pos = fn_w[offsets[1:] - 1]
+    tot_weight_pos = _tot_weight_pos * m_seg
+    tot_weight_neg = _tot_weight - _tot_weight_pos
+    tot_weight = tot_weight_pos + tot_weight_neg
+    with np.errstate(divide="ignore", invalid="ignore"):
+        imbalance = num_examples_pos / (num_examples_pos + num_examples_neg)
+
+    def per_row(values: np.ndarray) -> np.ndarray:
+        return np.repeat(values, lengths)
+
+    m = per_row(m_seg)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+
+        # Compute confusion matrix
+        pred_neg = segment_cumsum(df["num"].values, offsets)
+        pred_pos = per_row(_num_examples) - pred_neg
+        fn = segment_cumsum(df["label"].values, offsets)
+        tn = pred_neg - fn
+        tp = per_row(_num_examples_pos) - fn
+        fp = per_row(_num_examples) - pred_neg - tp
+        df["pred_neg"] = pred_neg
+        df["pred_pos"] = pred_pos * m
+        df["fn"] = fn * m
+        df["tn"] = tn
+        df["tp"] = tp * m
+        df["fp"] = fp
+        tp, fn, fp = df["tp"].values, df["fn"].values, df["fp"].values
+
+        recall = tp / (tp + fn)
+        precision = tp / (tp + fp)
+        df["recall"] = recall
+        df["precision"] = precision
+        df["frac"] = df["pred_pos"].values / per_row(num_examples)
+        df["f1"] = 2 * precision * recall / (precision + recall)
+        df["fpr"] = fp / per_row(num_examples_neg)
+        df["fdr"] = fp / (fp + tp)
+        df["recall_gain"] = compute_gain(recall, per_row(imbalance))
+        df["precision_gain"] = compute_gain(precision, per_row(imbalance))
+
+        # Compute weighted confusion matrix
+        pred_pos_w = per_row(_tot_weight) - pred_neg_w
+        tn_w = pred_neg_w - fn_w
+        tp_w = per_row(_tot_weight_pos) - fn_w
+        fp_w = per_row(_tot_weight) - pred_neg_w - tp_w
+        df["pred_neg_w"] = pred_neg_w
+        df["pred_pos_w"] = pred_pos_w * m
+        df["fn_w"] = fn_w * m
+        df["tn_w"] = tn_w
+        df["tp_w"] = tp_w * m
+        df["fp_w"] = fp_w
+        tp_w, fn_w, fp_w = df["tp_w"].values, df["fn_w"].values, df["fp_w"].values
+
+        df["recall_w"] = tp_w / (tp_w + fn_w)
+        df["precision_w"] = tp_w / (tp_w + fp_w)
+        df["frac_w"] = df["pred_pos_w"].values / per_row(tot_weight)
+        df["fpr_w"] = fp_w / per_row(tot_weight_neg)
+        df["fdr_w"] = fp_w / (fp_w + tp_w)
+
+    # Accumulate additional per-example values over the confusion matrix
+    for col in value_columns or []:
+        names = [f"{cell}_{col}" for cell in ["tp", "fp", "fn", "tn"]]
+        if any(name in df.columns for name in names):
+            raise ValueError(f"Value column '{col}' conflicts with a metric name.")
+        pred_neg_v = segment_cumsum(df[f"value_{col}"].values, offsets)
+        fn_v = segment_cumsum(df[f"value_pos_{col}"].values, offsets)
+        tot_v = per_row(pred_neg_v[offsets[1:] - 1])
+        tot_v_pos = per_row(fn_v[offsets[1:] - 1])
+        df[f"tp_{col}"] = (tot_v_pos - fn_v) * m
+        df[f"fp_{col}"] = tot_v - pred_neg_v - (tot_v_pos - fn_v)
+        df[f"fn_{col}"] = fn_v * m
+        df[f"tn_{col}"] = pred_neg_v - fn_v
+
+    # Fill nulls
+    df.fillna({col: 0 for col in df.columns if col != "label"}, inplace=True)
+
+    # Scalars
+    def auc(y_col: str, x_col: str) -> np.ndarray:
+        return np.abs(segment_trapezoid(df[y_col].values, df[x_col].values, offsets))
+
+    # The KS statistic is the largest gap between the class-conditional CDFs
+    # of the scores, 1 - fpr and 1 - recall
+    def ks(y_col: str, x_col: str) -> np.ndarray:
+        gap = np.abs(df[y_col].values - df[x_col].values)
+        return np.maximum.reduceat(gap, offsets[:-1])
+
+    scalars = pd.DataFrame(
+        {
+            "num_examples": num_examples,
+            "num_examples_pos": num_examples_pos,
+            "num_examples_neg": num_examples_neg,
+            "tot_weight": tot_weight,
+            "tot_weight_pos": tot_weight_pos,
+            "tot_weight_neg": tot_weight_neg,
+            "imbalance": imbalance,
+            "imbalance_multiplier": m_seg,
+            "roc_auc": auc("recall", "fpr"),
+            "pr_auc": auc("precision", "recall"),
+            "rf_auc": auc("recall", "frac"),
+            "roc_auc_w": auc("recall_w", "fpr_w"),
+            "pr_auc_w": auc("precision_w", "recall_w"),
+            "rf_auc_w": auc("recall_w", "frac_w"),
+            "prg_auc": auc("precision_gain", "recall_gain"),
+            "ks": ks("recall", "fpr"),
+            "ks_w": ks("recall_w", "fpr_w"),
+        }
+    )
+
+    return MetricsResult(curves=df, scalars=scalars)
+
+
+def recompute_confusion_curves(
+    curves: pd.DataFrame,
+    imbalance_multiplier: Union[float, np.ndarray] = 1,
+    reverse_thresh: bool = False,
+) -> MetricsResult:
+    """Recompute metrics from the per-threshold aggregates stored in curves.
+
+    Every metrics.curves DataFrame keeps the raw per-threshold aggregates
+    ("thresh", "label", "weight", "weight_pos", "num", and any accumulated
+    "value_<col>" and "value_pos_<col>" columns) that all other metrics are
+    derived from, with each curve starting at an extra row where "num" is 0.
+    This recomputes every derived metric, for all curves at once, with a new
+    imbalance multiplier and/or with the threshold direction reversed,
+    without regrouping or resampling any examples.
+
+    Parameters
+    ----------
+    curves : pd.DataFrame
+        metrics.curves DataFrame, with the rows of each curve contiguous.
+    imbalance_multiplier : Union[float, np.ndarray]
+        New imbalance multiplier, either shared by all curves or given as an
+        array with one per curve.
+    reverse_thresh : bool
+        Whether to reverse the threshold direction of every curve.
+
+    Returns
+    -------
+    MetricsResult
+        Recomputed curves and scalars, with one row of scalars per curve.
+        Columns starting with "_" (e.g. "_bootstrap_sample") are carried
+        over to both; any other columns not derived from the aggregates
+        (e.g. from ``compute_cost``) are dropped.
+    """
+    offsets = np.append(np.flatnonzero(curves["num"].to_numpy() == 0), len(curves))
+    starts, lengths = offsets[:-1], np.diff(offsets)
+    names = [col[10:] for col in curves.columns if col.startswith("value_pos_")]
+    value_columns = [name for name in names if f"value_{name}" in curves.columns]
+    agg_columns = ["thresh", "label", "weight", "weight_pos", "num"] + [
+        f"value{kind}_{col}" for col in value_columns for kind in ["", "_pos"]
+    ]
+    meta_columns = [col for col in curves.columns if col.startswith("_")]
+    df = curves[agg_columns].reset_index(drop=True)
+
+    if reverse_thresh:
+        # Keep each extra row first, and reverse the order of the other rows
+        position = np.arange(len(df)) - np.repeat(starts, lengths)
+        rows = np.where(
+            position == 0,
+            np.repeat(starts, lengths),
+            np.repeat(offsets[1:], lengths) - position,
+        )
+        first = np.minimum(starts + 1, offsets[1:] - 1)
+        thresh = df["thresh"].to_numpy()
+        direction = np.sign(thresh[first] - thresh[starts])
+        df = df.iloc[rows].reset_index(drop=True)
+
+        # Move each extra threshold to just past the other end of the curve
+        epsilon = 1e-6
+        thresh = df["thresh"].to_numpy().copy()
+        thresh[starts] = thresh[first] + direction * epsilon
+        df["thresh"] = thresh
+
+    metrics = compute_confusion_curves(
+        df,
+        offsets=offsets,
+        imbalance_multiplier=imbalance_multiplier,
+        value_columns=value_columns,
+    )
+    for col in meta_columns:
+        values = curves[col].to_numpy()
+        metrics.curves[col] = values
+        metrics.scalars[col] = values[starts]
+    return metrics
+
+
+def segment_cumsum(values: np.ndarray, offsets: np.ndarray) -> np.ndarray:
+    """Cumulative sum which restarts at the beginning of each segment."""
+    cumsum = np.cumsum(values)
+    starts = offsets[:-1]
+    base = cumsum[starts] - values[starts]
+    return cumsum - np.repeat(base, np.diff(offsets))
+
+
+def segment_trapezoid(
+    y: np.ndarray,
+    x: np.ndarray,
+    offsets: np.ndarray,
+) -> np.ndarray:
+    """Integrate ``y`` over ``x`` with the trapezoid rule within each segment."""
+    area = np.zeros(len(y))
+    area[:-1] = 0.5 * (y[1:] + y[:-1]) * (x[1:] - x[:-1])
+
+    # Drop the trapezoids which bridge two neighboring segments
+    area[offsets[1:-1] - 1] = 0
+    return np.add.reduceat(area, offsets[:-1])
+
+
+def compute_gain(
+    metric: np.ndarray,
+    imbalance: np.ndarray,
+) -> np.ndarray:
+    """Compute "gain".
+
+    As defined in the "Precision-Recall-Gain" paper
+    `here <https://papers.nips.cc/paper/2015/file/33e8075e9970de0cfea955afd464\
+    4bb2-Paper.pdf>`_.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.clip(
+            (metric - imbalance) / ((1 - imbalance) * metric),
+            a_min=0,
+            a_max=1,
+        )
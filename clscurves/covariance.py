@@ -1,8 +1,9 @@
-from typing import Dict, Optional
+from typing import Dict, Optional, Sequence, Union
 
 import numpy as np
 from matplotlib import patches
 from matplotlib import pyplot as plt
+from matplotlib.collections import EllipseCollection
 
 
 class CovarianceEllipseGenerator:
@@ -67,21 +68,8 @@ class CovarianceEllipseGenerator:
         """
         self.conf = conf
 
-        center = np.mean(self.data, axis=1)
-        [x_center, y_center] = center.tolist()
-        c = np.cov(self.data)
-        (eigenval, eigenvec) = np.linalg.eig(c)
-        angle = np.arctan(eigenvec[1, 0] / eigenvec[0, 0]) * 180 / np.pi
-        num_std = np.sqrt(-2 * np.log(1 - conf))
-        [width, height] = 2 * num_std * np.sqrt(eigenval)
-
-        self.ellipse_data = {
-            "x_center": x_center,
-            "y_center": y_center,
-            "width": width,
-            "height": height,
-            "angle": angle,
-        }
+        geometry = compute_cov_ellipses(self.data[None, :, :], conf)
+        self.ellipse_data = {key: value.item() for key, value in geometry.items()}
 
         return self.ellipse_data
 
@@ -160,3 +148,192 @@ class CovarianceEllipseGenerator:
             alpha=1,
             s=20,
         )
+
+
+class BatchedCovarianceEllipseGenerator:
+    """A class to generate many stylized covariance ellipses at once.
+
+    The batched counterpart of ``CovarianceEllipseGenerator``: given a stack
+    of K collections of 2D points (e.g. the bootstrapped operating points at
+    each of K thresholds along a curve), compute all K covariance matrices
+    and their eigendecompositions in one vectorized pass, and draw every
+    ellipse as a single Matplotlib ``EllipseCollection``. The covariance
+    eigendecompositions don't depend on the confidence level, so they are
+    computed once and only rescaled for each requested ``conf``.
+
+    Parameters
+    ----------
+    data
+        (K, 2, M)-dim numpy array.
+
+    Examples
+    --------
+    >>> data = ...
+    >>> ax = ...
+    >>> bceg = BatchedCovarianceEllipseGenerator(data)
+    >>> bceg.create_ellipse_collection(ax, conf=[0.5, 0.95])
+    >>> bceg.add_ellipse_centers(ax)
+    """
+
+    def __init__(self, data: np.ndarray):
+
+        assert (
+            data.ndim == 3 and data.shape[1] == 2
+        ), f"Data must be of shape Kx2xM, not {data.shape}."
+
+        self.data = data
+        self.geometry = compute_cov_ellipses(data, conf=None)
+        self.ellipse_collection: EllipseCollection
+
+    def compute_cov_ellipses(
+        self,
+        conf: Union[float, Sequence[float]] = 0.95,
+    ) -> Dict[str, np.ndarray]:
+        """Compute covariance ellipse geometry at one or more confidence levels.
+
+        Parameters
+        ----------
+        conf
+            Confidence level, or a sequence of C confidence levels.
+
+        Returns
+        -------
+        dict
+            Dictionary of (K, C)-dim arrays describing the resulting
+            confidence ellipses, with the same keys as
+            ``CovarianceEllipseGenerator.compute_cov_ellipse``.
+        """
+        num_std = _get_num_std(np.atleast_1d(conf))
+        return {
+            "x_center": np.repeat(self.geometry["x_center"], len(num_std), axis=1),
+            "y_center": np.repeat(self.geometry["y_center"], len(num_std), axis=1),
+            "width": self.geometry["width"] * num_std,
+            "height": self.geometry["height"] * num_std,
+            "angle": np.repeat(self.geometry["angle"], len(num_std), axis=1),
+        }
+
+    def create_ellipse_collection(
+        self,
+        ax: plt.Axes,
+        conf: Union[float, Sequence[float]] = 0.95,
+        color: str = "black",
+        alpha: float = 0.2,
+    ) -> EllipseCollection:
+        """Create a Matplotlib collection of covariance ellipses.
+
+        Create a single ``EllipseCollection`` holding the ellipse for every
+        point cloud at every confidence level, and add it to ax.
+
+        Parameters
+        ----------
+        ax
+            Matplotlib axis object.
+        conf
+            Confidence level, or a sequence of confidence levels.
+        color
+            Color of ellipse fill.
+        alpha
+            Opacity of ellipse fill.
+
+        Returns
+        -------
+        EllipseCollection
+            Matplotlib ellipse collection.
+        """
+        ellipses = self.compute_cov_ellipses(conf)
+        offsets = np.column_stack(
+            [ellipses["x_center"].ravel(), ellipses["y_center"].ravel()]
+        )
+
+        self.ellipse_collection = EllipseCollection(
+            widths=ellipses["width"].ravel(),
+            heights=ellipses["height"].ravel(),
+            angles=ellipses["angle"].ravel(),
+            units="xy",
+            offsets=offsets,
+            offset_transform=ax.transData,
+            linewidth=2,
+            alpha=alpha,
+            zorder=5000,
+            facecolors=color,
+            edgecolors="none",
+        )
+        ax.add_collection(self.ellipse_collection)
+
+        return self.ellipse_collection
+
+    def add_ellipse_centers(self, ax: plt.Axes):
+        """Add covariance ellipse centers to existing plot.
+
+        Given an input Matplotlib axis object, add an opaque white dot at
+        the center of each computed confidence ellipse.
+
+        Parameters
+        ----------
+        ax
+            Matplotlib axis object.
+        """
+        ax.scatter(
+            self.geometry["x_center"][:, 0],
+            self.geometry["y_center"][:, 0],
+            color="white",
+            edgecolor="black",
+            linewidth=0.5,
+            zorder=10000,
+            alpha=1,
+            s=20,
+        )
+
+
+def compute_cov_ellipses(
+    data: np.ndarray,
+    conf: Optional[float] = 0.95,
+) -> Dict[str, np.ndarray]:
+    """Compute covariance ellipse geometry for a stack of 2D point clouds.
+
+    The eigendecomposition of each symmetric 2x2 covariance matrix
+    ``[[a, b], [b, c]]`` is computed in closed form: the eigenvalues are
+    ``(a + c)/2 +/- sqrt(((a - c)/2)^2 + b^2)``, and the major axis is rotated
+    ``arctan2(2b, a - c)/2`` from horizontal.
+
+    Parameters
+    ----------
+    data
+        (K, 2, M)-dim numpy array.
+    conf
+        Confidence level. If `None`, the returned widths and heights are
+        those of a one-"unit" ellipse, to be multiplied by
+        ``sqrt(-2 * log(1 - conf))`` for a given confidence level.
+
+    Returns
+    -------
+    dict
+        Dictionary of (K, 1)-dim arrays with keys "x_center", "y_center",
+        "width", "height", and "angle" (in degrees).
+    """
+    center = np.mean(data, axis=2)
+    dev = data - center[:, :, None]
+    ddof = data.shape[2] - 1
+    a = np.sum(dev[:, 0] ** 2, axis=1) / ddof
+    b = np.sum(dev[:, 0] * dev[:, 1], axis=1) / ddof
+    c = np.sum(dev[:, 1] ** 2, axis=1) / ddof
+
+    mid = (a + c) / 2
+    radius = np.sqrt(((a - c) / 2) ** 2 + b**2)
+    eigenval_major = mid + radius
+    eigenval_minor = np.clip(mid - radius, a_min=0, a_max=None)
+    angle = np.degrees(np.arctan2(2 * b, a - c) / 2)
+
+    num_std = 1.0 if conf is None else _get_num_std(np.array([conf]))
+    return {
+        "x_center": center[:, 0, None],
+        "y_center": center[:, 1, None],
+        "width": (2 * np.sqrt(eigenval_major))[:, None] * num_std,
+        "height": (2 * np.sqrt(eigenval_minor))[:, None] * num_std,
+        "angle": angle[:, None],
+    }
+
+
+def _get_num_std(conf: np.ndarray) -> np.ndarray:
+    """Get the number of standard deviations spanned by a 2D confidence region."""
+    return np.sqrt(-2 * np.log(1 - conf))
@@ -0,0 +1,127 @@
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from clscurves.hull import upper_hull_mask
+
+DEFAULT_DECIMATION_COLUMNS = [
+    "fpr",
+    "recall",
+    "precision",
+    "frac",
+]
+
+
+def arc_length_decimate(
+    points: np.ndarray,
+    offsets: np.ndarray,
+    max_points: int,
+    keep: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Decimate one or more curves to points spaced uniformly in arc length.
+
+    Each curve (the slice ``offsets[i]:offsets[i + 1]`` of ``points``) with
+    more than ``max_points`` points is cut into ``max_points - 1`` pieces of
+    equal arc length, and only the first point within each piece is kept,
+    along with the last point of the curve. Every dropped point then lies on
+    the curve between two kept points that are less than ``L / (max_points -
+    1)`` apart in arc length, where ``L`` is the total arc length of the
+    curve, so no dropped point is farther than that from the decimated curve.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        (N, D)-dim array of concatenated curve coordinates.
+    offsets : np.ndarray
+        Array of length ``S + 1`` marking the row at which each of the ``S``
+        curves starts (with the final entry equal to ``N``).
+    max_points : int
+        Maximum number of points to keep per curve, not counting any points
+        forced by ``keep``.
+    keep : Optional[np.ndarray]
+        Length-N boolean array of points which must be kept.
+
+    Returns
+    -------
+    np.ndarray
+        Length-N boolean array marking the points to keep.
+    """
+    if max_points < 2:
+        raise ValueError("`max_points` must be at least 2.")
+    points = np.asarray(points, dtype=float).reshape(len(points), -1)
+    starts, lengths = offsets[:-1], np.diff(offsets)
+
+    # Arc length from the start of each curve, ignoring non-finite steps
+    step = np.zeros(len(points))
+    step[1:] = np.sqrt((np.diff(points, axis=0) ** 2).sum(axis=1))
+    step[~np.isfinite(step)] = 0
+    step[starts] = 0
+    cumsum = np.cumsum(step)
+    arc = cumsum - np.repeat(cumsum[starts], lengths)
+    total = np.repeat(arc[offsets[1:] - 1], lengths)
+
+    # Keep the first point to enter each equal-length piece of each curve
+    with np.errstate(divide="ignore", invalid="ignore"):
+        piece = np.floor(arc / total * (max_points - 1))
+    piece[~np.isfinite(piece)] = 0
+    mask = np.ones(len(points), dtype=bool)
+    mask[1:] = piece[1:] != piece[:-1]
+    mask[starts] = True
+    mask[offsets[1:] - 1] = True
+
+    # Leave short curves untouched
+    mask |= np.repeat(lengths <= max_points, lengths)
+    if keep is not None:
+        mask |= keep
+    return mask
+
+
+def decimate_curves(
+    curves: pd.DataFrame,
+    offsets: np.ndarray,
+    max_points: int,
+    columns: Optional[List[str]] = None,
+) -> np.ndarray:
+    """Select the rows of a metrics.curves DataFrame to keep when decimating.
+
+    Arc length is measured jointly over ``columns``, each scaled by its range
+    across all curves, so the error bound of ``arc_length_decimate`` holds
+    (relative to the column ranges) in a plot of any two of the columns. The
+    endpoints of each curve and the vertices of each ROC convex hull (if
+    "fpr" and "recall" are present) are always kept.
+
+    Parameters
+    ----------
+    curves : pd.DataFrame
+        metrics.curves DataFrame, with the rows of each curve contiguous.
+    offsets : np.ndarray
+        Array of length ``S + 1`` marking the row at which each of the ``S``
+        curves starts (with the final entry equal to ``len(curves)``).
+    max_points : int
+        Maximum number of points to keep per curve, not counting ROC convex
+        hull vertices.
+    columns : Optional[List[str]]
+        Columns to measure arc length over. Defaults to
+        ``DEFAULT_DECIMATION_COLUMNS``.
+
+    Returns
+    -------
+    np.ndarray
+        Boolean array marking the rows to keep.
+    """
+    columns = DEFAULT_DECIMATION_COLUMNS if columns is None else columns
+    if len(curves) == 0:
+        return np.zeros(0, dtype=bool)
+    points = curves[columns].to_numpy(dtype=float)
+    with np.errstate(invalid="ignore"):
+        finite = np.where(np.isfinite(points), points, np.nan)
+        span = np.nanmax(finite, axis=0) - np.nanmin(finite, axis=0)
+    span[~(span > 0)] = 1
+
+    keep = None
+    if "fpr" in curves.columns and "recall" in curves.columns:
+        keep = upper_hull_mask(
+            curves["fpr"].to_numpy(), curves["recall"].to_numpy(), offsets
+        )
+    return arc_length_decimate(points / span, offsets, max_points, keep=keep)
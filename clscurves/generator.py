@@ -1,28 +1,34 @@
-import itertools
 import logging
 from multiprocessing import Pool
-from typing import Optional
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import pandas as pd
 import psutil
 from numpy.random import default_rng
-from scipy.integrate import trapezoid
 from tqdm import tqdm
 from typing_extensions import Literal
 
 from clscurves.config import MetricsAliases
+from clscurves.confusion import compute_confusion_curves
+from clscurves.hull import ROCConvexHull
+from clscurves.isotonic import IsotonicCalibration
 from clscurves.plotter.cost import CostPlotter
 from clscurves.plotter.dist import DistPlotter
 from clscurves.plotter.pr import PRPlotter
 from clscurves.plotter.prg import PRGPlotter
 from clscurves.plotter.rf import RFPlotter
 from clscurves.plotter.roc import ROCPlotter
+from clscurves.query import OperatingPointQuery, Side
 from clscurves.utils import MetricsResult
 
 LOG = logging.getLogger(__name__)
 
 NullFillMethod = Literal["0", "1", "imb", "prob"]
+BootstrapMethod = Literal["resample", "poisson", "bayesian"]
+
+# Generator and input data held by each worker process
+_WORKER_STATE: Dict[str, object] = {}
 
 
 class MetricsGenerator(
@@ -52,6 +58,7 @@ class MetricsGenerator(
         label_column: str = "label",
         score_column: str = "probability",
         weight_column: Optional[str] = None,
+        value_columns: Optional[List[str]] = None,
         score_is_probability: bool = True,
         reverse_thresh: bool = False,
         num_bootstrap_samples: int = 0,
@@ -59,6 +66,13 @@ class MetricsGenerator(
         null_prob_column: Optional[str] = None,
         null_fill_method: Optional[NullFillMethod] = None,
         seed: Optional[int] = None,
+        bootstrap_tol: Optional[float] = None,
+        bootstrap_batch_size: int = 20,
+        bootstrap_tol_metrics: Sequence[str] = ("roc_auc", "pr_auc"),
+        bootstrap_method: BootstrapMethod = "resample",
+        bootstrap_strata: Optional[str] = None,
+        bootstrap_cluster: Optional[str] = None,
+        num_imputations: int = 1,
     ) -> None:
         """Instantiating this class computes all the metrics.
 
@@ -92,6 +106,14 @@ class MetricsGenerator(
             is, "How much money did we catch", not "How many cases did we
             catch". If no column name is specified, all weights will be set to
             1.
+        value_columns : Optional[List[str]]
+            Names of columns containing additional per-example values (e.g.
+            a transaction amount or a review cost) to accumulate alongside the
+            confusion matrix. For each column ``col``, the sum of its values
+            over the true positives, false positives, false negatives, and
+            true negatives at every threshold is stored in the "tp_<col>",
+            "fp_<col>", "fn_<col>", and "tn_<col>" curves columns, computed in
+            the same pass as the other metrics. Values must be non-null.
         score_is_probability : bool
             Specifies whether the values in the score column are bounded by 0
             and 1. This controls how the threshold range is determined. If
@@ -139,6 +161,56 @@ class MetricsGenerator(
             object. If not, only the default metrics DF will be computed.
         seed : Optional[int]
             Random seed for bootstrapping.
+        bootstrap_tol : Optional[float]
+            If specified, generate bootstrap samples in batches of
+            ``bootstrap_batch_size``, and stop as soon as the Monte Carlo
+            error of the bootstrapped 95% percentile interval endpoints of
+            every metric in ``bootstrap_tol_metrics`` falls below this
+            tolerance, using at most ``num_bootstrap_samples`` samples. The
+            number of samples used is stored in
+            ``num_bootstrap_samples_used``.
+        bootstrap_batch_size : int
+            Number of bootstrap samples to generate between convergence
+            checks when ``bootstrap_tol`` is specified.
+        bootstrap_tol_metrics : Sequence[str]
+            Names of metrics.scalars columns whose Monte Carlo error is
+            checked against ``bootstrap_tol``.
+        bootstrap_method : BootstrapMethod
+            How to generate each bootstrap sample. Possible values:
+                * "resample" - sample rows with replacement
+                * "poisson" - weight each row by an independent Poisson(1)
+                    count, which approximates resampling with replacement
+                * "bayesian" - weight each row by an independent Exp(1)
+                    weight, i.e. (up to normalization, which no rate or AUC
+                    depends on) by Dirichlet(1, ..., 1) weights, as in the
+                    Bayesian bootstrap
+            Since the "poisson" and "bayesian" weights are drawn for each row
+            independently, bootstrap samples of partitioned data can be
+            built partition by partition without a global resample. The
+            weights multiply the example counts (and any example weights and
+            values) before they are accumulated, and thresholds left with a
+            total count of 0 are dropped.
+        bootstrap_strata : Optional[str]
+            Name of a column to stratify bootstrap samples by, so that the
+            number of examples (or clusters) in each stratum is the same in
+            every sample. Passing the label column keeps the class counts
+            fixed. Null values form their own stratum. Not supported with
+            ``bootstrap_method="poisson"``, whose sample sizes vary.
+        bootstrap_cluster : Optional[str]
+            Name of a column of cluster IDs (e.g. a customer ID) whose
+            examples are correlated. If specified, whole clusters are
+            resampled (or weighted) instead of individual examples, by
+            drawing one multiplicity per cluster and applying it to every
+            example in the cluster. Clusters must not span strata.
+        num_imputations : int
+            Number of times to impute null labels (for each bootstrap sample)
+            with the ``null_fill_method``. Imputed curves and scalars are
+            numbered in an "_imputation" column. All imputations of a sample
+            share a single pass over the sorted scores with its default
+            metrics, so many imputations cost little more than one. The
+            first imputation of the non-bootstrapped sample is treated as the
+            main imputed curve, so that bootstrapped intervals of imputed
+            metrics also reflect the variability between imputations.
 
         Examples
         --------
@@ -162,14 +234,22 @@ class MetricsGenerator(
         self.label_column = label_column
         self.score_column = score_column
         self.weight_column = weight_column
+        self.value_columns = value_columns or []
         self.score_is_probability = score_is_probability
         self.reverse_thresh = reverse_thresh
         self.num_bootstrap_samples = num_bootstrap_samples
         self.imbalance_multiplier = imbalance_multiplier
         self.null_prob_column = null_prob_column
         self.null_fill_method = null_fill_method
-        self.null_probabilities = None
         self.seed = seed
+        self.bootstrap_tol = bootstrap_tol
+        self.bootstrap_batch_size = bootstrap_batch_size
+        self.bootstrap_tol_metrics = list(bootstrap_tol_metrics)
+        self.num_bootstrap_samples_used = num_bootstrap_samples
+        self.bootstrap_method = bootstrap_method
+        self.bootstrap_strata = bootstrap_strata
+        self.bootstrap_cluster = bootstrap_cluster
+        self.num_imputations = num_imputations
 
         # Metrics to be populated
         self.metrics: MetricsResult
@@ -184,6 +264,18 @@ class MetricsGenerator(
                 f"None, '0', '1', 'imb', or 'prob'."
             )
 
+        if bootstrap_method not in ["resample", "poisson", "bayesian"]:
+            raise ValueError(
+                f"Invalid bootstrap_method: {bootstrap_method}. Must be one of "
+                f"'resample', 'poisson', or 'bayesian'."
+            )
+
+        if bootstrap_strata is not None and bootstrap_method == "poisson":
+            raise ValueError(
+                "Stratified bootstrap is not supported with "
+                "bootstrap_method='poisson'."
+            )
+
         if predictions_df is not None:
             self.compute_all_metrics(predictions_df)
 
@@ -206,10 +298,8 @@ class MetricsGenerator(
             LOG.warning(" >>> WARNING: Labels contain null values.")
 
         # Keep only relevant columns
-        cols = [self.label_column, self.score_column]
-        if self.weight_column:
-            cols.append(self.weight_column)
-        df_sample = predictions_df[cols].copy()
+        df_sample = predictions_df[self._get_input_columns()].copy()
+        self._check_bootstrap_clusters(df_sample)
 
         # Sample input data if too large
         if len(df_sample) > self.max_num_examples:
@@ -220,40 +310,47 @@ class MetricsGenerator(
                 random_state=seed,
             )
 
-        # List configurations to compute
+        if self.null_fill_method == "prob":
+            self._check_null_probabilities(df_sample)
+
+        # List configurations to compute, imputing null labels (if needed)
+        # together with the default metrics of each bootstrap sample
         bootstrap_sample_options = [None, *range(self.num_bootstrap_samples)]
-        null_fill_methods = list(set([None, self.null_fill_method]))
-        all_options = itertools.product(
-            bootstrap_sample_options,
-            null_fill_methods,
-        )
+        tasks = [
+            (bootstrap_sample, self.null_fill_method, self._get_rng(i))
+            for i, bootstrap_sample in enumerate(bootstrap_sample_options)
+        ]
 
-        # Compute metrics
-        curves = pd.DataFrame()
-        scalars = pd.DataFrame()
+        # Compute metrics, in batches of bootstrap samples if adaptive. The
+        # input data is handed to each worker once, when it starts, rather
+        # than being pickled into every task.
+        results: List[MetricsResult] = []
         num_workers = psutil.cpu_count()
-        with Pool(num_workers) as pool:
-            for metrics in tqdm(
-                pool.starmap(
-                    self.compute_metrics,
-                    [
-                        (df_sample, *options, self._get_rng(i))
-                        for i, options in enumerate(all_options)
-                    ],
-                )
-            ):
-                curves = pd.concat([curves, metrics.curves])
-                scalars = pd.concat([scalars, metrics.scalars])
+        with Pool(
+            num_workers,
+            initializer=_init_worker,
+            initargs=(self, df_sample),
+        ) as pool:
+            for batch in self._get_task_batches(tasks):
+                results += pool.starmap(_compute_worker_metrics, batch)
+                if self._bootstrap_converged(results):
+                    break
 
-        # Separate imputed metrics from default metrics
-        curves_default = curves.loc[curves["_null_fill_method"].isnull()]
-        scalars_default = scalars.loc[scalars["_null_fill_method"].isnull()]
-        curves_imputed = curves.loc[curves["_null_fill_method"].notnull()]
-        scalars_imputed = scalars.loc[scalars["_null_fill_method"].notnull()]
+        curves = pd.concat([metrics.curves for metrics in tqdm(results)])
+        scalars = pd.concat([metrics.scalars for metrics in results])
+
+        # Collect imputed metrics, if any
+        curves_imputed = curves.iloc[:0]
+        scalars_imputed = scalars.iloc[:0]
+        if self.null_fill_method is not None:
+            curves_imputed = pd.concat([metrics.curves_imputed for metrics in results])
+            scalars_imputed = pd.concat(
+                [metrics.scalars_imputed for metrics in results]
+            )
 
         metrics = MetricsResult(
-            curves=curves_default,
-            scalars=scalars_default,
+            curves=curves,
+            scalars=scalars,
             curves_imputed=curves_imputed,
             scalars_imputed=scalars_imputed,
         )
@@ -268,6 +365,208 @@ class MetricsGenerator(
 
         return None
 
+    def _get_input_columns(self) -> List[str]:
+        """Get the names of the input columns used to compute metrics."""
+        cols: List[Optional[str]] = [self.label_column, self.score_column]
+        cols += [self.weight_column, *self.value_columns]
+        cols += [self.bootstrap_strata, self.bootstrap_cluster, self.null_prob_column]
+        return list(dict.fromkeys(col for col in cols if col is not None))
+
+    def _check_bootstrap_clusters(self, df: pd.DataFrame) -> None:
+        """Check that every bootstrap cluster is non-null and lies within a
+        single stratum, so that stratum sizes are fixed across samples."""
+        cluster, strata = self.bootstrap_cluster, self.bootstrap_strata
+        if cluster is None:
+            return
+        if df[cluster].isnull().any():
+            raise ValueError("Bootstrap cluster column contains null values.")
+        if strata is not None:
+            num_strata = df.groupby(cluster)[strata].nunique(dropna=False)
+            if num_strata.max() > 1:
+                raise ValueError(
+                    f"Bootstrap clusters span multiple strata: each value of "
+                    f"'{cluster}' must have a single value of '{strata}'."
+                )
+
+    def _get_null_prob_column(self) -> str:
+        """Get the column of label probabilities used to impute null labels."""
+        return self.null_prob_column or self.score_column
+
+    def _check_null_probabilities(self, df: pd.DataFrame) -> None:
+        """Check that null labels can be imputed from label probabilities."""
+        col = self._get_null_prob_column()
+        is_null = df[self.label_column].isnull() & df[self.score_column].notnull()
+        probs = df.loc[is_null, col].to_numpy(dtype=float)
+        if np.isnan(probs).any() or (probs < 0).any() or (probs > 1).any():
+            raise ValueError(
+                f"Column '{col}' must hold probabilities between 0 and 1 for "
+                "every example with a null label to use null_fill_method='prob'."
+            )
+
+    def _get_task_batches(self, tasks: List[tuple]) -> List[List[tuple]]:
+        """Split metrics computation tasks into batches of bootstrap samples.
+
+        The first batch holds the non-bootstrapped tasks. Without a
+        ``bootstrap_tol``, all tasks are computed in a single batch.
+        """
+        if self.bootstrap_tol is None:
+            return [tasks]
+        batch_size = self.bootstrap_batch_size
+        batch_ids = [
+            0 if task[0] is None else 1 + task[0] // batch_size for task in tasks
+        ]
+        return [
+            [task for task, i in zip(tasks, batch_ids) if i == batch_id]
+            for batch_id in sorted(set(batch_ids))
+        ]
+
+    def _bootstrap_converged(self, results: List[MetricsResult]) -> bool:
+        """Check whether the bootstrap Monte Carlo error is within tolerance.
+
+        Also records the number of bootstrap samples computed so far in
+        ``num_bootstrap_samples_used``.
+        """
+        scalars = pd.concat([metrics.scalars for metrics in results])
+        is_default = scalars["_null_fill_method"].isnull()
+        scalars = scalars.loc[is_default & scalars["_bootstrap_sample"].notnull()]
+        self.num_bootstrap_samples_used = len(scalars)
+        if self.bootstrap_tol is None or len(scalars) == 0:
+            return False
+
+        errors = {
+            metric: compute_quantile_mc_error(scalars[metric].to_numpy())
+            for metric in self.bootstrap_tol_metrics
+        }
+        converged = all(error <= self.bootstrap_tol for error in errors.values())
+        if converged:
+            print(
+                f"Bootstrap converged after {len(scalars)} samples "
+                f"(Monte Carlo error: {max(errors.values()):.2g})."
+            )
+        return converged
+
+    def query_operating_points(
+        self,
+        by: str,
+        values: Union[float, Sequence[float], np.ndarray],
+        columns: Optional[List[str]] = None,
+        conf: float = 0.95,
+        side: Side = "ge",
+        imputed: bool = False,
+    ) -> pd.DataFrame:
+        """Look up metrics at operating points, with bootstrapped CIs.
+
+        Parameters
+        ----------
+        by : str
+            Monotone metrics.curves column to look up operating points by,
+            e.g. "thresh", "recall", "fpr", or "frac".
+        values : Union[float, Sequence[float], np.ndarray]
+            Values of ``by`` at which to find operating points. For
+            ``side="ge"``, the operating point is the row with the smallest
+            value of ``by`` that is still at least the given value.
+        columns : Optional[List[str]]
+            metrics.curves columns to report at each operating point.
+        conf : float
+            Confidence level of the bootstrapped percentile intervals.
+        side : Side
+            Either "ge" or "le".
+        imputed : bool
+            Whether to query the imputed curves.
+
+        Examples
+        --------
+        >>> mg.query_operating_points("recall", 0.9, columns=["thresh"])
+        >>> mg.query_operating_points("frac", [0.01, 0.05], columns=["precision"])
+        """
+        curves, _ = self._get_metrics(imputed=imputed)
+        index = self._get_index(imputed=imputed)
+        return OperatingPointQuery(curves, index).query(
+            by=by,
+            values=values,
+            columns=columns,
+            conf=conf,
+            side=side,
+        )
+
+    def get_optimal_thresholds(
+        self,
+        cost_ratios: Union[float, Sequence[float], np.ndarray],
+        weighted: bool = False,
+        imputed: bool = False,
+    ) -> pd.DataFrame:
+        """Find the cost-optimal operating point of every curve.
+
+        For each ratio of the cost of a false positive to the cost of a false
+        negative, the optimal operating point of each (main or bootstrapped)
+        curve is the vertex of its ROC convex hull touched by an
+        iso-performance line with slope ``cost_ratio * num_neg / num_pos``,
+        using the class balance of that curve.
+
+        Parameters
+        ----------
+        cost_ratios : Union[float, Sequence[float], np.ndarray]
+            Ratios of false positive cost to false negative cost.
+        weighted : bool
+            Whether to use the weighted ROC curve and class balance.
+        imputed : bool
+            Whether to use the imputed curves.
+
+        Returns
+        -------
+        pd.DataFrame
+            Long DataFrame with one row per (curve, cost ratio), holding the
+            cost ratio, iso-performance slope, and the metrics.curves row at
+            the optimal operating point.
+
+        Examples
+        --------
+        >>> mg.get_optimal_thresholds([0.1, 1, 10])
+        """
+        curves, scalars = self._get_metrics(imputed=imputed)
+        index = self._get_index(imputed=imputed)
+        hull = ROCConvexHull(curves, index.offsets, weighted=weighted)
+
+        # Get the class balance of each curve, in curve order
+        _w = "tot_weight" if weighted else "num_examples"
+        positions = index.get_positions(scalars)
+        imbalance = np.full(index.num_curves, np.nan)
+        imbalance[positions] = scalars[_w + "_pos"] / (
+            scalars[_w + "_pos"] + scalars[_w + "_neg"]
+        )
+
+        ratios = np.atleast_1d(np.asarray(cost_ratios, dtype=float))
+        slopes = ROCConvexHull.get_slopes(ratios, imbalance)
+        points = hull.get_optimal_points(slopes)
+        points.insert(0, "cost_ratio", np.tile(ratios, index.num_curves))
+        return points
+
+    def fit_isotonic_calibration(self, weighted: bool = False) -> IsotonicCalibration:
+        """Fit an isotonic recalibration of scores to the main curve.
+
+        Since the main curve already holds the number of examples and
+        positives at each threshold, sorted by threshold, the fit is a single
+        pool-adjacent-violators pass over those thresholds.
+
+        Parameters
+        ----------
+        weighted : bool
+            Whether to fit to the weighted proportion positive.
+
+        Returns
+        -------
+        IsotonicCalibration
+            Monotone mapping from scores to calibrated probabilities.
+
+        Examples
+        --------
+        >>> iso = mg.fit_isotonic_calibration()
+        >>> df["calibrated_score"] = iso.predict(df["score"].values)
+        """
+        return IsotonicCalibration.from_curve(
+            self.metrics.get_curve(None), weighted=weighted
+        )
+
     def compute_metrics(
         self,
         predictions_df: pd.DataFrame,
@@ -275,42 +574,58 @@ class MetricsGenerator(
         null_fill_method: Optional[NullFillMethod] = None,
         rng: np.random.Generator = default_rng(),
     ) -> MetricsResult:
-        """Compute metrics for a single bootstrap sample."""
-
-        # Keep or drop nulls
-        if null_fill_method is None:
-            _df = predictions_df.dropna(subset=[self.label_column])
-        else:
-            _df = predictions_df
+        """Compute metrics for a single bootstrap sample.
 
-        # Make a bootstrap
-        if bootstrap_sample is not None:
-            _df = self._make_bootstrap(_df, rng)
+        If a ``null_fill_method`` is given, ``num_imputations`` imputed sets
+        of metrics are computed along with the default metrics, and stored in
+        ``curves_imputed`` and ``scalars_imputed``. Examples with known and
+        null labels are then bootstrapped separately, so the default metrics
+        are the same as those computed without a ``null_fill_method``.
+        """
 
-        # Impute null labels
-        labels = _df[self.label_column].values
-        if null_fill_method is not None:
-            labels = self._fill_null_labels(
-                labels=labels,
-                null_fill_method=null_fill_method,
-                null_probs=self.null_probabilities,
-                rng=rng,
+        # Make a bootstrap of the examples with known labels, and separately
+        # of those with null labels (if imputing), so that the default
+        # metrics use the same bootstrap as if nulls were dropped
+        is_null = predictions_df[self.label_column].isnull()
+        _df, counts = self._make_bootstrap_sample(
+            predictions_df.loc[~is_null], bootstrap_sample, rng
+        )
+        if null_fill_method is not None and is_null.any():
+            _df_null, counts_null = self._make_bootstrap_sample(
+                predictions_df.loc[is_null], bootstrap_sample, rng
             )
-            assert not np.isnan(labels).any()
+            _df = pd.concat([_df, _df_null])
+            if counts is not None and counts_null is not None:
+                counts = np.concatenate([counts, counts_null])
 
-        # Compute metrics
-        metrics = self._compute_metrics(
+        # Compute metrics, imputing null labels if requested
+        kwargs = dict(
             scores=_df[self.score_column].values,
-            labels=labels,
+            labels=_df[self.label_column].values.astype(float),
             weights=_df[self.weight_column].values if self.weight_column else None,
+            values={col: _df[col].values for col in self.value_columns},
             reverse_thresh=self.reverse_thresh,
+            counts=counts,
         )
+        if null_fill_method is None:
+            metrics = self._compute_metrics(**kwargs)  # type: ignore
+        else:
+            metrics = self._compute_imputed_metrics(
+                **kwargs,  # type: ignore
+                null_fill_method=null_fill_method,
+                null_probs=_df[self._get_null_prob_column()].values,
+                num_imputations=self.num_imputations,
+                rng=rng,
+            )
 
         # Attach metadata to output
-        metrics.curves["_bootstrap_sample"] = bootstrap_sample
-        metrics.curves["_null_fill_method"] = null_fill_method
-        metrics.scalars["_bootstrap_sample"] = bootstrap_sample
-        metrics.scalars["_null_fill_method"] = null_fill_method
+        for df in [metrics.curves, metrics.scalars]:
+            df["_bootstrap_sample"] = bootstrap_sample
+            df["_null_fill_method"] = None
+        for df in [metrics.curves_imputed, metrics.scalars_imputed]:
+            if df is not None:
+                df["_bootstrap_sample"] = bootstrap_sample
+                df["_null_fill_method"] = null_fill_method
 
         return metrics
 
@@ -319,7 +634,9 @@ class MetricsGenerator(
         scores: np.ndarray,
         labels: np.ndarray,
         weights: Optional[np.ndarray] = None,
+        values: Optional[Dict[str, np.ndarray]] = None,
         reverse_thresh: bool = False,
+        counts: Optional[np.ndarray] = None,
     ) -> MetricsResult:
         """Compute metrics.
 
@@ -333,6 +650,9 @@ class MetricsGenerator(
             be treated as negative examples.
         weights : Optional[np.ndarray]
             Array of weights associated with each example.
+        values : Optional[Dict[str, np.ndarray]]
+            Arrays of additional per-example values to accumulate over each
+            cell of the confusion matrix, keyed by name.
         reverse_thresh : bool
             Boolean indicating whether the score threshold should be treated as
             a lower bound on "positive" predictions (as is standard) or instead
@@ -340,6 +660,10 @@ class MetricsGenerator(
             reversed from standard so that any prediction falling BELOW a score
             threshold will be marked as positive, with all those falling above
             the threshold marked as negative.
+        counts : Optional[np.ndarray]
+            Array of (possibly non-integer) multiplicities of each example,
+            as generated by ``make_bootstrap_counts``. Defaults to 1 for
+            every example.
 
         Returns
         -------
@@ -349,109 +673,235 @@ class MetricsGenerator(
         if np.isnan(labels).any():
             raise ValueError("Labels contain null values.")
 
+        # Collapse identical threshold values
+        df = self._aggregate_thresholds(
+            scores, (labels > 0).astype(int), weights, values, counts
+        )
+
+        # Compute confusion matrix, rates, and AUCs
+        return compute_confusion_curves(
+            self._prepare_thresholds(df, reverse_thresh),
+            imbalance_multiplier=self.imbalance_multiplier,
+            value_columns=list(values or {}),
+        )
+
+    def _compute_imputed_metrics(
+        self,
+        scores: np.ndarray,
+        labels: np.ndarray,
+        null_fill_method: NullFillMethod,
+        weights: Optional[np.ndarray] = None,
+        values: Optional[Dict[str, np.ndarray]] = None,
+        reverse_thresh: bool = False,
+        counts: Optional[np.ndarray] = None,
+        null_probs: Optional[np.ndarray] = None,
+        num_imputations: int = 1,
+        rng: np.random.Generator = default_rng(),
+    ) -> MetricsResult:
+        """Compute default metrics and metrics with imputed null labels.
+
+        Scores are grouped into thresholds once. Examples with known labels
+        contribute fixed per-threshold counts, which are shared by the default
+        metrics (which ignore examples with null labels) and by every
+        imputation. The imputed labels of the examples with null labels are
+        drawn as a (num_imputations, num_null)-dim Bernoulli matrix, and
+        reduced to per-threshold positive counts with a single ``bincount``,
+        after which the confusion matrices of all imputations are computed in
+        one segmented pass.
+
+        Parameters
+        ----------
+        scores : np.ndarray
+            Array of scores.
+        labels : np.ndarray
+            Array of labels, some of which may be null.
+        null_fill_method : NullFillMethod
+            Method to use when filling null labels; see
+            ``_get_fill_probabilities``.
+        weights : Optional[np.ndarray]
+            Array of weights associated with each example.
+        values : Optional[Dict[str, np.ndarray]]
+            Arrays of additional per-example values to accumulate over each
+            cell of the confusion matrix, keyed by name.
+        reverse_thresh : bool
+            Whether the score threshold should be treated as an upper bound on
+            "positive" predictions.
+        counts : Optional[np.ndarray]
+            Array of multiplicities of each example. Defaults to 1 for every
+            example.
+        null_probs : Optional[np.ndarray]
+            Array of probabilities to use when filling null labels. Only
+            required if ``null_fill_method`` is "prob".
+        num_imputations : int
+            Number of times to impute the null labels.
+        rng : np.random.Generator
+            Random generator.
+
+        Returns
+        -------
+        MetricsResult
+            Default metrics in ``curves`` and ``scalars``, and the metrics of
+            every imputation, numbered in an "_imputation" column, in
+            ``curves_imputed`` and ``scalars_imputed``.
+        """
+        is_null = np.isnan(labels)
+        is_pos = (labels > 0).astype(int)
+        if counts is None:
+            counts = np.ones(len(scores), dtype=int)
+        if weights is None:
+            weights = np.ones(len(scores))
+        values = values or {}
+
+        # Collapse identical threshold values, with null-label examples
+        # counted (as negatives) separately, aligned to the same thresholds
+        known = self._aggregate_thresholds(
+            scores, is_pos, weights, values, counts * ~is_null
+        )
+        null = self._aggregate_thresholds(
+            scores[is_null],
+            is_pos[is_null],
+            weights[is_null],
+            {name: value[is_null] for name, value in values.items()},
+            counts[is_null],
+        )
+        null = null.set_index("thresh").reindex(known["thresh"], fill_value=0)
+        default = compute_confusion_curves(
+            self._prepare_thresholds(known, reverse_thresh),
+            imbalance_multiplier=self.imbalance_multiplier,
+            value_columns=list(values),
+        )
+
+        # Every null-label example is negative until imputed
+        totals = known.copy()
+        for col in ["weight", "num"] + [f"value_{name}" for name in values]:
+            totals[col] = totals[col] + null[col].to_numpy()
+        totals = self._prepare_thresholds(totals, reverse_thresh)
+        length = len(totals)
+
+        # Find the row of each null-label example's threshold
+        thresh = totals["thresh"].to_numpy()[1:]
+        direction = -1 if reverse_thresh else 1
+        fill = is_null & ~np.isnan(scores)
+        rows = 1 + np.searchsorted(direction * thresh, direction * scores[fill])
+        rows = np.minimum(rows, length - 1)
+
+        # Draw every imputation at once, and sum positives over thresholds
+        probs = self._get_fill_probabilities(
+            labels, null_fill_method, null_probs, counts
+        )
+        draws = rng.random((num_imputations, fill.sum())) < probs[fill]
+        bins = (length * np.arange(num_imputations)[:, None] + rows).ravel()
+
+        def sum_positives(x: np.ndarray) -> np.ndarray:
+            weights = (draws * x[fill]).ravel()
+            return np.bincount(bins, weights, minlength=num_imputations * length)
+
+        imputed = totals.iloc[np.tile(np.arange(length), num_imputations)]
+        imputed = imputed.reset_index(drop=True)
+        positives = sum_positives(counts)
+        if np.issubdtype(imputed["label"].dtype, np.integer):
+            positives = positives.round().astype(int)
+        imputed["label"] = imputed["label"] + positives
+        imputed["weight_pos"] = imputed["weight_pos"] + sum_positives(counts * weights)
+        for name, value in values.items():
+            col = f"value_pos_{name}"
+            imputed[col] = imputed[col] + sum_positives(counts * value)
+
+        metrics = compute_confusion_curves(
+            imputed,
+            offsets=length * np.arange(num_imputations + 1),
+            imbalance_multiplier=self.imbalance_multiplier,
+            value_columns=list(values),
+        )
+        metrics.curves["_imputation"] = np.repeat(np.arange(num_imputations), length)
+        metrics.scalars["_imputation"] = np.arange(num_imputations)
+
+        return MetricsResult(
+            curves=default.curves,
+            scalars=default.scalars,
+            curves_imputed=metrics.curves,
+            scalars_imputed=metrics.scalars,
+        )
+
+    @staticmethod
+    def _aggregate_thresholds(
+        scores: np.ndarray,
+        is_pos: np.ndarray,
+        weights: Optional[np.ndarray] = None,
+        values: Optional[Dict[str, np.ndarray]] = None,
+        counts: Optional[np.ndarray] = None,
+    ) -> pd.DataFrame:
+        """Collapse examples with identical scores into per-threshold sums.
+
+        Returns
+        -------
+        pd.DataFrame
+            Per-threshold aggregates, sorted by increasing threshold, with the
+            "thresh", "label", "weight", "weight_pos", and "num" columns (and
+            "value_<name>" and "value_pos_<name>" columns for each value)
+            expected by ``compute_confusion_curves``.
+        """
+        if counts is None:
+            counts = np.ones(len(scores), dtype=int)
+        if weights is None:
+            weights = np.ones(len(scores))
+
         # Put arrays into DataFrame, treating scores as thresholds
         df = pd.DataFrame(
             {
                 "thresh": scores,
-                "label": (labels > 0).astype(int),
-                "weight": weights if weights is not None else np.ones(len(scores)),
+                "label": is_pos * counts,
+                "weight": weights * counts,
+                "weight_pos": is_pos * weights * counts,
+                "num": counts,
             },
         )
-        df["weight_pos"] = df["label"] * df["weight"]
-
-        # Collapse identical threshold values, and sort
-        df = (
-            df.groupby("thresh")
-            .agg(
-                label=("label", "sum"),
-                weight=("weight", "sum"),
-                weight_pos=("weight_pos", "sum"),
-                num=("label", "count"),
-            )
-            .reset_index()
-        )
-        df = df.sort_values("thresh", ascending=not reverse_thresh)
+        for name, value in (values or {}).items():
+            df[f"value_{name}"] = value * counts
+            df[f"value_pos_{name}"] = is_pos * df[f"value_{name}"]
+
+        return df.groupby("thresh").sum().reset_index()
+
+    @staticmethod
+    def _prepare_thresholds(
+        df: pd.DataFrame,
+        reverse_thresh: bool = False,
+    ) -> pd.DataFrame:
+        """Sort per-threshold aggregates and add an extra threshold value."""
 
-        # Compute scalar values
-        _num_examples = df["num"].sum()
-        _num_examples_pos = df["label"].sum()
-        num_examples_pos = _num_examples_pos * self.imbalance_multiplier
-        num_examples_neg = _num_examples - _num_examples_pos
-        num_examples = num_examples_pos + num_examples_neg
-        _tot_weight = df["weight"].sum()
-        _tot_weight_pos = df["weight_pos"].sum()
-        tot_weight_pos = _tot_weight_pos * self.imbalance_multiplier
-        tot_weight_neg = _tot_weight - _tot_weight_pos
-        tot_weight = tot_weight_pos + tot_weight_neg
-        imbalance = num_examples_pos / (num_examples_pos + num_examples_neg)
+        # Drop thresholds with no examples, so that only the extra threshold
+        # value added below has a "num" of 0
+        df = df.loc[df["num"] > 0]
+        df = df.sort_values("thresh", ascending=not reverse_thresh)
 
         # Add extra threshold value
         epsilon = 1e-6
         multiplier = 1 if reverse_thresh else -1
         extra_thresh = df.iloc[0]["thresh"] + multiplier * epsilon
-        extra_row = pd.DataFrame([[extra_thresh, 0, 0, 0, 0]], columns=df.columns)
-        df = pd.concat([extra_row, df]).reset_index(drop=True)
-
-        # Compute confusion matrix
-        df["pred_neg"] = df["num"].cumsum()
-        df["pred_pos"] = _num_examples - df["pred_neg"]
-        df["fn"] = df["label"].cumsum()
-        df["tn"] = df["pred_neg"] - df["fn"]
-        df["tp"] = _num_examples_pos - df["fn"]
-        df["fp"] = _num_examples - df["pred_neg"] - df["tp"]
-        df["pred_pos"] *= self.imbalance_multiplier
-        df["fn"] *= self.imbalance_multiplier
-        df["tp"] *= self.imbalance_multiplier
-
-        df["recall"] = df["tp"] / (df["tp"] + df["fn"])
-        df["precision"] = df["tp"] / (df["tp"] + df["fp"])
-        df["frac"] = df["pred_pos"] / num_examples
-        df["f1"] = 2 * df["precision"] * df["recall"] / (df["precision"] + df["recall"])
-        df["fpr"] = df["fp"] / num_examples_neg
-        df["fdr"] = df["fp"] / (df["fp"] + df["tp"])
-        df["recall_gain"] = self._compute_gain(df["recall"], imbalance)
-        df["precision_gain"] = self._compute_gain(df["precision"], imbalance)
-
-        # Compute weighted confusion matrix
-        df["pred_neg_w"] = df["weight"].cumsum()
-        df["pred_pos_w"] = _tot_weight - df["pred_neg_w"]
-        df["fn_w"] = df["weight_pos"].cumsum()
-        df["tn_w"] = df["pred_neg_w"] - df["fn_w"]
-        df["tp_w"] = _tot_weight_pos - df["fn_w"]
-        df["fp_w"] = _tot_weight - df["pred_neg_w"] - df["tp_w"]
-        df["pred_pos_w"] *= self.imbalance_multiplier
-        df["fn_w"] *= self.imbalance_multiplier
-        df["tp_w"] *= self.imbalance_multiplier
-
-        df["recall_w"] = df["tp_w"] / (df["tp_w"] + df["fn_w"])
-        df["precision_w"] = df["tp_w"] / (df["tp_w"] + df["fp_w"])
-        df["frac_w"] = df["pred_pos_w"] / tot_weight
-        df["fpr_w"] = df["fp_w"] / tot_weight_neg
-        df["fdr_w"] = df["fp_w"] / (df["fp_w"] + df["tp_w"])
-
-        # Fill nulls
-        df.fillna({col: 0 for col in df.columns if col != "label"}, inplace=True)
-
-        # Scalars
-        scalars = {
-            "num_examples": num_examples,
-            "num_examples_pos": num_examples_pos,
-            "num_examples_neg": num_examples_neg,
-            "tot_weight": tot_weight,
-            "tot_weight_pos": tot_weight_pos,
-            "tot_weight_neg": tot_weight_neg,
-            "imbalance": imbalance,
-            "roc_auc": np.abs(trapezoid(df["recall"], df["fpr"])),
-            "pr_auc": np.abs(trapezoid(df["precision"], df["recall"])),
-            "rf_auc": np.abs(trapezoid(df["recall"], df["frac"])),
-            "roc_auc_w": np.abs(trapezoid(df["recall_w"], df["fpr_w"])),
-            "pr_auc_w": np.abs(trapezoid(df["precision_w"], df["recall_w"])),
-            "rf_auc_w": np.abs(trapezoid(df["recall_w"], df["frac_w"])),
-            "prg_auc": np.abs(trapezoid(df["precision_gain"], df["recall_gain"])),
-        }
-        scalars = pd.DataFrame([scalars])
+        extra_row = pd.DataFrame(
+            [[extra_thresh] + [0] * (len(df.columns) - 1)],
+            columns=df.columns,
+        )
+        return pd.concat([extra_row, df]).reset_index(drop=True)
 
-        return MetricsResult(curves=df, scalars=scalars)
+    def _make_bootstrap_sample(
+        self,
+        df: pd.DataFrame,
+        bootstrap_sample: Optional[int],
+        rng: np.random.Generator = default_rng(),
+    ) -> Tuple[pd.DataFrame, Optional[np.ndarray]]:
+        """Make a bootstrap sample, either by resampling or by weighting rows.
+
+        Returns the (possibly resampled) DataFrame, and the multiplicity of
+        each of its rows (or `None` if every row counts once).
+        """
+        if bootstrap_sample is None:
+            return df, None
+        if self.bootstrap_strata or self.bootstrap_cluster:
+            return df, self._make_grouped_bootstrap_counts(df, rng)
+        if self.bootstrap_method == "resample":
+            return self._make_bootstrap(df, rng), None
+        return df, make_bootstrap_counts(len(df), self.bootstrap_method, rng)
 
     def _make_bootstrap(
         self,
@@ -472,14 +922,37 @@ class MetricsGenerator(
             random_state=random_state,
         )
 
-    def _fill_null_labels(
+    def _make_grouped_bootstrap_counts(
         self,
+        df: pd.DataFrame,
+        rng: np.random.Generator = default_rng(),
+    ) -> np.ndarray:
+        """Make per-example multiplicities for a stratified or cluster bootstrap.
+
+        Each example is mapped to an integer cluster code (or its own code, if
+        there is no cluster column), and each cluster to a stratum code, so
+        that only one multiplicity per cluster needs to be drawn.
+        """
+        if self.bootstrap_cluster is None:
+            clusters = np.arange(len(df))
+        else:
+            clusters = get_group_codes(df[self.bootstrap_cluster])
+        strata = np.zeros(clusters.max() + 1 if len(df) else 0, dtype=int)
+        if self.bootstrap_strata is not None:
+            strata[clusters] = get_group_codes(df[self.bootstrap_strata])
+        multiplicities = make_grouped_bootstrap_counts(
+            strata, self.bootstrap_method, rng
+        )
+        return multiplicities[clusters]
+
+    @staticmethod
+    def _get_fill_probabilities(
         labels: np.ndarray,
         null_fill_method: NullFillMethod,
         null_probs: Optional[np.ndarray] = None,
-        rng: np.random.Generator = default_rng(),
+        counts: Optional[np.ndarray] = None,
     ) -> np.ndarray:
-        """Fill null labels according to the specified method.
+        """Get the probability that each null label is filled with 1.
 
         Parameters
         ----------
@@ -496,40 +969,168 @@ class MetricsGenerator(
         null_probs : Optional[np.ndarray]
             Array of probabilities to use when filling null labels. Only
             required if ``null_fill_method`` is "prob".
+        counts : Optional[np.ndarray]
+            Array of multiplicities of each example.
         """
-        labels = labels.astype(float)
-        imbalance = (labels > 0).sum() / len(labels)
+        if counts is None:
+            counts = np.ones(len(labels))
         if null_fill_method == "0":
-            return np.where(np.isnan(labels), 0, labels)
+            return np.zeros(len(labels))
         if null_fill_method == "1":
-            return np.where(np.isnan(labels), 1, labels)
+            return np.ones(len(labels))
         if null_fill_method == "imb":
-            labels_from_imb = (rng.random(*labels.shape) < imbalance).astype(int)
-            return np.where(np.isnan(labels), labels_from_imb, labels)
+            imbalance = ((labels > 0) * counts).sum() / counts.sum()
+            return np.full(len(labels), imbalance)
         if null_fill_method == "prob":
             if null_probs is None:
                 raise ValueError(
                     "Must provide null_probs when using null_fill_method='prob'."
                 )
-            return np.where(
-                np.isnan(labels),
-                (rng.random(*labels.shape) < null_probs).astype(int),
-                labels,
-            )
+            return np.asarray(null_probs, dtype=float)
+        raise ValueError(f"Invalid null_fill_method: {null_fill_method}.")
 
-    @staticmethod
-    def _compute_gain(
-        metric: np.ndarray,
-        imbalance: float,
-    ) -> np.ndarray:
-        """Compute "gain".
 
-        As defined in the "Precision-Recall-Gain" paper
-        `here <https://papers.nips.cc/paper/2015/file/33e8075e9970de0cfea955afd464\
-        4bb2-Paper.pdf>`_.
-        """
-        return np.clip(
-            (metric - imbalance) / ((1 - imbalance) * metric),
-            a_min=0,
-            a_max=1,
-        )
+def _init_worker(generator: MetricsGenerator, predictions_df: pd.DataFrame) -> None:
+    """Store the generator and input data in a worker process."""
+    _WORKER_STATE["generator"] = generator
+    _WORKER_STATE["predictions_df"] = predictions_df
+
+
+def _compute_worker_metrics(
+    bootstrap_sample: Optional[int],
+    null_fill_method: Optional[NullFillMethod],
+    rng: np.random.Generator,
+) -> MetricsResult:
+    """Compute metrics for a single bootstrap sample in a worker process."""
+    generator = _WORKER_STATE["generator"]
+    assert isinstance(generator, MetricsGenerator)
+    return generator.compute_metrics(
+        _WORKER_STATE["predictions_df"],  # type: ignore
+        bootstrap_sample,
+        null_fill_method,
+        rng,
+    )
+
+
+def make_bootstrap_counts(
+    num_examples: int,
+    bootstrap_method: BootstrapMethod,
+    rng: np.random.Generator = default_rng(),
+) -> np.ndarray:
+    """Generate per-example multiplicities for a weighted bootstrap sample.
+
+    Parameters
+    ----------
+    num_examples : int
+        Number of examples.
+    bootstrap_method : BootstrapMethod
+        Either "poisson", for independent Poisson(1) counts, or "bayesian",
+        for independent Exp(1) weights (which are Dirichlet(1, ..., 1)
+        weights once normalized to sum to 1).
+    rng : np.random.Generator
+        Random generator.
+
+    Returns
+    -------
+    np.ndarray
+        Array of ``num_examples`` non-negative multiplicities with mean 1.
+    """
+    if bootstrap_method == "poisson":
+        return rng.poisson(1, size=num_examples)
+    if bootstrap_method == "bayesian":
+        return rng.exponential(1, size=num_examples)
+    raise ValueError(
+        f"Invalid bootstrap_method: {bootstrap_method}. Must be one of "
+        f"'poisson' or 'bayesian'."
+    )
+
+
+def make_grouped_bootstrap_counts(
+    strata: np.ndarray,
+    bootstrap_method: BootstrapMethod,
+    rng: np.random.Generator = default_rng(),
+) -> np.ndarray:
+    """Generate per-unit multiplicities for a stratified bootstrap sample.
+
+    Parameters
+    ----------
+    strata : np.ndarray
+        Array of integer stratum codes, one for each sampling unit (an
+        example or a cluster of examples).
+    bootstrap_method : BootstrapMethod
+        With "resample", each stratum of ``n`` units is resampled with
+        replacement ``n`` times, so the multiplicities of each stratum sum to
+        ``n``. With "bayesian", Exp(1) weights are normalized to sum to ``n``
+        within each stratum. With "poisson", independent Poisson(1) counts
+        are drawn, and all units must be in the same stratum.
+    rng : np.random.Generator
+        Random generator.
+
+    Returns
+    -------
+    np.ndarray
+        Array of non-negative multiplicities, one for each unit.
+    """
+    num_units = len(strata)
+    sizes = np.bincount(strata)
+    if bootstrap_method == "poisson":
+        if (sizes > 0).sum() > 1:
+            raise ValueError("Stratified bootstrap is not supported with 'poisson'.")
+        return make_bootstrap_counts(num_units, bootstrap_method, rng)
+    if bootstrap_method == "bayesian":
+        weights = make_bootstrap_counts(num_units, bootstrap_method, rng)
+        totals = np.bincount(strata, weights=weights)
+        return weights * sizes[strata] / totals[strata]
+
+    # Fill one draw per unit with a random unit from the same stratum
+    order = np.argsort(strata, kind="stable")
+    starts = np.cumsum(sizes) - sizes
+    draws = starts[strata] + (rng.random(num_units) * sizes[strata]).astype(int)
+    return np.bincount(order[draws], minlength=num_units)
+
+
+def get_group_codes(values: pd.Series) -> np.ndarray:
+    """Get integer codes of the distinct values of a Series, including null."""
+    return values.groupby(values, dropna=False, sort=False).ngroup().to_numpy()
+
+
+def compute_quantile_mc_error(
+    values: np.ndarray,
+    conf: float = 0.95,
+) -> float:
+    """Estimate the Monte Carlo error of bootstrap percentile interval bounds.
+
+    The number of bootstrap samples falling below the ``q``-quantile of the
+    bootstrap distribution is ``Binomial(B, q)``, so the order statistics at
+    ranks ``B * q -/+ sqrt(B * q * (1 - q))`` bracket the sample quantile by
+    about one standard error. Half the distance between them estimates the
+    standard error of each interval bound, without any further resampling.
+    If there are too few samples for those ranks to exist (e.g. fewer than
+    about 100 for a 95% interval), the error is treated as infinite.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Values of a metric across B bootstrap samples.
+    conf : float
+        Confidence level of the percentile interval.
+
+    Returns
+    -------
+    float
+        Larger of the estimated standard errors of the lower and upper
+        interval bounds.
+    """
+    x = np.sort(values[~np.isnan(values)])
+    num_samples = len(x)
+    errors = []
+    for q in [(1 - conf) / 2, (1 + conf) / 2]:
+        spread = np.sqrt(num_samples * q * (1 - q))
+        lo = int(np.floor(num_samples * q - spread))
+        hi = int(np.ceil(num_samples * q + spread))
+
+        # Too few samples to bracket this far into the tail
+        if lo < 0 or hi > num_samples - 1:
+            return np.inf
+        errors.append((x[hi] - x[lo]) / 2)
+    return max(errors)
@@ -0,0 +1,214 @@
+from typing import List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from clscurves.query import batched_searchsorted, get_monotone_direction
+
+
+class ROCConvexHull:
+    """A class to find cost-optimal operating points on many ROC curves.
+
+    The ROC convex hull of a curve is the set of operating points which are
+    optimal for some ratio of misclassification costs. For a given slope
+    ``m = (fp_cost / fn_cost) * (num_neg / num_pos)``, the optimal operating
+    point is the hull vertex touched by an iso-performance line of slope
+    ``m``. Since hull edge slopes are monotone along each curve, the optimal
+    vertices for a whole vector of slopes, on every bootstrapped curve, are
+    found with a single batched binary search over the edge slopes.
+
+    Parameters
+    ----------
+    curves : pd.DataFrame
+        metrics.curves DataFrame, with the rows of each curve contiguous.
+    offsets : Optional[np.ndarray]
+        Array of length ``S + 1`` marking the row at which each of the ``S``
+        curves starts (with the final entry equal to ``len(curves)``). If not
+        provided, ``curves`` is treated as a single curve.
+    weighted : bool
+        Whether to use the weighted ("fpr_w", "recall_w") instead of the
+        unweighted ("fpr", "recall") ROC curve.
+
+    Examples
+    --------
+    >>> hull = ROCConvexHull(curves, offsets)
+    >>> slopes = ROCConvexHull.get_slopes([0.1, 1, 10], imbalance=0.2)
+    >>> hull.get_optimal_thresholds(slopes)
+    """
+
+    def __init__(
+        self,
+        curves: pd.DataFrame,
+        offsets: Optional[np.ndarray] = None,
+        weighted: bool = False,
+    ) -> None:
+        offsets = np.array([0, len(curves)]) if offsets is None else offsets
+        self.x_col = "fpr_w" if weighted else "fpr"
+        self.y_col = "recall_w" if weighted else "recall"
+        x = curves[self.x_col].to_numpy(dtype=float)
+        y = curves[self.y_col].to_numpy(dtype=float)
+
+        # Keep only hull vertices, recording where each curve's vertices start
+        mask = upper_hull_mask(x, y, offsets)
+        segment = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+        self.curves = curves.iloc[mask]
+        self.offsets = np.zeros(len(offsets), dtype=int)
+        self.offsets[1:] = np.cumsum(
+            np.bincount(segment[mask], minlength=len(offsets) - 1)
+        )
+
+        # Slope of the edge leaving each vertex, with +/- inf after the last
+        x, y = x[mask], y[mask]
+        self.direction = get_monotone_direction(x, self.offsets) or 1
+        with np.errstate(divide="ignore", invalid="ignore"):
+            slopes = np.diff(y) / np.diff(x)
+        slopes[np.diff(x) == 0] = np.inf
+        self.edge_slopes = np.append(slopes, np.nan)
+        self.edge_slopes[self.offsets[1:] - 1] = -self.direction * np.inf
+
+    @staticmethod
+    def get_slopes(
+        cost_ratios: Union[float, np.ndarray],
+        imbalance: Union[float, np.ndarray],
+    ) -> np.ndarray:
+        """Get the iso-performance line slopes for given costs and priors.
+
+        Parameters
+        ----------
+        cost_ratios : Union[float, np.ndarray]
+            Ratio of the cost of a false positive to the cost of a false
+            negative.
+        imbalance : Union[float, np.ndarray]
+            Fraction of examples which are positive (as in the "imbalance"
+            scalar metric). If an array of one value per curve, the result
+            has one row of slopes per curve.
+
+        Returns
+        -------
+        np.ndarray
+            Slopes, of shape ``(len(cost_ratios),)`` or ``(len(imbalance),
+            len(cost_ratios))``.
+        """
+        cost_ratios = np.atleast_1d(np.asarray(cost_ratios, dtype=float))
+        imbalance = np.asarray(imbalance, dtype=float)
+        with np.errstate(divide="ignore"):
+            odds = (1 - imbalance) / imbalance
+        return np.multiply.outer(odds, cost_ratios)
+
+    def get_optimal_rows(self, slopes: Union[float, np.ndarray]) -> np.ndarray:
+        """Find the hull vertex of each curve which is optimal for each slope.
+
+        Parameters
+        ----------
+        slopes : Union[float, np.ndarray]
+            Iso-performance line slopes, either a length-K array shared by
+            all curves or an (S, K)-dim array with one row per curve.
+
+        Returns
+        -------
+        np.ndarray
+            (S, K)-dim array of positional row indices into ``self.curves``.
+        """
+        num_curves = len(self.offsets) - 1
+        m = np.atleast_1d(np.asarray(slopes, dtype=float))
+        m = np.broadcast_to(m, (num_curves, m.shape[-1]))
+
+        # Edge slopes decrease as x increases, so search in increasing order
+        a = -self.direction * self.edge_slopes
+        lo = np.broadcast_to(self.offsets[:-1, None], m.shape)
+        hi = np.broadcast_to(self.offsets[1:, None], m.shape)
+        rows = batched_searchsorted(a, lo, hi, -self.direction * m)
+        return np.clip(rows, lo, hi - 1)
+
+    def get_optimal_points(self, slopes: Union[float, np.ndarray]) -> pd.DataFrame:
+        """Get the optimal operating point of each curve for each slope.
+
+        Returns
+        -------
+        pd.DataFrame
+            Long DataFrame with one row per (curve, slope), holding the slope
+            and the row of ``self.curves`` at the optimal operating point.
+        """
+        slopes = np.atleast_1d(np.asarray(slopes, dtype=float))
+        rows = self.get_optimal_rows(slopes)
+        points = self.curves.iloc[rows.ravel()].reset_index(drop=True)
+        points.insert(0, "slope", np.broadcast_to(slopes, rows.shape).ravel())
+        return points
+
+    def get_optimal_thresholds(self, slopes: Union[float, np.ndarray]) -> np.ndarray:
+        """Get the (S, K)-dim array of optimal thresholds for each slope."""
+        rows = self.get_optimal_rows(slopes)
+        return self.curves["thresh"].to_numpy()[rows]
+
+
+def upper_hull_mask(
+    x: np.ndarray,
+    y: np.ndarray,
+    offsets: np.ndarray,
+) -> np.ndarray:
+    """Find the vertices of the upper convex hull of one or more curves.
+
+    Each curve is the slice ``offsets[i]:offsets[i + 1]`` of ``x`` and ``y``,
+    and its points must already be sorted by ``x`` (in either direction), as
+    is the case for the ("fpr", "recall") points of an ROC curve, whose upper
+    hull is the ROC convex hull. This relies on the sort order to find each
+    hull with a single monotone chain (Andrew's algorithm) pass: points are
+    pushed onto a stack, and each new point pops every point on or below the
+    chord from the point beneath it on the stack, so each point is pushed and
+    popped at most once and the total cost is O(N). The first and last point
+    of each curve are always kept.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Concatenated x values of all curves.
+    y : np.ndarray
+        Concatenated y values of all curves.
+    offsets : np.ndarray
+        Array of length ``S + 1`` marking the row at which each of the ``S``
+        curves starts (with the final entry equal to ``len(x)``).
+
+    Returns
+    -------
+    np.ndarray
+        Boolean array marking the rows which are hull vertices.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    first = offsets[:-1]
+
+    # Drop repeated points, which would otherwise each justify the other's
+    # removal as being on the chord between its neighbors
+    repeated = np.zeros(len(x), dtype=bool)
+    repeated[1:] = (x[1:] == x[:-1]) & (y[1:] == y[:-1])
+    repeated[first] = False
+    candidate = np.isfinite(x) & np.isfinite(y) & ~repeated
+
+    mask = np.zeros(len(x), dtype=bool)
+    for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist()):
+        rows = start + np.flatnonzero(candidate[start:end])
+        if len(rows):
+            mask[rows[_monotone_chain(x[rows], y[rows])]] = True
+    return mask
+
+
+def _monotone_chain(x: np.ndarray, y: np.ndarray) -> List[int]:
+    """Get the positions of the upper hull vertices of points sorted by x."""
+    # Orient the cross product so that curves sorted by decreasing x work too
+    direction = -1 if x[-1] < x[0] else 1
+    xs, ys = x.tolist(), y.tolist()
+    stack: List[int] = []
+    for i, (x2, y2) in enumerate(zip(xs, ys)):
+        while len(stack) > 1:
+            x0, y0 = xs[stack[-2]], ys[stack[-2]]
+            x1, y1 = xs[stack[-1]], ys[stack[-1]]
+            dx1, dy1, dx2, dy2 = x1 - x0, y1 - y0, x2 - x1, y2 - y1
+            cross = dx1 * dy2 - dy1 * dx2
+
+            # Treat points within rounding error of the chord as on the chord
+            tol = 1e-12 * (abs(dx1 * dy2) + abs(dy1 * dx2))
+            if direction * cross < -tol:
+                break
+            stack.pop()
+        stack.append(i)
+    return stack
@@ -0,0 +1,140 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+class IsotonicCalibration:
+    """A piecewise-constant, monotone mapping from scores to probabilities.
+
+    The mapping is fit by isotonic regression of labels on scores, using the
+    pool-adjacent-violators (PAV) algorithm on per-threshold label counts.
+    Since the curves computed by the metrics generator already hold these
+    counts sorted by threshold, the fit takes a single O(T) pass over the T
+    unique thresholds of a curve, without re-sorting any examples. The fitted
+    mapping is stored compactly as the lowest score and the probability of
+    each block of pooled thresholds, and is applied to new scores with
+    ``np.searchsorted``.
+
+    Parameters
+    ----------
+    thresholds : np.ndarray
+        Increasing array of the lowest score in each block.
+    values : np.ndarray
+        Calibrated probability of each block.
+
+    Examples
+    --------
+    >>> iso = IsotonicCalibration.from_curve(mg.metrics.get_curve(None))
+    >>> iso.predict(new_scores)
+    """
+
+    def __init__(self, thresholds: np.ndarray, values: np.ndarray) -> None:
+        self.thresholds = np.asarray(thresholds, dtype=float)
+        self.values = np.asarray(values, dtype=float)
+
+    @classmethod
+    def from_curve(
+        cls,
+        curve: pd.DataFrame,
+        weighted: bool = False,
+    ) -> "IsotonicCalibration":
+        """Fit the mapping from the per-threshold counts of a single curve.
+
+        Parameters
+        ----------
+        curve : pd.DataFrame
+            Rows of a single curve of metrics.curves, holding the "thresh",
+            "label", and "num" (and "weight_pos" and "weight") columns, in
+            the order of the curve. Rows with no examples are ignored.
+        weighted : bool
+            Whether to fit to the weighted ("weight_pos" / "weight") instead
+            of the unweighted ("label" / "num") proportion positive.
+        """
+        pos_col, num_col = ("weight_pos", "weight") if weighted else ("label", "num")
+        curve = curve.loc[curve[num_col] > 0]
+        thresh = curve["thresh"].to_numpy(dtype=float)
+        pos = curve[pos_col].to_numpy(dtype=float)
+        num = curve[num_col].to_numpy(dtype=float)
+
+        # Fit probabilities increasing in score, whichever the curve order
+        if len(thresh) > 1 and thresh[0] > thresh[-1]:
+            thresh, pos, num = thresh[::-1], pos[::-1], num[::-1]
+        starts, values = pool_adjacent_violators(pos, num)
+        return cls(thresh[starts], values)
+
+    @classmethod
+    def fit(
+        cls,
+        scores: np.ndarray,
+        labels: np.ndarray,
+        weights: Optional[np.ndarray] = None,
+    ) -> "IsotonicCalibration":
+        """Fit the mapping to raw scores and binary labels.
+
+        Parameters
+        ----------
+        scores : np.ndarray
+            Array of scores.
+        labels : np.ndarray
+            Binary array of labels.
+        weights : Optional[np.ndarray]
+            Array of weights associated with each example.
+        """
+        weights = np.ones(len(scores)) if weights is None else weights
+        thresh, codes = np.unique(scores, return_inverse=True)
+        pos = np.bincount(codes, weights * (np.asarray(labels) > 0), len(thresh))
+        num = np.bincount(codes, weights, len(thresh))
+        keep = num > 0
+        starts, values = pool_adjacent_violators(pos[keep], num[keep])
+        return cls(thresh[keep][starts], values)
+
+    def predict(self, scores: np.ndarray) -> np.ndarray:
+        """Map scores to calibrated probabilities.
+
+        Each score gets the probability of the block with the highest lowest
+        score not above it (or of the first block, if the score is below all
+        of them).
+        """
+        rows = np.searchsorted(self.thresholds, scores, side="right") - 1
+        return self.values[np.clip(rows, 0, len(self.values) - 1)]
+
+
+def pool_adjacent_violators(
+    pos: np.ndarray,
+    num: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Fit a non-decreasing sequence to proportions with the PAV algorithm.
+
+    Finds the non-decreasing sequence closest (in weighted least squares) to
+    the proportions ``pos / num``, which is constant over blocks of adjacent
+    elements. Each element is pushed onto a stack of blocks, and merged with
+    the block before it for as long as that block's proportion is not lower,
+    so each element is merged at most once and the fit takes O(N) time.
+
+    Parameters
+    ----------
+    pos : np.ndarray
+        Positive count (or weight) of each element.
+    num : np.ndarray
+        Total count (or weight) of each element, which must be positive.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        Index of the first element of each block, and the proportion of each
+        block.
+    """
+    starts: List[int] = []
+    block_pos: List[float] = []
+    block_num: List[float] = []
+    for i, (p, n) in enumerate(zip(pos.tolist(), num.tolist())):
+        start = i
+        while block_num and block_pos[-1] * n >= p * block_num[-1]:
+            start = starts.pop()
+            p += block_pos.pop()
+            n += block_num.pop()
+        starts.append(start)
+        block_pos.append(p)
+        block_num.append(n)
+    return np.array(starts, dtype=int), np.array(block_pos) / np.array(block_num)
@@ -0,0 +1,296 @@
+from multiprocessing import Pool
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import psutil
+
+from clscurves.confusion import compute_confusion_curves
+from clscurves.utils import MetricsResult
+
+AVERAGED_SCALARS = [
+    "roc_auc",
+    "pr_auc",
+    "rf_auc",
+    "roc_auc_w",
+    "pr_auc_w",
+    "rf_auc_w",
+    "prg_auc",
+]
+
+
+class MultilabelMetricsGenerator:
+    """A class to generate one-vs-rest classification curves for many labels.
+
+    Given an (N, L) matrix of scores and a matching (N, L) matrix of binary
+    labels (or a length-N vector of integer class labels, for a multiclass
+    problem), compute a one-vs-rest classification curve for every label. All
+    columns in a chunk of labels are sorted in one NumPy call and their
+    confusion matrices are accumulated in a single batched pass, with chunks
+    of labels distributed across worker processes.
+
+    In addition to per-label curves and scalars, micro-averaged (all
+    score/label pairs pooled into a single curve) and macro-averaged (mean of
+    per-label values, over labels with both positive and negative examples)
+    AUCs are computed.
+
+    Examples
+    --------
+    >>> mlg = MultilabelMetricsGenerator(
+            scores,
+            labels,
+            label_names=["cat", "dog", "bird"],
+        )
+    >>> mlg.metrics.scalars[["_label", "roc_auc", "pr_auc"]]
+    >>> mlg.averages
+    """
+
+    def __init__(
+        self,
+        scores: np.ndarray,
+        labels: np.ndarray,
+        label_names: Optional[Sequence] = None,
+        weights: Optional[np.ndarray] = None,
+        reverse_thresh: bool = False,
+        imbalance_multiplier: float = 1,
+        chunk_size: int = 32,
+        num_workers: Optional[int] = None,
+    ) -> None:
+        """Instantiating this class computes all the metrics.
+
+        Parameters
+        ----------
+        scores : np.ndarray
+            (N, L)-dim array of scores, one column per label.
+        labels : np.ndarray
+            Either an (N, L)-dim binary array of labels (multilabel), or a
+            length-N array of integer class indices in ``[0, L)``
+            (multiclass), which will be one-hot encoded.
+        label_names : Optional[Sequence]
+            Names of the L labels. Defaults to the column indices.
+        weights : Optional[np.ndarray]
+            Length-N array of weights associated with each example.
+        reverse_thresh : bool
+            Boolean indicating whether the score threshold should be treated
+            as an upper bound on "positive" predictions instead of a lower
+            bound.
+        imbalance_multiplier : float
+            Positive value to artifically increase the positive class example
+            count of every label by a multiplicative weighting factor.
+        chunk_size : int
+            Number of labels to process together in each worker task.
+        num_workers : Optional[int]
+            Number of worker processes. Defaults to the number of CPUs.
+        """
+        scores = np.asarray(scores, dtype=float)
+        labels = np.asarray(labels)
+        if scores.ndim != 2:
+            raise ValueError(f"Scores must be of shape NxL, not {scores.shape}.")
+        num_labels = scores.shape[1]
+        if labels.ndim == 1:
+            labels = self._one_hot(labels, num_labels)
+        if labels.shape != scores.shape:
+            raise ValueError(
+                f"Labels of shape {labels.shape} do not match scores of shape "
+                f"{scores.shape}."
+            )
+        if np.isnan(labels.astype(float)).any():
+            raise ValueError("Labels contain null values.")
+
+        self.scores = scores
+        self.labels = (labels > 0).astype(int)
+        self.label_names = (
+            list(range(num_labels)) if label_names is None else list(label_names)
+        )
+        self.weights = None if weights is None else np.asarray(weights, dtype=float)
+        self.reverse_thresh = reverse_thresh
+        self.imbalance_multiplier = imbalance_multiplier
+        self.chunk_size = chunk_size
+        self.num_workers = num_workers or psutil.cpu_count()
+
+        if len(self.label_names) != num_labels:
+            raise ValueError(
+                f"Got {len(self.label_names)} label names for {num_labels} labels."
+            )
+
+        # Metrics to be populated
+        self.metrics: MetricsResult
+        self.metrics_micro: MetricsResult
+        self.averages: pd.DataFrame
+
+        self.compute_all_metrics()
+
+    @staticmethod
+    def _one_hot(classes: np.ndarray, num_labels: int) -> np.ndarray:
+        """One-hot encode a vector of integer class indices."""
+        one_hot = np.zeros((len(classes), num_labels), dtype=int)
+        one_hot[np.arange(len(classes)), classes.astype(int)] = 1
+        return one_hot
+
+    def compute_all_metrics(self) -> None:
+        """Compute per-label, micro-averaged, and macro-averaged metrics."""
+        print("Computing metrics...")
+
+        # Compute per-label metrics, parallelized across chunks of labels
+        num_labels = self.scores.shape[1]
+        chunks = [
+            np.arange(i, min(i + self.chunk_size, num_labels))
+            for i in range(0, num_labels, self.chunk_size)
+        ]
+        tasks = [
+            (
+                self.scores[:, chunk],
+                self.labels[:, chunk],
+                self.weights,
+                self.reverse_thresh,
+                self.imbalance_multiplier,
+            )
+            for chunk in chunks
+        ]
+        if len(tasks) > 1 and self.num_workers > 1:
+            with Pool(min(self.num_workers, len(tasks))) as pool:
+                results = pool.starmap(compute_multilabel_metrics, tasks)
+        else:
+            results = [compute_multilabel_metrics(*task) for task in tasks]
+
+        curves = []
+        scalars = []
+        for chunk, metrics in zip(chunks, results):
+            names = np.array(self.label_names, dtype=object)[chunk]
+            metrics.curves["_label"] = names[metrics.curves["_label"].values]
+            metrics.scalars["_label"] = names
+            curves.append(metrics.curves)
+            scalars.append(metrics.scalars)
+        self.metrics = MetricsResult(
+            curves=pd.concat(curves, ignore_index=True),
+            scalars=pd.concat(scalars, ignore_index=True),
+        )
+
+        # Pool all score/label pairs into a single micro-averaged curve
+        weights = None if self.weights is None else np.repeat(self.weights, num_labels)
+        self.metrics_micro = compute_multilabel_metrics(
+            scores=self.scores.reshape(-1, 1),
+            labels=self.labels.reshape(-1, 1),
+            weights=weights,
+            reverse_thresh=self.reverse_thresh,
+            imbalance_multiplier=self.imbalance_multiplier,
+        )
+
+        self.averages = self._compute_averages()
+
+        print("Metrics computation complete.")
+
+    def _compute_averages(self) -> pd.DataFrame:
+        """Compute micro- and macro-averaged scalar metrics."""
+        scalars = self.metrics.scalars
+        defined = (scalars["num_examples_pos"] > 0) & (scalars["num_examples_neg"] > 0)
+        macro = scalars.loc[defined, AVERAGED_SCALARS].mean()
+        micro = self.metrics_micro.scalars[AVERAGED_SCALARS].iloc[0]
+        return pd.DataFrame({"micro": micro, "macro": macro}).T
+
+    def get_label_metrics(self, label) -> MetricsResult:
+        """Get the curves and scalars for a single label."""
+        curves = self.metrics.curves.loc[lambda x: x["_label"] == label]
+        scalars = self.metrics.scalars.loc[lambda x: x["_label"] == label]
+        return MetricsResult(
+            curves=curves.reset_index(drop=True),
+            scalars=scalars.reset_index(drop=True),
+        )
+
+
+def compute_multilabel_metrics(
+    scores: np.ndarray,
+    labels: np.ndarray,
+    weights: Optional[np.ndarray] = None,
+    reverse_thresh: bool = False,
+    imbalance_multiplier: float = 1,
+) -> MetricsResult:
+    """Compute one-vs-rest metrics for each column of a score matrix.
+
+    Every column is sorted in a single ``np.argsort`` call, identical scores
+    within each column are collapsed with ``np.add.reduceat``, and the
+    resulting per-threshold aggregates for all columns are passed through the
+    segmented confusion matrix computation at once.
+
+    Parameters
+    ----------
+    scores : np.ndarray
+        (N, K)-dim array of scores.
+    labels : np.ndarray
+        (N, K)-dim binary array of labels.
+    weights : Optional[np.ndarray]
+        Length-N array of weights associated with each example.
+    reverse_thresh : bool
+        Whether the score threshold should be treated as an upper bound on
+        "positive" predictions.
+    imbalance_multiplier : float
+        Multiplicative weighting factor applied to the positive class.
+
+    Returns
+    -------
+    MetricsResult
+        Curves for all K columns (with a "_label" column holding the column
+        index) and one row of scalars per column.
+    """
+    num_examples, num_labels = scores.shape
+    if weights is None:
+        weights = np.ones(num_examples)
+
+    # Sort every column at once, flattening to label-major order
+    order = np.argsort(scores, axis=0, kind="stable")
+    if reverse_thresh:
+        order = order[::-1]
+    s = np.take_along_axis(scores, order, axis=0).T.ravel()
+    y = (np.take_along_axis(labels, order, axis=0) > 0).T.ravel().astype(int)
+    w = weights[order].T.ravel()
+
+    # Find runs of identical thresholds within each column
+    is_start = np.ones(len(s), dtype=bool)
+    is_start[1:] = s[1:] != s[:-1]
+    is_start[::num_examples] = True
+    starts = np.flatnonzero(is_start)
+    label_idx = starts // num_examples
+
+    # Collapse identical threshold values
+    thresh = s[starts]
+    num = np.diff(np.append(starts, len(s)))
+    label = np.add.reduceat(y, starts)
+    weight = np.add.reduceat(w, starts)
+    weight_pos = np.add.reduceat(w * y, starts)
+
+    # Make room for an extra threshold value at the start of each column
+    runs_per_label = np.bincount(label_idx, minlength=num_labels)
+    offsets = np.zeros(num_labels + 1, dtype=int)
+    offsets[1:] = np.cumsum(runs_per_label + 1)
+    rows = np.arange(len(starts)) + label_idx + 1
+
+    def with_extra_rows(values: np.ndarray) -> np.ndarray:
+        padded = np.zeros(offsets[-1], dtype=values.dtype)
+        padded[rows] = values
+        return padded
+
+    # Add extra threshold value
+    epsilon = 1e-6
+    multiplier = 1 if reverse_thresh else -1
+    extra_thresh = with_extra_rows(thresh)
+    first_runs = offsets[:-1] - np.arange(num_labels)
+    extra_thresh[offsets[:-1]] = thresh[first_runs] + multiplier * epsilon
+
+    df = pd.DataFrame(
+        {
+            "thresh": extra_thresh,
+            "label": with_extra_rows(label),
+            "weight": with_extra_rows(weight),
+            "weight_pos": with_extra_rows(weight_pos),
+            "num": with_extra_rows(num),
+        }
+    )
+
+    metrics = compute_confusion_curves(
+        df,
+        offsets=offsets,
+        imbalance_multiplier=imbalance_multiplier,
+    )
+    metrics.curves["_label"] = np.repeat(np.arange(num_labels), np.diff(offsets))
+
+    return metrics
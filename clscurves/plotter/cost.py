@@ -1,13 +1,37 @@
-from typing import List, Optional, Tuple
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple, Union
 
 import matplotlib
 import numpy as np
+import pandas as pd
 from matplotlib import pyplot as plt
 
 from clscurves.plotter.plotter import MetricsPlotter
 from clscurves.utils import MetricsResult
 
 
+@dataclass
+class CostSweepResult:
+    """A class to hold the results of a cost sweep.
+
+    Parameters
+    ----------
+    thresh : np.ndarray
+        Length-T array of thresholds of the main curve.
+    cost : np.ndarray
+        (K, T)-dim array of the main curve's cost at each threshold, for each
+        of the K cost scenarios.
+    summary : pd.DataFrame
+        DataFrame with one row per cost scenario, holding the cost
+        multipliers, the minimum cost and optimal threshold of the main
+        curve, and their bootstrapped confidence intervals.
+    """
+
+    thresh: np.ndarray
+    cost: np.ndarray
+    summary: pd.DataFrame
+
+
 class CostPlotter(MetricsPlotter):
     def __init__(
         self,
@@ -22,10 +46,35 @@ class CostPlotter(MetricsPlotter):
         fp_cost_multiplier=1,
         use_weighted_fn=False,
         use_weighted_fp=False,
+        fn_col: Optional[str] = None,
+        fp_col: Optional[str] = None,
     ) -> None:
+        """Add "fn_cost", "fp_cost", and "cost" columns to metrics.curves.
 
-        fn_col = "fn_w" if use_weighted_fn else "fn"
-        fp_col = "fp_w" if use_weighted_fp else "fp"
+        Parameters
+        ----------
+        fn_cost_multiplier
+            Cost of each false negative.
+        fp_cost_multiplier
+            Cost of each false positive.
+        use_weighted_fn
+            Whether to cost the weighted ("fn_w") instead of the unweighted
+            ("fn") false negatives.
+        use_weighted_fp
+            Whether to cost the weighted ("fp_w") instead of the unweighted
+            ("fp") false positives.
+        fn_col
+            metrics.curves column of false negatives to cost, overriding
+            ``use_weighted_fn``; e.g. "fn_amount" for a value column
+            "amount" accumulated by the generator.
+        fp_col
+            metrics.curves column of false positives to cost, overriding
+            ``use_weighted_fp``.
+        """
+        if fn_col is None:
+            fn_col = "fn_w" if use_weighted_fn else "fn"
+        if fp_col is None:
+            fp_col = "fp_w" if use_weighted_fp else "fp"
         fn = self.metrics.curves[fn_col]
         fp = self.metrics.curves[fp_col]
 
@@ -35,6 +84,104 @@ class CostPlotter(MetricsPlotter):
             self.metrics.curves["fn_cost"] + self.metrics.curves["fp_cost"]
         )
 
+    def compute_cost_sweep(
+        self,
+        fn_cost_multipliers: Union[float, Sequence[float], np.ndarray],
+        fp_cost_multipliers: Union[float, Sequence[float], np.ndarray],
+        fn_col: str = "fn",
+        fp_col: str = "fp",
+        conf: float = 0.95,
+        imputed: bool = False,
+    ) -> CostSweepResult:
+        """Compute misclassification cost for many cost scenarios at once.
+
+        The cost of scenario ``k`` at each threshold is ``fn_cost_multipliers[k]
+        * fn + fp_cost_multipliers[k] * fp``. Costs for every scenario, on
+        every (main and bootstrapped) curve, are computed in one vectorized
+        pass, and the minimum cost and optimal threshold of each curve are
+        found with segmented reductions. Unlike ``compute_cost``, this does
+        not modify ``metrics.curves``.
+
+        Parameters
+        ----------
+        fn_cost_multipliers : Union[float, Sequence[float], np.ndarray]
+            Cost of each false negative in each scenario.
+        fp_cost_multipliers : Union[float, Sequence[float], np.ndarray]
+            Cost of each false positive in each scenario. Broadcast against
+            ``fn_cost_multipliers``.
+        fn_col : str
+            metrics.curves column holding the false negatives to be costed,
+            e.g. "fn", "fn_w", or an accumulated per-example cost column.
+        fp_col : str
+            metrics.curves column holding the false positives to be costed.
+        conf : float
+            Confidence level of the bootstrapped percentile intervals.
+        imputed : bool
+            Whether to use the imputed curves.
+
+        Returns
+        -------
+        CostSweepResult
+            Main curve cost matrix, and a summary of each scenario.
+
+        Examples
+        --------
+        >>> sweep = mg.compute_cost_sweep(1, np.logspace(-2, 2, 50))
+        >>> sweep.summary[["fp_cost_multiplier", "optimal_thresh"]]
+        """
+        assert conf > 0 and conf < 1, "`conf` must be between 0 and 1"
+        fn_mult, fp_mult = np.broadcast_arrays(
+            np.atleast_1d(np.asarray(fn_cost_multipliers, dtype=float)),
+            np.atleast_1d(np.asarray(fp_cost_multipliers, dtype=float)),
+        )
+
+        # Get metrics
+        curves, _ = self._get_metrics(imputed=imputed)
+        index = self._get_index(imputed=imputed)
+        starts, lengths = index.offsets[:-1], index.lengths
+        thresh = curves["thresh"].to_numpy()
+
+        # Compute (scenarios x rows) cost matrix over all curves
+        fn = curves[fn_col].to_numpy(dtype=float)
+        fp = curves[fp_col].to_numpy(dtype=float)
+        cost = fn_mult[:, None] * fn[None, :] + fp_mult[:, None] * fp[None, :]
+
+        # Find the minimum cost, and the first row achieving it, of each curve
+        min_cost = np.minimum.reduceat(cost, starts, axis=1)
+        is_min = cost == np.repeat(min_cost, lengths, axis=1)
+        rows = np.where(is_min, np.arange(len(curves)), len(curves))
+        optimal_thresh = thresh[np.minimum.reduceat(rows, starts, axis=1)]
+
+        # Summarize the main curve, with bootstrapped percentile intervals
+        main = index.get_position(None)
+        summary = pd.DataFrame(
+            {
+                "fn_cost_multiplier": fn_mult,
+                "fp_cost_multiplier": fp_mult,
+                "min_cost": min_cost[:, main],
+                "optimal_thresh": optimal_thresh[:, main],
+            }
+        )
+        boot = ~index.is_main
+        q = [(1 - conf) / 2, (1 + conf) / 2]
+        for name, values in [
+            ("min_cost", min_cost),
+            ("optimal_thresh", optimal_thresh),
+        ]:
+            if boot.any():
+                lower, upper = np.quantile(values[:, boot], q, axis=1)
+            else:
+                lower = upper = np.full(len(fn_mult), np.nan)
+            summary[name + "_lower"] = lower
+            summary[name + "_upper"] = upper
+
+        main_rows = index.get_slice(None)
+        return CostSweepResult(
+            thresh=thresh[main_rows],
+            cost=cost[:, main_rows],
+            summary=summary,
+        )
+
     def plot_cost(  # noqa: C901
         self,
         title: str = "Misclassification Cost",
@@ -53,6 +200,10 @@ class CostPlotter(MetricsPlotter):
         bootstrapped: bool = False,
         bootstrap_alpha: float = 0.15,
         bootstrap_color: str = "black",
+        bootstrap_rasterized: bool = False,
+        bootstrap_band: Optional[str] = None,
+        bootstrap_band_conf: float = 0.95,
+        max_points: Optional[int] = None,
         imputed: bool = False,
         return_fig: bool = False,
     ) -> Optional[Tuple[plt.Figure, plt.Axes]]:
@@ -106,6 +257,21 @@ class CostPlotter(MetricsPlotter):
             Opacity of bootstrap curves.
         bootstrap_color
             Color of bootstrap curves.
+        bootstrap_rasterized
+            Whether to rasterize the bootstrap curves, which keeps vector
+            (e.g. SVG or PDF) output small when there are many bootstrap
+            samples.
+        bootstrap_band
+            If "quantile", draw a pointwise quantile envelope of the bootstrap
+            curves as a single shaded band instead of drawing each bootstrap
+            curve as a faint line.
+        bootstrap_band_conf
+            Confidence level of the quantile envelope.
+        max_points
+            If specified, reduce each curve to at most this many points (plus
+            its ROC convex hull vertices), spaced uniformly along the plotted
+            curve, before plotting. This speeds up plotting and shrinks vector
+            (e.g. SVG or PDF) output for curves with very many thresholds.
         imputed
             Whether to plot imputed curves.
         return_fig
@@ -122,9 +288,15 @@ class CostPlotter(MetricsPlotter):
 
         # Get metrics
         curves, _ = self._get_metrics(imputed=imputed)
+        index = self._get_index(imputed=imputed)
+
+        # Decimate curves for display
+        curves, index = self._decimate(
+            curves, index, max_points, columns=[x_col, "cost"]
+        )
 
         # Get non-bootstrapped data
-        curves_main = curves.loc[lambda x: x["_bootstrap_sample"].isnull()]
+        curves_main = curves.iloc[index.get_slice(None)]
 
         # Create figure
         fig = plt.figure(figsize=(10, 6), dpi=dpi)
@@ -165,17 +337,19 @@ class CostPlotter(MetricsPlotter):
 
         # Plot faint bootstrapped curves
         if bootstrapped:
-            num_bootstrap_samples = curves["_bootstrap_sample"].nunique() - 1
-            for i in range(num_bootstrap_samples):
-                cost_boot = curves.loc[lambda x: x["_bootstrap_sample"] == i, "cost"]
-                x_vals = curves.loc[lambda x: x["_bootstrap_sample"] == i, x_col]
-                ax.plot(
-                    np.log10(x_vals) if log_scale else x_vals,
-                    cost_boot,
-                    alpha=bootstrap_alpha,
-                    color=bootstrap_color,
-                    linewidth=1,
-                )
+            x_all = curves[x_col].to_numpy()
+            self._add_bootstrap_curves(
+                ax=ax,
+                x=np.log10(x_all) if log_scale else x_all,
+                y=curves["cost"].to_numpy(),
+                index=index,
+                alpha=bootstrap_alpha,
+                color=bootstrap_color,
+                rasterized=bootstrap_rasterized,
+                band=bootstrap_band,
+                band_conf=bootstrap_band_conf,
+            )
+            ax.autoscale_view()
 
         # Set x limits
         if not log_scale and x_col in [
@@ -1,10 +1,13 @@
 from typing import List, Optional, Tuple
 
+import numpy as np
+import pandas as pd
 from matplotlib import pyplot as plt
 from typing_extensions import Literal
 
 from clscurves.plotter.plotter import MetricsPlotter
-from clscurves.utils import MetricsResult
+from clscurves.query import interpolate_curves
+from clscurves.utils import CurveIndex, MetricsResult
 
 Label = Literal["all", 0, 1, None]
 
@@ -25,6 +28,7 @@ class DistPlotter(MetricsPlotter):
         label: Label = "all",  # noqa
         kind: str = "CDF",
         kernel_size: float = 10,
+        num_pdf_points: int = 1000,
         log_scale: bool = False,
         title: Optional[str] = None,
         cmap: str = "rainbow",
@@ -38,6 +42,8 @@ class DistPlotter(MetricsPlotter):
         bootstrapped: bool = False,
         bootstrap_alpha: float = 0.15,
         bootstrap_color: str = "black",
+        bootstrap_rasterized: bool = False,
+        max_points: Optional[int] = None,
         imputed: bool = False,
         return_fig: bool = False,
     ) -> Optional[Tuple[plt.Figure, plt.Axes]]:
@@ -56,12 +62,23 @@ class DistPlotter(MetricsPlotter):
             all the cases flagged, divided by the sum of the weights of all
             the cases.
         label
-            Class label to plot the CDF for; one of "all", 1, 0, or `None`.
+            Class label to plot the CDF or PDF for; one of "all", 1, or 0.
+            Class-conditional CDFs are read from the cumulative counts in
+            metrics.curves (``1 - recall`` for label 1, ``1 - fpr`` for label
+            0), so they need no extra pass over the data; the largest gap
+            between them is the "ks" scalar metric. `None` (examples with null
+            labels) is not supported, since null-labeled examples are not
+            counted in metrics.curves.
         kind
             Either "cdf" or "pdf".
         kernel_size
             Used for PDF only: standard deviation of the Gaussian of kernel to
-            use when smoothing the PDF curve.
+            use when smoothing the PDF curve, in units of the spacing between
+            PDF grid points.
+        num_pdf_points
+            Used for PDF only: number of grid points spanning the range of
+            scores, at which the PDF is evaluated (the curve extends a few
+            kernel widths beyond this range on either side).
         log_scale
             Boolean to specify whether the x-axis should be log-scaled.
         title
@@ -95,6 +112,15 @@ class DistPlotter(MetricsPlotter):
             Opacity of bootstrap curves.
         bootstrap_color
             Color of bootstrap curves.
+        bootstrap_rasterized
+            Whether to rasterize the bootstrap curves, which keeps vector
+            (e.g. SVG or PDF) output small when there are many bootstrap
+            samples.
+        max_points
+            If specified, reduce each curve to at most this many points (plus
+            its ROC convex hull vertices), spaced uniformly along the plotted
+            curve, before plotting. This speeds up plotting and shrinks vector
+            (e.g. SVG or PDF) output for curves with very many thresholds.
         imputed
             Whether to plot imputed curves.
         return_fig
@@ -113,28 +139,54 @@ class DistPlotter(MetricsPlotter):
 
         # Get metrics
         curves, _ = self._get_metrics(imputed=imputed)
+        index = self._get_index(imputed=imputed)
 
-        # Compute CDF
-        _w = "_w" if weighted else ""
-        if label == "all":
-            cdf = 1 - curves["frac" + _w]
-        else:
-            raise NotImplementedError("TODO: Implement label=None case.")
-
-        # Account for reversed-behavior thresholds
-        if self.reverse_thresh:
-            cdf = 1 - cdf
+        if label is None:
+            raise NotImplementedError(
+                "Examples with null labels are not counted in metrics.curves."
+            )
 
-        curves["_cdf"] = cdf
         x_col = "thresh"
-        y_col = "_cdf"
+        if kind == "cdf":
+            # Compute CDF, using the cumulative counts of the given class
+            _w = "_w" if weighted else ""
+            cdf_col = {"all": "frac", 1: "recall", 0: "fpr"}[label]
+            cdf = 1 - curves[cdf_col + _w]
+
+            # Account for reversed-behavior thresholds
+            if self.reverse_thresh:
+                cdf = 1 - cdf
+
+            curves["_cdf"] = cdf
+            y_col = "_cdf"
+        else:
+            curves = self._get_pdf_curves(
+                curves,
+                index,
+                weighted=weighted,
+                label=label,
+                kernel_size=kernel_size,
+                num_points=num_pdf_points,
+                log_scale=log_scale,
+                color_by=color_by,
+            )
+            index = CurveIndex(curves, column=index.column)
+            y_col = "_pdf"
+            if y_rng is None:
+                # Leave room for the peaks of bootstrapped curves too
+                pdf = curves[y_col].to_numpy()
+                y_rng = [0, 1.05 * float(np.nanmax(pdf, initial=0)) or 1]
 
-        # TODO: Support PDF via KDE.
+        # Decimate curves for display
+        plot_curves, plot_index = self._decimate(
+            curves, index, max_points, columns=[x_col, y_col]
+        )
 
         # Make plot
         if not bootstrapped:
             fig, ax = self._make_plot(
-                curves=curves,
+                curves=plot_curves,
+                index=plot_index,
                 x_col=x_col,
                 y_col=y_col,
                 cmap=cmap,
@@ -146,7 +198,8 @@ class DistPlotter(MetricsPlotter):
             )
         else:
             fig, ax = self._make_bootstrap_plot(
-                curves=curves,
+                curves=plot_curves,
+                index=plot_index,
                 x_col=x_col,
                 y_col=y_col,
                 cmap=cmap,
@@ -157,6 +210,7 @@ class DistPlotter(MetricsPlotter):
                 grid=grid,
                 alpha=bootstrap_alpha,
                 bootstrap_color=bootstrap_color,
+                rasterized=bootstrap_rasterized,
             )
 
         # Change x-axis range
@@ -202,8 +256,141 @@ class DistPlotter(MetricsPlotter):
 
         return None
 
+    @staticmethod
+    def _get_pdf_curves(
+        curves: pd.DataFrame,
+        index: CurveIndex,
+        weighted: bool,
+        label: Label,
+        kernel_size: float,
+        num_points: int,
+        log_scale: bool,
+        color_by: str,
+    ) -> pd.DataFrame:
+        """A helper function to compute the kernel density estimate of the
+        score distribution of every curve, from the number (or weight) of
+        examples (of the given class) at each threshold, on a grid of scores
+        shared by all curves.
+        """
+        thresh = curves["thresh"].to_numpy(dtype=float)
+        mass = curves["weight" if weighted else "num"].to_numpy(dtype=float)
+        if label in [0, 1]:
+            pos = curves["weight_pos" if weighted else "label"]
+            pos = pos.to_numpy(dtype=float)
+            mass = pos if label == 1 else mass - pos
+
+        # Estimate the density of log scores if plotting on a log scale
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x = np.log(thresh) if log_scale else thresh
+        mass = np.where(np.isfinite(x), mass, 0)
+        grid, pdf = compute_binned_kde(
+            np.where(mass > 0, x, np.nan),
+            mass,
+            index.offsets,
+            num_points=num_points,
+            kernel_size=kernel_size,
+        )
+        grid = np.exp(grid) if log_scale else grid
+
+        # Color each grid point by the nearest value along its curve
+        color = interpolate_curves(thresh, curves[color_by], index.offsets, grid)
+        color = pd.DataFrame(color).ffill(axis=1).bfill(axis=1).to_numpy()
+
+        keys = index.get_key_frame()
+        pdf_curves = keys.iloc[np.repeat(np.arange(len(keys)), len(grid))]
+        pdf_curves = pdf_curves.reset_index(drop=True)
+        pdf_curves["thresh"] = np.tile(grid, len(keys))
+        pdf_curves["_pdf"] = pdf.ravel()
+        pdf_curves[color_by] = color.ravel()
+        return pdf_curves
+
     def plot_pdf(self, **kwargs) -> Optional[Tuple[plt.Figure, plt.Axes]]:
         return self.plot_dist(kind="pdf", **kwargs)
 
     def plot_cdf(self, **kwargs) -> Optional[Tuple[plt.Figure, plt.Axes]]:
         return self.plot_dist(kind="cdf", **kwargs)
+
+
+def compute_binned_kde(
+    x: np.ndarray,
+    mass: np.ndarray,
+    offsets: np.ndarray,
+    num_points: int = 1000,
+    kernel_size: float = 10,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Compute Gaussian kernel density estimates of one or more distributions.
+
+    Each distribution is the slice ``offsets[i]:offsets[i + 1]`` of ``x``,
+    with each value carrying the (count or weight) ``mass``, as is the case
+    for the "thresh" and "num" (or "weight") columns of every curve in
+    metrics.curves. The mass is split between the two nearest points of a
+    grid shared by all distributions (linear binning), and each binned
+    distribution is convolved with a Gaussian kernel using the FFT, so the
+    cost is ``O(N + S * G log G)`` for ``N`` values, ``S`` distributions, and
+    ``G`` grid points, instead of ``O(N * G)`` for a direct evaluation.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Concatenated values of all distributions. Null values are ignored.
+    mass : np.ndarray
+        Mass of each value.
+    offsets : np.ndarray
+        Array of length ``S + 1`` marking the row at which each of the ``S``
+        distributions starts (with the final entry equal to ``len(x)``).
+    num_points : int
+        Number of grid points spanning the range of ``x``.
+    kernel_size : float
+        Standard deviation of the Gaussian kernel, in units of the spacing
+        between grid points. The grid is extended by 4 standard deviations
+        on either side to hold the tails of the density.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        The length-G grid, and the (S, G)-dim array of density values.
+    """
+    if num_points < 2:
+        raise ValueError("`num_points` must be at least 2.")
+    x = np.asarray(x, dtype=float)
+    mass = np.where(np.isnan(x), 0, np.asarray(mass, dtype=float))
+    num_curves = len(offsets) - 1
+    segment = np.repeat(np.arange(num_curves), np.diff(offsets))
+
+    # Build a grid over the range of values, padded to hold the kernel tails
+    valid = (mass != 0) & ~np.isnan(x)
+    lo, hi = (x[valid].min(), x[valid].max()) if valid.any() else (0.0, 1.0)
+    step = (hi - lo) / (num_points - 1) if hi > lo else 1.0
+    pad = int(np.ceil(4 * kernel_size))
+    size = num_points + 2 * pad
+    grid = lo + (np.arange(size) - pad) * step
+
+    # Split each value's mass between its two nearest grid points
+    pos = np.where(valid, (x - lo) / step + pad, pad)
+    left = np.clip(np.floor(pos).astype(int), 0, size - 2)
+    frac = pos - left
+    hist = np.bincount(
+        np.concatenate([segment * size + left, segment * size + left + 1]),
+        np.concatenate([mass * (1 - frac), mass * frac]),
+        minlength=num_curves * size,
+    ).reshape(num_curves, size)
+
+    # Convolve with the Gaussian kernel, zero-padding to avoid wrap-around
+    n_fft = 1 << int(np.ceil(np.log2(size + 2 * pad + 1)))
+    lags = np.arange(n_fft)
+    lags = np.minimum(lags, n_fft - lags)
+    if kernel_size > 0:
+        kernel = np.exp(-0.5 * (lags / kernel_size) ** 2)
+        kernel[lags > pad] = 0
+    else:
+        kernel = (lags == 0).astype(float)
+    kernel /= kernel.sum()
+    smooth = np.fft.irfft(
+        np.fft.rfft(hist, n_fft, axis=1) * np.fft.rfft(kernel), n_fft, axis=1
+    )[:, :size]
+
+    # Normalize each distribution to integrate to 1
+    total = hist.sum(axis=1, keepdims=True)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        pdf = np.clip(smooth, 0, None) / (total * step)
+    return grid, pdf
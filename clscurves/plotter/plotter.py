@@ -1,13 +1,17 @@
-from typing import List, Optional, Tuple
+import warnings
+from typing import List, Optional, Sequence, Tuple, Union
 
 import matplotlib
 import numpy as np
 import pandas as pd
 from matplotlib import pyplot as plt
+from matplotlib.collections import LineCollection
 
 from clscurves.config import MetricsAliases
-from clscurves.covariance import CovarianceEllipseGenerator
-from clscurves.utils import MetricsResult
+from clscurves.covariance import BatchedCovarianceEllipseGenerator
+from clscurves.decimation import decimate_curves
+from clscurves.query import OperatingPointQuery, interpolate_curves
+from clscurves.utils import CurveIndex, MetricsResult
 
 
 class MetricsPlotter(MetricsAliases):
@@ -29,21 +33,23 @@ class MetricsPlotter(MetricsAliases):
     def _add_op_ellipse(
         self,
         curves: pd.DataFrame,
-        op_value: float,
+        op_value: Union[float, Sequence[float]],
         x_col: str,
         y_col: str,
         ax: plt.Axes,
         thresh_key: str = "thresh",
+        index: Optional[CurveIndex] = None,
     ) -> None:
-        """A helper function to add a confidence ellipse to an metrics plot
-        given a threshold operating value.
+        """A helper function to add confidence ellipses to an metrics plot
+        given one or more threshold operating values.
 
         Parameters
         ----------
         curves : pd.DataFrame
             metrics.curves DataFrame.
-        op_value : float
-            Threshold operating value.
+        op_value : Union[float, Sequence[float]]
+            Threshold operating value, or a sequence of them to draw an
+            ellipse at each.
         x_col : str
             metrics.curves key used in plot x axis.
         y_col : str
@@ -51,29 +57,24 @@ class MetricsPlotter(MetricsAliases):
         ax : plt.Axes
             Matplotlib axis object.
         thresh_key : str
-            metrics.curves key used for coloring (default: "thresh").
+            metrics.curves key used for coloring (default: "thresh"). This
+            must be monotone along each curve.
+        index : Optional[CurveIndex]
+            Precomputed row offsets of each bootstrap sample in ``curves``.
         """
 
-        def find_op_point(df: pd.DataFrame) -> pd.Series:
-            """Find all entries at or above the operating point threshold."""
-            match = df[df[thresh_key] >= op_value]
-            if not match.empty:
-                return match.iloc[0]
-            return df.iloc[0]
-
         # Get operating point coordinates for each bootstrapped sample
-        op_points = curves.groupby("_bootstrap_sample", dropna=False).apply(
-            find_op_point
-        )
-        op_data = op_points[[x_col, y_col]].values.T
+        rows = OperatingPointQuery(curves, index).find_rows(thresh_key, op_value)
+        op_x = curves[x_col].to_numpy()[rows]
+        op_y = curves[y_col].to_numpy()[rows]
 
-        # Compute covariance ellipse and add to ax
-        ceg = CovarianceEllipseGenerator(op_data)
-        ceg.create_ellipse_patch(ax=ax, color="black")
-        ceg.add_ellipse_center(ax=ax)
+        # Compute covariance ellipses and add to ax
+        bceg = BatchedCovarianceEllipseGenerator(np.stack([op_x.T, op_y.T], axis=1))
+        bceg.create_ellipse_collection(ax=ax, color="black")
+        bceg.add_ellipse_centers(ax=ax)
 
         # Add individual operating points
-        ax.scatter(x=op_data[0], y=op_data[1], s=2, c="black", alpha=0.7, marker=".")
+        ax.scatter(x=op_x, y=op_y, s=2, c="black", alpha=0.7, marker=".")
 
     def _make_plot(
         self,
@@ -88,13 +89,15 @@ class MetricsPlotter(MetricsAliases):
         grid: bool,
         fig: Optional[plt.Figure] = None,
         ax: Optional[plt.Axes] = None,
+        index: Optional[CurveIndex] = None,
     ) -> Tuple[plt.Figure, plt.Axes]:
         """A helper function to create a base Matplotlib scatter plot figure
         for metrics-related plotting.
         """
 
         # Get non-bootstrapped data
-        curves = curves.loc[lambda x: x["_bootstrap_sample"].isnull()]
+        index = CurveIndex(curves) if index is None else index
+        curves = curves.iloc[index.get_slice(None)]
 
         # Create figure
         if not ax:
@@ -152,6 +155,10 @@ class MetricsPlotter(MetricsAliases):
         grid: bool,
         alpha: float,
         bootstrap_color: str,
+        rasterized: bool = False,
+        band: Optional[str] = None,
+        band_conf: float = 0.95,
+        index: Optional[CurveIndex] = None,
     ) -> Tuple[plt.Figure, plt.Axes]:
         """A helper function to add faint bootstrapped reference curves to an
         metrics plot to visualize the confidence we have in the main metrics
@@ -166,15 +173,18 @@ class MetricsPlotter(MetricsAliases):
         ax.set_ylim(0, 1)
 
         # Plot faint bootstrapped curves
-        num_bootstrap_samples = curves["_bootstrap_sample"].nunique() - 1
-        for i in range(num_bootstrap_samples):
-            ax.plot(
-                curves.loc[lambda x: x["_bootstrap_sample"] == i, x_col],
-                curves.loc[lambda x: x["_bootstrap_sample"] == i, y_col],
-                alpha=alpha,
-                color=bootstrap_color,
-                linewidth=1,
-            )
+        index = CurveIndex(curves) if index is None else index
+        self._add_bootstrap_curves(
+            ax=ax,
+            x=curves[x_col].to_numpy(),
+            y=curves[y_col].to_numpy(),
+            index=index,
+            alpha=alpha,
+            color=bootstrap_color,
+            rasterized=rasterized,
+            band=band,
+            band_conf=band_conf,
+        )
 
         # Plot main colored curve (scatter plot) with color bar
         fig, ax = self._make_plot(
@@ -189,10 +199,116 @@ class MetricsPlotter(MetricsAliases):
             grid=grid,
             fig=fig,
             ax=ax,
+            index=index,
         )
 
         return fig, ax
 
+    def _add_bootstrap_curves(
+        self,
+        ax: plt.Axes,
+        x: np.ndarray,
+        y: np.ndarray,
+        index: CurveIndex,
+        alpha: float,
+        color: str,
+        rasterized: bool = False,
+        band: Optional[str] = None,
+        band_conf: float = 0.95,
+    ) -> None:
+        """A helper function to draw the bootstrapped curves, either as faint
+        individual lines (``band=None``) or as a pointwise quantile envelope
+        (``band="quantile"``).
+        """
+        if band is None:
+            self._add_bootstrap_lines(ax, x, y, index, alpha, color, rasterized)
+        elif band == "quantile":
+            self._add_bootstrap_band(ax, x, y, index, band_conf, alpha, color)
+        else:
+            raise ValueError(f"Invalid band: {band}. Must be None or 'quantile'.")
+
+    @staticmethod
+    def _add_bootstrap_band(
+        ax: plt.Axes,
+        x: np.ndarray,
+        y: np.ndarray,
+        index: CurveIndex,
+        conf: float,
+        alpha: float,
+        color: str,
+        num_points: int = 200,
+    ) -> None:
+        """A helper function to draw a pointwise quantile envelope of the
+        bootstrapped curves as a single ``fill_between`` artist.
+
+        All bootstrapped curves are interpolated onto a shared grid spanning
+        their x range, and the ``(1 - conf) / 2`` and ``(1 + conf) / 2``
+        quantiles are taken across curves at each grid value.
+        """
+        assert conf > 0 and conf < 1, "`conf` must be between 0 and 1"
+        is_boot = np.repeat(~index.is_main, index.lengths)
+        x_boot = x[is_boot & np.isfinite(x)]
+        if len(x_boot) == 0:
+            return
+        grid = np.linspace(x_boot.min(), x_boot.max(), num_points)
+        y_grid = interpolate_curves(x, y, index.offsets, grid)[~index.is_main]
+
+        # Grid values outside the range of every curve give all-null slices
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", category=RuntimeWarning)
+            lower, upper = np.nanquantile(
+                y_grid, [(1 - conf) / 2, (1 + conf) / 2], axis=0
+            )
+        ax.fill_between(grid, lower, upper, color=color, alpha=alpha, linewidth=0)
+
+    @staticmethod
+    def _add_bootstrap_lines(
+        ax: plt.Axes,
+        x: np.ndarray,
+        y: np.ndarray,
+        index: CurveIndex,
+        alpha: float,
+        color: str,
+        rasterized: bool = False,
+    ) -> LineCollection:
+        """A helper function to draw every bootstrapped curve as a single
+        ``LineCollection`` artist, built from views into contiguous arrays.
+        """
+        bootstrap = np.flatnonzero(~index.is_main)
+        points = np.column_stack([x, y])
+        segments = [points[index.offsets[i] : index.offsets[i + 1]] for i in bootstrap]
+        lines = LineCollection(
+            segments,
+            colors=color,
+            alpha=alpha,
+            linewidths=1,
+            rasterized=rasterized,
+        )
+        ax.add_collection(lines)
+        return lines
+
+    @staticmethod
+    def _decimate(
+        curves: pd.DataFrame,
+        index: CurveIndex,
+        max_points: Optional[int],
+        columns: List[str],
+    ) -> Tuple[pd.DataFrame, CurveIndex]:
+        """A helper function to reduce each curve to at most ``max_points``
+        rows for display, measuring arc length along ``columns``.
+        """
+        if max_points is None:
+            return curves, index
+        rows = decimate_curves(curves, index.offsets, max_points, columns)
+        curves = curves.iloc[rows]
+        return curves, CurveIndex(curves, column=index.column)
+
+    def _get_index(self, imputed: bool = False) -> CurveIndex:
+        """A helper function to get the cached row offsets of each bootstrap
+        sample in the metrics curves DataFrame.
+        """
+        return self.metrics.get_index(imputed=imputed)
+
     def _get_metrics(
         self,
         imputed: bool = False,
@@ -1,4 +1,4 @@
-from typing import List, Optional, Tuple
+from typing import List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 from matplotlib import pyplot as plt
@@ -27,10 +27,14 @@ class PRPlotter(MetricsPlotter):
         bootstrapped: bool = False,
         bootstrap_alpha: float = 0.15,
         bootstrap_color: str = "black",
+        bootstrap_rasterized: bool = False,
+        bootstrap_band: Optional[str] = None,
+        bootstrap_band_conf: float = 0.95,
+        max_points: Optional[int] = None,
         imputed: bool = False,
         f1_contour: bool = False,
         grid: bool = True,
-        op_value: Optional[float] = None,
+        op_value: Optional[Union[float, Sequence[float]]] = None,
         return_fig: bool = False,
     ) -> Optional[Tuple[plt.Figure, plt.Axes]]:
         """Plot the PR (Precision & Recall) curve.
@@ -74,6 +78,21 @@ class PRPlotter(MetricsPlotter):
             Opacity of bootstrap curves.
         bootstrap_color
             Color of bootstrap curves.
+        bootstrap_rasterized
+            Whether to rasterize the bootstrap curves, which keeps vector
+            (e.g. SVG or PDF) output small when there are many bootstrap
+            samples.
+        bootstrap_band
+            If "quantile", draw a pointwise quantile envelope of the bootstrap
+            curves as a single shaded band instead of drawing each bootstrap
+            curve as a faint line.
+        bootstrap_band_conf
+            Confidence level of the quantile envelope.
+        max_points
+            If specified, reduce each curve to at most this many points (plus
+            its ROC convex hull vertices), spaced uniformly along the plotted
+            curve, before plotting. This speeds up plotting and shrinks vector
+            (e.g. SVG or PDF) output for curves with very many thresholds.
         imputed
             Whether to plot imputed curves.
         f1_contour
@@ -81,8 +100,8 @@ class PRPlotter(MetricsPlotter):
         grid
             Whether to plot grid lines.
         op_value
-            Threshold value to plot a confidence ellipse for when the plot is
-            bootstrapped.
+            Threshold value (or sequence of threshold values) to plot a
+            confidence ellipse for when the plot is bootstrapped.
         return_fig
             If set to True, will return (fig, ax) as a tuple instead of
             plotting the figure.
@@ -90,15 +109,22 @@ class PRPlotter(MetricsPlotter):
 
         # Get metrics
         curves, scalars = self._get_metrics(imputed=imputed)
+        index = self._get_index(imputed=imputed)
 
         # Specify which values to plot in X and Y
         x_col = "recall_w" if weighted else "recall"
         y_col = "precision"
 
+        # Decimate curves for display
+        plot_curves, plot_index = self._decimate(
+            curves, index, max_points, columns=[x_col, y_col]
+        )
+
         # Make plot
         if not bootstrapped:
             fig, ax = self._make_plot(
-                curves=curves,
+                curves=plot_curves,
+                index=plot_index,
                 x_col=x_col,
                 y_col=y_col,
                 cmap=cmap,
@@ -110,7 +136,8 @@ class PRPlotter(MetricsPlotter):
             )
         else:
             fig, ax = self._make_bootstrap_plot(
-                curves=curves,
+                curves=plot_curves,
+                index=plot_index,
                 x_col=x_col,
                 y_col=y_col,
                 cmap=cmap,
@@ -121,6 +148,9 @@ class PRPlotter(MetricsPlotter):
                 grid=grid,
                 alpha=bootstrap_alpha,
                 bootstrap_color=bootstrap_color,
+                rasterized=bootstrap_rasterized,
+                band=bootstrap_band,
+                band_conf=bootstrap_band_conf,
             )
 
         # Plot F1 contour curves
@@ -176,6 +206,7 @@ class PRPlotter(MetricsPlotter):
         if op_value is not None:
             self._add_op_ellipse(
                 curves=curves,
+                index=index,
                 op_value=op_value,
                 x_col=x_col,
                 y_col=y_col,
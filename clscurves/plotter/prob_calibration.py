@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import matplotlib as mpl
 import matplotlib.pyplot as plt
@@ -27,16 +27,26 @@ def assess_prob_calibration(
         Column name for the true labels, by default "label".
     score_column : str, optional
         Column name for the predicted probabilities, by default "prob".
+
+    See Also
+    --------
+    ProbCalibrationAccumulator : Streaming version, for data too large to
+        hold in memory at once.
     """
 
-    predictions_df["quantile"] = predictions_df[score_column].rank() / len(
-        predictions_df
+    # Bucket examples in a new DataFrame, leaving the input unmodified
+    scores = predictions_df[score_column]
+    df = pd.DataFrame(
+        {
+            score_column: scores,
+            label_column: predictions_df[label_column],
+            "quantile_bucket": (scores.rank() / len(predictions_df)).round(2),
+            "score_bucket": scores.round(2),
+        }
     )
-    predictions_df["quantile_bucket"] = predictions_df["quantile"].round(2)
-    predictions_df["score_bucket"] = predictions_df[score_column].round(2)
 
     score_prob_calibration = (
-        predictions_df.groupby("score_bucket")
+        df.groupby("score_bucket")
         .agg(
             avg_prediction=(score_column, "mean"),
             num_actual_pos=(label_column, "sum"),
@@ -46,7 +56,7 @@ def assess_prob_calibration(
     )
 
     quantile_prob_calibration = (
-        predictions_df.groupby("quantile_bucket")
+        df.groupby("quantile_bucket")
         .agg(
             avg_prediction=(score_column, "mean"),
             num_actual_pos=(label_column, "sum"),
@@ -69,6 +79,350 @@ def assess_prob_calibration(
     return prob_calibration.sort_values("avg_prediction")
 
 
+class ProbCalibrationAccumulator:
+    """A class to assess probability calibration one chunk of data at a time.
+
+    This is a streaming version of ``assess_prob_calibration``, for data
+    which is too large to fit in memory at once (e.g. read from Parquet in
+    batches). Each chunk is reduced with ``np.bincount`` to per-bucket
+    counts, label sums, and score sums, so memory use is bounded by the
+    number of buckets rather than the number of examples.
+
+    Fixed score buckets (scores rounded to 2 decimal places) are exact.
+    Quantile buckets require the rank of every example, so they are instead
+    approximated with a histogram sketch of ``num_sketch_bins`` bins evenly
+    spaced in log-odds, which resolves scores near 0 and 1 as finely as those
+    near 0.5. All examples in a sketch bin are ranked together, as if tied.
+    Accumulators of different partitions of the data can be combined with
+    ``merge``.
+
+    Parameters
+    ----------
+    label_column : str
+        Column name for the true labels.
+    score_column : str
+        Column name for the predicted probabilities, which must be between 0
+        and 1.
+    num_sketch_bins : int
+        Number of bins of the quantile sketch.
+    logit_range : float
+        Log-odds range ``[-logit_range, logit_range]`` spanned by the sketch
+        bins. Scores beyond it fall in the first or last bin.
+
+    Examples
+    --------
+    >>> acc = ProbCalibrationAccumulator(score_column="prob")
+    >>> for batch in pyarrow.parquet.ParquetFile(path).iter_batches():
+    ...     acc.update(batch.to_pandas())
+    >>> prob_calibration = acc.get_calibration()
+    >>> acc.get_summary()
+    """
+
+    num_score_buckets = 101
+
+    def __init__(
+        self,
+        label_column: str = "label",
+        score_column: str = "prob",
+        num_sketch_bins: int = 2**16,
+        logit_range: float = 20.0,
+    ) -> None:
+        self.label_column = label_column
+        self.score_column = score_column
+        self.num_sketch_bins = num_sketch_bins
+        self.logit_range = logit_range
+
+        # Number of scores, sum of scores, number of labels, and sum of labels
+        self.score_stats = np.zeros((4, self.num_score_buckets))
+        self.sketch_stats = np.zeros((4, num_sketch_bins))
+
+    def update(self, predictions_df: pd.DataFrame) -> "ProbCalibrationAccumulator":
+        """Add a chunk of predictions and labels to the accumulated statistics.
+
+        Parameters
+        ----------
+        predictions_df : pd.DataFrame
+            DataFrame containing predictions and labels.
+
+        Returns
+        -------
+        ProbCalibrationAccumulator
+            This accumulator, to allow chaining.
+        """
+        scores = predictions_df[self.score_column].to_numpy(dtype=float)
+        labels = predictions_df[self.label_column].to_numpy(dtype=float)
+        labels, scores = labels[~np.isnan(scores)], scores[~np.isnan(scores)]
+        if (scores < 0).any() or (scores > 1).any():
+            raise ValueError("Scores must be probabilities between 0 and 1.")
+
+        # Get the fixed score bucket and sketch bin of each example
+        buckets = np.rint(scores * (self.num_score_buckets - 1)).astype(int)
+        with np.errstate(divide="ignore"):
+            logits = np.log(scores) - np.log1p(-scores)
+        frac = (logits + self.logit_range) / (2 * self.logit_range)
+        bins = np.clip(np.floor(frac * self.num_sketch_bins), 0, None)
+        bins = np.minimum(bins, self.num_sketch_bins - 1).astype(int)
+
+        self.score_stats += self._get_bucket_stats(
+            buckets, scores, labels, self.num_score_buckets
+        )
+        self.sketch_stats += self._get_bucket_stats(
+            bins, scores, labels, self.num_sketch_bins
+        )
+        return self
+
+    @staticmethod
+    def _get_bucket_stats(
+        buckets: np.ndarray,
+        scores: np.ndarray,
+        labels: np.ndarray,
+        num_buckets: int,
+    ) -> np.ndarray:
+        """Sum the number of scores, scores, number of labels, and labels."""
+        has_label = ~np.isnan(labels)
+        stats = [
+            np.ones(len(scores)),
+            scores,
+            has_label.astype(float),
+            np.where(has_label, labels, 0),
+        ]
+        return np.stack([np.bincount(buckets, x, num_buckets) for x in stats])
+
+    def merge(
+        self, other: "ProbCalibrationAccumulator"
+    ) -> "ProbCalibrationAccumulator":
+        """Add the statistics accumulated by another (compatible) accumulator.
+
+        Returns
+        -------
+        ProbCalibrationAccumulator
+            This accumulator, to allow chaining.
+        """
+        if (other.num_sketch_bins, other.logit_range) != (
+            self.num_sketch_bins,
+            self.logit_range,
+        ):
+            raise ValueError("Accumulators must use the same sketch bins.")
+        self.score_stats += other.score_stats
+        self.sketch_stats += other.sketch_stats
+        return self
+
+    def get_calibration(self) -> pd.DataFrame:
+        """Get the probability calibration table.
+
+        Returns
+        -------
+        pd.DataFrame
+            DataFrame with the same columns as the output of
+            ``assess_prob_calibration``.
+        """
+        num_buckets = self.num_score_buckets
+        score_buckets = np.arange(num_buckets) / (num_buckets - 1)
+
+        # Rank each sketch bin at the middle of its examples' ranks
+        counts = self.sketch_stats[0]
+        cumsum = np.cumsum(counts)
+        mid_rank = cumsum - counts + (counts + 1) / 2
+        quantiles = mid_rank / max(cumsum[-1], 1)
+        buckets = np.rint(quantiles * (num_buckets - 1)).astype(int)
+        quantile_stats = np.stack(
+            [np.bincount(buckets, x, minlength=num_buckets) for x in self.sketch_stats]
+        )
+
+        prob_calibration = pd.concat(
+            [
+                self._get_table(self.score_stats, "score_bucket", score_buckets),
+                self._get_table(quantile_stats, "quantile_bucket", score_buckets),
+            ]
+        )
+        (
+            prob_calibration["proportion"],
+            prob_calibration["lower"],
+            prob_calibration["upper"],
+        ) = BinomialCI().get_ci(
+            prob_calibration["num_actual_pos"],
+            prob_calibration["num_examples"],
+        )
+
+        return prob_calibration.sort_values("avg_prediction")
+
+    @staticmethod
+    def _get_table(
+        stats: np.ndarray,
+        bucket_column: str,
+        buckets: np.ndarray,
+    ) -> pd.DataFrame:
+        """Convert accumulated statistics into rows of the calibration table."""
+        nonempty = stats[0] > 0
+        return pd.DataFrame(
+            {
+                bucket_column: buckets[nonempty],
+                "avg_prediction": stats[1, nonempty] / stats[0, nonempty],
+                "num_actual_pos": stats[3, nonempty],
+                "num_examples": stats[2, nonempty].astype(int),
+            }
+        )
+
+    def get_summary(self) -> pd.DataFrame:
+        """Get the expected and maximum calibration errors; see
+        ``compute_calibration_errors``."""
+        return compute_calibration_errors(self.get_calibration())
+
+
+def assess_prob_calibration_chunks(
+    chunks: Iterable[pd.DataFrame],
+    label_column: str = "label",
+    score_column: str = "prob",
+    num_sketch_bins: int = 2**16,
+) -> pd.DataFrame:
+    """Compute probability calibration metrics from chunks of predictions.
+
+    See ``ProbCalibrationAccumulator``.
+
+    Parameters
+    ----------
+    chunks : Iterable[pd.DataFrame]
+        DataFrames containing predictions and labels, e.g. from
+        ``pd.read_csv(path, chunksize=...)`` or Parquet record batches.
+    label_column : str, optional
+        Column name for the true labels, by default "label".
+    score_column : str, optional
+        Column name for the predicted probabilities, by default "prob".
+    num_sketch_bins : int, optional
+        Number of bins of the quantile sketch, by default 2**16.
+    """
+    acc = ProbCalibrationAccumulator(
+        label_column=label_column,
+        score_column=score_column,
+        num_sketch_bins=num_sketch_bins,
+    )
+    for chunk in chunks:
+        acc.update(chunk)
+    return acc.get_calibration()
+
+
+def compute_calibration_errors(prob_calibration: pd.DataFrame) -> pd.DataFrame:
+    """Compute the expected and maximum calibration errors.
+
+    The expected calibration error (ECE) is the average absolute difference
+    between the mean predicted value and the proportion labeled positive in
+    each bucket, weighted by the number of labeled examples in the bucket.
+    The maximum calibration error (MCE) is the largest such difference.
+
+    Parameters
+    ----------
+    prob_calibration : pd.DataFrame
+        DataFrame containing probability calibration metrics (the output of
+        ``assess_prob_calibration``).
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame with "ece" and "mce" columns, with one row for the score
+        buckets and one for the quantile buckets.
+    """
+    errors = {}
+    for bucketing in ["score", "quantile"]:
+        col = f"{bucketing}_bucket"
+        buckets = prob_calibration.loc[
+            lambda x: x[col].notnull() & (x["num_examples"] > 0)
+        ]
+        gap = (buckets["avg_prediction"] - buckets["proportion"]).abs()
+        weights = buckets["num_examples"]
+        errors[bucketing] = {
+            "ece": (gap * weights).sum() / weights.sum(),
+            "mce": gap.max(),
+        }
+    return pd.DataFrame(errors).T
+
+
+def bootstrap_calibration_errors(
+    prob_calibration: pd.DataFrame,
+    num_bootstrap_samples: int = 1000,
+    conf: float = 0.95,
+    seed: Optional[int] = None,
+) -> pd.DataFrame:
+    """Compute bootstrapped confidence intervals for calibration errors.
+
+    Rather than resampling the examples and re-bucketing them, each bootstrap
+    sample is drawn directly from the bucket table: the number of examples in
+    each bucket is drawn from a multinomial distribution over the buckets,
+    and the number of positives in each bucket from a binomial distribution
+    with that bucket's proportion positive. This is equivalent to resampling
+    the examples (keeping each bucket's mean predicted value fixed), but
+    costs O(num_buckets) per sample instead of O(num_examples).
+
+    The Brier score is computed from the bucket means, treating every example
+    in a bucket as if it were predicted with the bucket's mean predicted
+    value, so it slightly understates the Brier score of the raw predictions.
+
+    Parameters
+    ----------
+    prob_calibration : pd.DataFrame
+        DataFrame containing probability calibration metrics (the output of
+        ``assess_prob_calibration``).
+    num_bootstrap_samples : int
+        Number of bootstrap samples to draw.
+    conf : float
+        Confidence level of the percentile intervals.
+    seed : Optional[int]
+        Seed for the random number generator.
+
+    Returns
+    -------
+    pd.DataFrame
+        DataFrame indexed by bucketing ("score" or "quantile") and metric
+        ("ece" or "brier"), with "estimate", "lower", and "upper" columns.
+    """
+    assert conf > 0 and conf < 1, "`conf` must be between 0 and 1"
+    rng = np.random.default_rng(seed)
+    rows = []
+    for bucketing in ["score", "quantile"]:
+        col = f"{bucketing}_bucket"
+        buckets = prob_calibration.loc[
+            lambda x: x[col].notnull() & (x["num_examples"] > 0)
+        ]
+        pred = buckets["avg_prediction"].to_numpy(dtype=float)
+        num = buckets["num_examples"].to_numpy(dtype=int)
+        pos = buckets["num_actual_pos"].to_numpy(dtype=float)
+        total = num.sum()
+
+        # Resample bucket counts, then positive counts within each bucket
+        num_boot = rng.multinomial(total, num / total, size=num_bootstrap_samples)
+        pos_boot = rng.binomial(num_boot, pos / num)
+        estimates = _get_bucket_errors(pred, num[None, :], pos[None, :])
+        samples = _get_bucket_errors(pred, num_boot, pos_boot)
+        for metric in ["ece", "brier"]:
+            lower, upper = np.quantile(
+                samples[metric], [(1 - conf) / 2, (1 + conf) / 2]
+            )
+            rows.append(
+                {
+                    "bucketing": bucketing,
+                    "metric": metric,
+                    "estimate": estimates[metric][0],
+                    "lower": lower,
+                    "upper": upper,
+                }
+            )
+    return pd.DataFrame(rows).set_index(["bucketing", "metric"])
+
+
+def _get_bucket_errors(
+    pred: np.ndarray,
+    num: np.ndarray,
+    pos: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """Compute the ECE and Brier score of each row of bucket counts."""
+    total = num.sum(axis=1)
+    gap = np.abs(pred * num - pos)
+    squared_error = pos * (1 - pred) ** 2 + (num - pos) * pred**2
+    return {
+        "ece": gap.sum(axis=1) / total,
+        "brier": squared_error.sum(axis=1) / total,
+    }
+
+
 def plot_probability_calibration(
     prob_calibration: pd.DataFrame,
     plot_confidence_band: bool = False,
@@ -170,6 +524,223 @@ def plot_probability_calibration(
     return None
 
 
+class PredictionHistogram:
+    """A 2D histogram of predicted vs. actual values, built one chunk at a time.
+
+    This is a binned version of the data behind ``plot_predictions``, for
+    inputs too large to scatter plot (or to hold in memory at once). Each
+    chunk is reduced with ``np.bincount`` to counts on a fixed grid of
+    ``num_bins`` x ``num_bins`` bins, along with the sums needed for the R2,
+    RMSE, RMSLE, and QI summary statistics, so memory use and rendering time
+    depend only on the resolution of the grid. Histograms of different
+    partitions of the data can be combined with ``merge``.
+
+    Parameters
+    ----------
+    label_column : str
+        Column name for the actual values.
+    score_column : str
+        Column name for the predicted values.
+    rng : Tuple[float, float]
+        Range of the bins, shared by both axes. Values outside it are left
+        out of the histogram, but still count towards the summary statistics.
+    num_bins : int
+        Number of bins along each axis.
+    log_scale : bool
+        Whether to space the bins evenly in log scale (in which case ``rng``
+        must be positive).
+
+    Examples
+    --------
+    >>> hist = PredictionHistogram(rng=(0, 100))
+    >>> for batch in pyarrow.parquet.ParquetFile(path).iter_batches():
+    ...     hist.update(batch.to_pandas())
+    >>> plot_prediction_histogram(hist)
+    """
+
+    def __init__(
+        self,
+        label_column: str = "label",
+        score_column: str = "pred",
+        rng: Tuple[float, float] = (0, 1),
+        num_bins: int = 500,
+        log_scale: bool = False,
+    ) -> None:
+        if log_scale and rng[0] <= 0:
+            raise ValueError("`rng` must be positive to use log scale.")
+        self.label_column = label_column
+        self.score_column = score_column
+        self.rng = rng
+        self.num_bins = num_bins
+        self.log_scale = log_scale
+        self.counts = np.zeros((num_bins, num_bins))
+
+        # Number of examples, sum of predicted and actual values, sum of
+        # squared actual values, sum of squared errors, and sum of squared
+        # log errors
+        self.stats = np.zeros(6)
+
+    @property
+    def edges(self) -> np.ndarray:
+        """Bin edges, shared by both axes."""
+        if self.log_scale:
+            return np.geomspace(self.rng[0], self.rng[1], self.num_bins + 1)
+        return np.linspace(self.rng[0], self.rng[1], self.num_bins + 1)
+
+    def _get_bins(self, values: np.ndarray) -> np.ndarray:
+        """Get the bin of each value, or -1 if it is outside the range."""
+        lo, hi = self.rng
+        if self.log_scale:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values, lo, hi = np.log(values), np.log(lo), np.log(hi)
+        with np.errstate(invalid="ignore"):
+            bins = np.floor((values - lo) / (hi - lo) * self.num_bins)
+        bins[values == hi] = self.num_bins - 1
+        return np.where((bins >= 0) & (bins < self.num_bins), bins, -1).astype(int)
+
+    def update(self, predictions_df: pd.DataFrame) -> "PredictionHistogram":
+        """Add a chunk of predicted and actual values to the histogram.
+
+        Returns
+        -------
+        PredictionHistogram
+            This histogram, to allow chaining.
+        """
+        x = predictions_df[self.score_column].to_numpy(dtype=float)
+        y = predictions_df[self.label_column].to_numpy(dtype=float)
+        valid = ~np.isnan(x) & ~np.isnan(y)
+        x, y = x[valid], y[valid]
+
+        x_bins, y_bins = self._get_bins(x), self._get_bins(y)
+        inside = (x_bins >= 0) & (y_bins >= 0)
+        self.counts += np.bincount(
+            x_bins[inside] * self.num_bins + y_bins[inside],
+            minlength=self.num_bins**2,
+        ).reshape(self.num_bins, self.num_bins)
+
+        log_error = np.log1p(np.maximum(y, 0)) - np.log1p(np.maximum(x, 0))
+        self.stats += [
+            len(x),
+            x.sum(),
+            y.sum(),
+            (y**2).sum(),
+            ((y - x) ** 2).sum(),
+            (log_error**2).sum(),
+        ]
+        return self
+
+    def merge(self, other: "PredictionHistogram") -> "PredictionHistogram":
+        """Add the counts of another histogram with the same bins.
+
+        Returns
+        -------
+        PredictionHistogram
+            This histogram, to allow chaining.
+        """
+        if not np.array_equal(other.edges, self.edges):
+            raise ValueError("Histograms must use the same bins.")
+        self.counts += other.counts
+        self.stats += other.stats
+        return self
+
+    def get_summary(self) -> Dict[str, float]:
+        """Get the R2, RMSE, RMSLE, and QI of all accumulated examples."""
+        n, x_sum, y_sum, y_sq_sum, sq_error, sq_log_error = self.stats
+        return {
+            "r2": 1 - sq_error / (y_sq_sum - y_sum**2 / n),
+            "rmse": np.sqrt(sq_error / n),
+            "rmsle": np.sqrt(sq_log_error / n),
+            "qi": x_sum / y_sum,
+        }
+
+
+def plot_prediction_histogram(
+    histogram: PredictionHistogram,
+    dpi: Optional[int] = None,
+    title: str = "Quantity Predictions",
+    x_label: str = "Predicted Quantity",
+    y_label: str = "Actual Quantity",
+    cmap: str = "viridis",
+    return_fig: bool = False,
+) -> Optional[tuple[plt.Figure, plt.Axes]]:
+    """Plot a 2D histogram of predicted vs. actual values.
+
+    Each bin is colored by its number of examples, in log scale, and empty
+    bins are left blank.
+
+    Parameters
+    ----------
+    histogram : PredictionHistogram
+        Accumulated histogram of predicted and actual values.
+    dpi : int, optional
+        Dots per inch for the plot, by default None.
+    title : str, optional
+        Title for the plot, by default "Quantity Predictions".
+    x_label : str, optional
+        X-axis label for the plot, by default "Predicted Quantity".
+    y_label : str, optional
+        Y-axis label for the plot, by default "Actual Quantity".
+    cmap : str, optional
+        Color map for the bin counts, by default "viridis".
+    return_fig : bool, optional
+        Whether to return the figure and axes objects, by default False.
+
+    Returns
+    -------
+    Optional[tuple[plt.Figure, plt.Axes]]
+        If `return_fig` is True, returns a tuple containing the figure and axes
+        objects.
+    """
+
+    fig = plt.figure(figsize=(10, 7), dpi=dpi)
+    ax = fig.add_subplot(1, 1, 1, aspect="equal")
+    ax.grid(True, alpha=0.5)
+
+    edges = histogram.edges
+    counts = np.ma.masked_equal(histogram.counts.T, 0)
+    mesh = ax.pcolormesh(
+        edges, edges, counts, cmap=cmap, norm=mpl.colors.LogNorm(vmin=1)
+    )
+    fig.colorbar(mesh, ax=ax, label="Number of Examples")
+
+    # Add line of perfect calibration
+    ax.plot([edges[0], edges[-1]], [edges[0], edges[-1]], "k-")
+
+    ax.set_xlabel(x_label)
+    ax.set_ylabel(y_label)
+    ax.set_title(title)
+    if histogram.log_scale:
+        ax.set_yscale("log")
+        ax.set_xscale("log")
+    ax.set_xlim(edges[0], edges[-1])
+    ax.set_ylim(edges[0], edges[-1])
+
+    _add_regression_text(ax, **histogram.get_summary())
+
+    if return_fig:
+        return fig, ax
+    return None
+
+
+def _add_regression_text(
+    ax: plt.Axes,
+    r2: float,
+    rmse: float,
+    rmsle: float,
+    qi: float,
+) -> None:
+    """Include R2, RMSE, RMSLE, and QI as text in a plot."""
+    ax.text(
+        x=0.05,
+        y=0.95,
+        s=f"      $R^2$: {r2:.3f}\n RMSE: {rmse:.3f}\nRMSLE: {rmsle:.3f}\n      QI: {qi:.3f}",
+        horizontalalignment="left",
+        verticalalignment="top",
+        transform=ax.transAxes,
+        fontsize=12,
+    )
+
+
 def plot_predictions(
     predictions_df: pd.DataFrame,
     label_column: str = "label",
@@ -188,10 +759,15 @@ def plot_predictions(
     vmax: float = 10,
     scatter_density: bool = False,
     cmap: str = "viridis",
+    num_bins: Optional[int] = None,
     return_fig: bool = False,
 ) -> Optional[tuple[plt.Figure, plt.Axes]]:
     """Plot predicted vs. actual values as a scatter plot.
 
+    For very large inputs, pass ``num_bins`` to plot a 2D histogram instead,
+    whose rendering time and memory use depend only on the number of bins;
+    see ``PredictionHistogram``.
+
     Parameters
     ----------
     predictions_df : pd.DataFrame
@@ -228,6 +804,11 @@ def plot_predictions(
         Whether to use scatter density plot, by default False.
     cmap : str, optional
         Color map for scatter density plot, by default "viridis".
+    num_bins : Optional[int], optional
+        If provided, plot a 2D histogram with this many bins along each axis
+        (spanning ``x_rng``, or else the range of the data) instead of a
+        scatter plot, ignoring the jitter and point style arguments, by
+        default None.
     return_fig : bool, optional
         Whether to return the figure and axes objects, by default False.
 
@@ -238,6 +819,29 @@ def plot_predictions(
         objects.
     """
 
+    if num_bins is not None:
+        columns = [label_column, score_column]
+        histogram = PredictionHistogram(
+            label_column=label_column,
+            score_column=score_column,
+            rng=(
+                _get_prediction_range(predictions_df, columns, log_scale)
+                if x_rng is None
+                else (x_rng[0], x_rng[1])
+            ),
+            num_bins=num_bins,
+            log_scale=log_scale,
+        )
+        return plot_prediction_histogram(
+            histogram.update(predictions_df),
+            dpi=dpi,
+            title=title,
+            x_label=x_label,
+            y_label=y_label,
+            cmap=cmap,
+            return_fig=return_fig,
+        )
+
     fig = plt.figure(figsize=(10, 7), dpi=dpi)
     ax = fig.add_subplot(1, 1, 1, aspect="equal")
     ax.grid(True, alpha=0.5)
@@ -290,15 +894,7 @@ def plot_predictions(
     )
     qi = predictions_df[score_column].sum() / predictions_df[label_column].sum()
 
-    ax.text(
-        x=0.05,
-        y=0.95,
-        s=f"      $R^2$: {r2:.3f}\n RMSE: {rmse:.3f}\nRMSLE: {rmsle:.3f}\n      QI: {qi:.3f}",
-        horizontalalignment="left",
-        verticalalignment="top",
-        transform=ax.transAxes,
-        fontsize=12,
-    )
+    _add_regression_text(ax, r2=r2, rmse=rmse, rmsle=rmsle, qi=qi)
 
     if log_scale:
         ax.set_yscale("log")
@@ -307,3 +903,15 @@ def plot_predictions(
     if return_fig:
         return fig, ax
     return None
+
+
+def _get_prediction_range(
+    predictions_df: pd.DataFrame,
+    columns: List[str],
+    log_scale: bool,
+) -> Tuple[float, float]:
+    """Get the range spanned by the (positive, if in log scale) values of
+    several columns."""
+    values = predictions_df[columns].to_numpy(dtype=float)
+    values = values[np.isfinite(values) & ((values > 0) | (not log_scale))]
+    return float(values.min()), float(values.max())
@@ -1,7 +1,8 @@
-from typing import List, Optional, Tuple
+from typing import List, Optional, Sequence, Tuple, Union
 
 from matplotlib import pyplot as plt
 
+from clscurves.hull import ROCConvexHull
 from clscurves.plotter.plotter import MetricsPlotter
 from clscurves.utils import MetricsResult
 
@@ -27,8 +28,13 @@ class ROCPlotter(MetricsPlotter):
         bootstrapped: bool = False,
         bootstrap_alpha: float = 0.15,
         bootstrap_color: str = "black",
+        bootstrap_rasterized: bool = False,
+        bootstrap_band: Optional[str] = None,
+        bootstrap_band_conf: float = 0.95,
+        max_points: Optional[int] = None,
         imputed: bool = False,
-        op_value: Optional[float] = None,
+        op_value: Optional[Union[float, Sequence[float]]] = None,
+        hull: bool = False,
         return_fig: bool = False,
     ) -> Optional[Tuple[plt.Figure, plt.Axes]]:
         """Plot the ROC (Receiver Operating Characteristic) curve.
@@ -74,11 +80,30 @@ class ROCPlotter(MetricsPlotter):
             Opacity of bootstrap curves.
         bootstrap_color
             Color of bootstrap curves.
+        bootstrap_rasterized
+            Whether to rasterize the bootstrap curves, which keeps vector
+            (e.g. SVG or PDF) output small when there are many bootstrap
+            samples.
+        bootstrap_band
+            If "quantile", draw a pointwise quantile envelope of the bootstrap
+            curves as a single shaded band instead of drawing each bootstrap
+            curve as a faint line.
+        bootstrap_band_conf
+            Confidence level of the quantile envelope.
+        max_points
+            If specified, reduce each curve to at most this many points (plus
+            its ROC convex hull vertices), spaced uniformly along the plotted
+            curve, before plotting. This speeds up plotting and shrinks vector
+            (e.g. SVG or PDF) output for curves with very many thresholds.
         imputed
             Whether to plot imputed curves.
         op_value
-            Threshold value to plot a confidence ellipse for when the plot is
-            bootstrapped.
+            Threshold value (or sequence of threshold values) to plot a
+            confidence ellipse for when the plot is bootstrapped.
+        hull
+            Whether to overlay the ROC convex hull of the main curve, whose
+            vertices are the operating points which are optimal for some
+            ratio of misclassification costs.
         return_fig
             If set to True, will return (fig, ax) as a tuple instead of
             plotting the figure.
@@ -86,15 +111,22 @@ class ROCPlotter(MetricsPlotter):
 
         # Get metrics
         curves, scalars = self._get_metrics(imputed=imputed)
+        index = self._get_index(imputed=imputed)
 
         # Specify which values to plot in X and Y
         x_col = "fpr_w" if weighted else "fpr"
         y_col = "recall_w" if weighted else "recall"
 
+        # Decimate curves for display
+        plot_curves, plot_index = self._decimate(
+            curves, index, max_points, columns=[x_col, y_col]
+        )
+
         # Make plot
         if not bootstrapped:
             fig, ax = self._make_plot(
-                curves=curves,
+                curves=plot_curves,
+                index=plot_index,
                 x_col=x_col,
                 y_col=y_col,
                 cmap=cmap,
@@ -106,7 +138,8 @@ class ROCPlotter(MetricsPlotter):
             )
         else:
             fig, ax = self._make_bootstrap_plot(
-                curves=curves,
+                curves=plot_curves,
+                index=plot_index,
                 x_col=x_col,
                 y_col=y_col,
                 cmap=cmap,
@@ -117,11 +150,27 @@ class ROCPlotter(MetricsPlotter):
                 grid=grid,
                 alpha=bootstrap_alpha,
                 bootstrap_color=bootstrap_color,
+                rasterized=bootstrap_rasterized,
+                band=bootstrap_band,
+                band_conf=bootstrap_band_conf,
             )
 
         # Plot line of randomness
         ax.plot([0, 1], [0, 1], "k-")
 
+        # Plot ROC convex hull
+        if hull:
+            roc_hull = ROCConvexHull(
+                curves.iloc[index.get_slice(None)], weighted=weighted
+            )
+            ax.plot(
+                roc_hull.curves[x_col],
+                roc_hull.curves[y_col],
+                "k--",
+                linewidth=1,
+                zorder=int(1e4) + 1,
+            )
+
         # Extract ROC AUC
         scalars = scalars.loc[lambda x: x["_bootstrap_sample"].isnull()]
         auc = scalars["roc_auc_w" if weighted else "roc_auc"].iloc[0]
@@ -140,6 +189,7 @@ class ROCPlotter(MetricsPlotter):
         if op_value is not None:
             self._add_op_ellipse(
                 curves=curves,
+                index=index,
                 op_value=op_value,
                 x_col=x_col,
                 y_col=y_col,
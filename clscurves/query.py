@@ -0,0 +1,335 @@
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+from typing_extensions import Literal
+
+from clscurves.utils import CurveIndex
+
+Side = Literal["ge", "le"]
+
+DEFAULT_QUERY_COLUMNS = [
+    "thresh",
+    "recall",
+    "precision",
+    "fpr",
+    "frac",
+    "f1",
+]
+
+
+class OperatingPointQuery:
+    """A class to look up operating points on many curves at once.
+
+    Answers questions like "what threshold gives recall >= 0.9?" or "what is
+    the precision at 1% flagged?" for the main curve and every bootstrapped
+    curve simultaneously. Each query column must be monotone along every
+    curve (e.g. "thresh", "recall", "fpr", "frac", "tp", "fp"), which lets
+    each lookup be done with a binary search restricted to the rows of a
+    single curve. All curves and all query values are searched together in
+    one vectorized pass.
+
+    Parameters
+    ----------
+    curves : pd.DataFrame
+        metrics.curves DataFrame, with the rows of each bootstrap sample
+        contiguous.
+    index : Optional[CurveIndex]
+        Precomputed row offsets of each curve in ``curves``.
+
+    Examples
+    --------
+    >>> q = OperatingPointQuery(mg.metrics.curves)
+    >>> q.query("recall", [0.8, 0.9], columns=["thresh", "precision"])
+    >>> q.query("frac", 0.01, columns=["precision"])
+    """
+
+    def __init__(
+        self,
+        curves: pd.DataFrame,
+        index: Optional[CurveIndex] = None,
+    ) -> None:
+        self.curves = curves
+        self.index = CurveIndex(curves) if index is None else index
+        self._sorted_values: Dict[str, np.ndarray] = {}
+        self._directions: Dict[str, int] = {}
+
+    def _get_direction(self, column: str) -> int:
+        """Get +1 (-1) if ``column`` is non-decreasing (non-increasing)."""
+        if column not in self._directions:
+            values = self.curves[column].to_numpy(dtype=float)
+            direction = get_monotone_direction(values, self.index.offsets)
+            if direction is None:
+                raise ValueError(
+                    f"Column '{column}' is not monotone along each curve, so it "
+                    "cannot be used to look up operating points."
+                )
+            self._directions[column] = direction
+        return self._directions[column]
+
+    def _get_sorted_values(self, column: str) -> np.ndarray:
+        """Get column values, negated if necessary to be non-decreasing."""
+        if column not in self._sorted_values:
+            values = self.curves[column].to_numpy(dtype=float)
+            self._sorted_values[column] = self._get_direction(column) * values
+        return self._sorted_values[column]
+
+    def find_rows(
+        self,
+        by: str,
+        values: Union[float, Sequence[float], np.ndarray],
+        side: Side = "ge",
+    ) -> np.ndarray:
+        """Find the row of each curve at each operating point.
+
+        For ``side="ge"``, the operating point for value ``v`` is the row
+        with the smallest value of ``by`` that is still ``>= v`` (e.g. the
+        highest threshold that achieves a recall of at least ``v``). For
+        ``side="le"``, it is the row with the largest value of ``by`` that is
+        still ``<= v``. If no row of a curve satisfies the condition, the row
+        closest to satisfying it is returned.
+
+        Parameters
+        ----------
+        by : str
+            Monotone column to look up operating points by.
+        values : Union[float, Sequence[float], np.ndarray]
+            Values of ``by`` at which to find operating points.
+        side : Side
+            Either "ge" or "le"; see above.
+
+        Returns
+        -------
+        np.ndarray
+            (num_curves, num_values)-dim array of positional row indices.
+        """
+        if side not in ["ge", "le"]:
+            raise ValueError(f"Invalid side: {side}. Must be one of 'ge' or 'le'.")
+        direction = self._get_direction(by)
+        a = self._get_sorted_values(by)
+        v = direction * np.atleast_1d(np.asarray(values, dtype=float))
+
+        # Broadcast curve boundaries against query values
+        lo = np.broadcast_to(
+            self.index.offsets[:-1, None], (len(self.index.keys), len(v))
+        )
+        hi = np.broadcast_to(self.index.offsets[1:, None], lo.shape)
+        v = np.broadcast_to(v[None, :], lo.shape)
+
+        # In terms of the non-decreasing values `a`, "ge" asks for the first
+        # row with a >= v if `by` is increasing, or the last row with a <= v
+        # if `by` is decreasing (and vice versa for "le").
+        if (side == "ge") == (direction == 1):
+            rows = batched_searchsorted(a, lo, hi, v, side="left")
+        else:
+            rows = batched_searchsorted(a, lo, hi, v, side="right") - 1
+
+        return np.clip(rows, lo, hi - 1)
+
+    def query_samples(
+        self,
+        by: str,
+        values: Union[float, Sequence[float], np.ndarray],
+        columns: Optional[List[str]] = None,
+        side: Side = "ge",
+    ) -> pd.DataFrame:
+        """Look up operating points on every curve.
+
+        Returns
+        -------
+        pd.DataFrame
+            Long DataFrame with one row per (curve, query value), holding the
+            curve key, the query value, and the value of each requested
+            column at the operating point.
+        """
+        columns = DEFAULT_QUERY_COLUMNS if columns is None else columns
+        values = np.atleast_1d(np.asarray(values, dtype=float))
+        rows = self.find_rows(by, values, side=side)
+        keys = self.index.get_key_frame()
+        result = keys.iloc[np.repeat(np.arange(len(keys)), rows.shape[1])]
+        result = result.reset_index(drop=True)
+        result["by"] = by
+        result["value"] = np.tile(values, len(keys))
+        for col in columns:
+            result[col] = self.curves[col].to_numpy()[rows.ravel()]
+        return result
+
+    def query(
+        self,
+        by: str,
+        values: Union[float, Sequence[float], np.ndarray],
+        columns: Optional[List[str]] = None,
+        conf: float = 0.95,
+        side: Side = "ge",
+    ) -> pd.DataFrame:
+        """Look up operating points with bootstrapped confidence intervals.
+
+        Parameters
+        ----------
+        by : str
+            Monotone column to look up operating points by.
+        values : Union[float, Sequence[float], np.ndarray]
+            Values of ``by`` at which to find operating points.
+        columns : Optional[List[str]]
+            Columns to report at each operating point.
+        conf : float
+            Confidence level of the percentile interval computed across the
+            bootstrapped curves.
+        side : Side
+            Either "ge" or "le"; see ``find_rows``.
+
+        Returns
+        -------
+        pd.DataFrame
+            Tidy DataFrame with one row per (query value, column), holding
+            the main curve "estimate" and the bootstrapped "lower" and
+            "upper" bounds (null if there are no bootstrapped curves).
+        """
+        assert conf > 0 and conf < 1, "`conf` must be between 0 and 1"
+        columns = DEFAULT_QUERY_COLUMNS if columns is None else columns
+        values = np.atleast_1d(np.asarray(values, dtype=float))
+        rows = self.find_rows(by, values, side=side)
+        is_main = self.index.is_main
+        if is_main.sum() != 1:
+            raise ValueError("Curves must contain exactly one main curve.")
+
+        results = []
+        for col in columns:
+            data = self.curves[col].to_numpy(dtype=float)[rows]
+            boot = data[~is_main]
+            if len(boot):
+                lower, upper = np.quantile(
+                    boot, [(1 - conf) / 2, (1 + conf) / 2], axis=0
+                )
+            else:
+                lower = upper = np.full(rows.shape[1], np.nan)
+            results.append(
+                pd.DataFrame(
+                    {
+                        "by": by,
+                        "value": values,
+                        "column": col,
+                        "estimate": data[is_main][0],
+                        "lower": lower,
+                        "upper": upper,
+                    }
+                )
+            )
+
+        return (
+            pd.concat(results)
+            .sort_values("value", kind="stable")
+            .reset_index(drop=True)
+        )
+
+
+def batched_searchsorted(
+    a: np.ndarray,
+    lo: np.ndarray,
+    hi: np.ndarray,
+    v: np.ndarray,
+    side: Literal["left", "right"] = "left",
+) -> np.ndarray:
+    """Vectorized ``np.searchsorted`` within many slices of one array.
+
+    For each element of ``v``, find the insertion point of that value in the
+    non-decreasing slice ``a[lo:hi]``, using the corresponding elements of
+    ``lo`` and ``hi``. All searches proceed together, so the cost is
+    ``O(K log(max(hi - lo)))`` for ``K`` searches with no Python-level loop
+    over slices.
+
+    Returns
+    -------
+    np.ndarray
+        Insertion points, as positions into ``a``.
+    """
+    lo = np.array(lo, dtype=int)
+    hi = np.array(hi, dtype=int)
+    v = np.asarray(v)
+    active = lo < hi
+    while active.any():
+        mid = (lo + hi) // 2
+        a_mid = a[np.where(active, mid, 0)]
+        go_right = a_mid < v if side == "left" else a_mid <= v
+        lo = np.where(active & go_right, mid + 1, lo)
+        hi = np.where(active & ~go_right, mid, hi)
+        active = lo < hi
+    return lo
+
+
+def get_monotone_direction(
+    values: np.ndarray,
+    offsets: np.ndarray,
+) -> Optional[int]:
+    """Get +1 (-1) if ``values`` are non-decreasing (non-increasing) within
+    every slice ``values[offsets[i]:offsets[i + 1]]``, or None if neither.
+    """
+    diff = np.diff(values)
+    within_curve = np.ones(len(diff), dtype=bool)
+    within_curve[offsets[1:-1] - 1] = False
+    diff = diff[within_curve]
+    diff = diff[~np.isnan(diff)]
+    if (diff >= 0).all():
+        return 1
+    if (diff <= 0).all():
+        return -1
+    return None
+
+
+def interpolate_curves(
+    x: np.ndarray,
+    y: np.ndarray,
+    offsets: np.ndarray,
+    grid: np.ndarray,
+) -> np.ndarray:
+    """Linearly interpolate many curves onto a shared grid of x values.
+
+    Each curve is the slice ``offsets[i]:offsets[i + 1]`` of ``x`` and ``y``,
+    and ``x`` must be monotone (in the same direction) along every curve, as
+    is the case for e.g. "fpr", "recall", "frac", or "thresh". All curves are
+    interpolated together using ``batched_searchsorted``. Where a curve has
+    several rows with the same x value, the last of those rows is used.
+
+    Parameters
+    ----------
+    x : np.ndarray
+        Concatenated x values of all curves.
+    y : np.ndarray
+        Concatenated y values of all curves.
+    offsets : np.ndarray
+        Array of length ``S + 1`` marking the row at which each of the ``S``
+        curves starts (with the final entry equal to ``len(x)``).
+    grid : np.ndarray
+        Length-G array of x values to interpolate at.
+
+    Returns
+    -------
+    np.ndarray
+        (S, G)-dim array of interpolated y values, which are null wherever a
+        grid value is outside the range of x values of a curve.
+    """
+    direction = get_monotone_direction(x, offsets)
+    if direction is None:
+        raise ValueError("x values must be monotone along each curve.")
+    a = direction * np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    v = direction * np.asarray(grid, dtype=float)
+
+    # Broadcast curve boundaries against grid values
+    lo = np.broadcast_to(offsets[:-1, None], (len(offsets) - 1, len(v)))
+    hi = np.broadcast_to(offsets[1:, None], lo.shape)
+    v = np.broadcast_to(v[None, :], lo.shape)
+
+    # Find the rows on either side of each grid value
+    right = batched_searchsorted(a, lo, hi, v, side="right")
+    left = right - 1
+    at_left = (left >= lo) & (a[np.clip(left, 0, None)] == v)
+    inside = (left >= lo) & (right < hi)
+    left = np.clip(left, lo, hi - 1)
+    right = np.clip(right, lo, hi - 1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = (v - a[left]) / (a[right] - a[left])
+        values = y[left] + t * (y[right] - y[left])
+    values = np.where(at_left, y[left], values)
+    return np.where(inside | at_left, values, np.nan)
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+from typing_extensions import Literal
+
+from ..binomial_ci import BetaCI, BinomialCI
+
+
+@pytest.mark.parametrize(
+    "method, expected",
+    [
+        ("wilson", (0.0178762, 0.4041500)),
+        ("jeffreys", (0.0110117, 0.3813148)),
+        ("agresti_coull", (0.0, 0.4259677)),
+    ],
+)
+def test_binomial_ci_methods(method: str, expected: tuple) -> None:
+    _, lower, upper = BinomialCI().get_ci(1, 10, method=method)
+    np.testing.assert_allclose(np.array([lower, upper]), expected, atol=1e-6)
+
+
+@pytest.mark.parametrize("method", ["beta", "wilson", "jeffreys", "agresti_coull"])
+def test_binomial_ci_fast_path_matches(method: str) -> None:
+    df = pd.DataFrame({"x": [0, 1, 10, 50], "n": [10, 10, 50, 50]})
+    ci = BinomialCI()
+    avg, lower, upper = (
+        np.asarray(values) for values in ci.get_ci(df["x"], df["n"], method=method)
+    )
+    assert (lower >= 0).all() and (upper <= 1).all()
+    assert lower[0] == 0 and upper[3] == 1
+
+    out = (np.empty(4), np.empty(4), np.empty(4))
+    result = ci.get_ci(
+        df["x"].values, df["n"].values, method=method, validate=False, out=out
+    )
+    assert result is out
+    for values, buffer in zip([avg, lower, upper], out):
+        np.testing.assert_allclose(buffer, values)
+
+
+def test_binomial_ci_table_matches_direct() -> None:
+    rng = np.random.default_rng(123)
+    n = rng.integers(1, 50, 1000)
+    x = rng.binomial(n, 0.3)
+    n[:3], x[:3] = 500, 100
+    ci = BinomialCI(table_max_n=100, max_tables=2)
+
+    expected = BinomialCI().get_ci(x, n)
+    for _ in range(2):
+        result = ci.get_ci(x, n)
+        for values, expected_values in zip(result, expected):
+            np.testing.assert_array_equal(
+                np.asarray(values), np.asarray(expected_values)
+            )
+
+    # Only the most recently used confidence levels keep their tables
+    ci.get_ci(x, n, conf=0.9)
+    ci.get_ci(x, n, conf=0.8)
+    assert len(ci._tables) == 2
+    assert ci.get_ci(10, 100) == BinomialCI().get_ci(10, 100)
+
+
+@pytest.mark.parametrize("method", ["mom", "normal"])
+def test_beta_ci_grouped_matches_groupby(method: Literal["mom", "normal"]) -> None:
+    rng = np.random.default_rng(123)
+    df = pd.DataFrame(
+        {"group": rng.integers(0, 50, 2000), "value": rng.beta(2, 5, 2000)}
+    )
+    df.loc[df.index[:100], "value"] = np.nan
+    df = pd.concat([df, pd.DataFrame({"group": [50, 51, 51], "value": 0.3})])
+    ci = BetaCI()
+
+    expected = df.groupby("group")["value"].apply(lambda x: ci.get_ci(x, method=method))
+    result = ci.get_grouped_ci(df["value"], df["group"], method=method)
+    assert list(result.index) == list(expected.index)
+    np.testing.assert_allclose(
+        result[["mean", "lower", "upper"]].to_numpy(),
+        np.array(expected.tolist()),
+        atol=1e-6,
+    )
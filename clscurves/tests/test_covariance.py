@@ -0,0 +1,23 @@
+import numpy as np
+
+from .. import covariance
+
+
+def test_batched_ellipses_match_eigendecomposition() -> None:
+    rng = np.random.default_rng(123)
+    data = rng.normal(size=(3, 2, 2, 200)).sum(axis=1) * [[[1.0], [0.3]]]
+    conf = [0.5, 0.95]
+    bceg = covariance.BatchedCovarianceEllipseGenerator(data)
+    ellipses = bceg.compute_cov_ellipses(conf)
+
+    for k in range(len(data)):
+        eigenval = np.linalg.eigvalsh(np.cov(data[k]))[::-1]
+        for j, c in enumerate(conf):
+            expected = 2 * np.sqrt(-2 * np.log(1 - c)) * np.sqrt(eigenval)
+            actual = [ellipses["width"][k, j], ellipses["height"][k, j]]
+            np.testing.assert_allclose(actual, expected)
+
+    ceg = covariance.CovarianceEllipseGenerator(data[0])
+    single = ceg.compute_cov_ellipse(conf=0.95)
+    assert np.isclose(single["width"], ellipses["width"][0, 1])
+    assert np.isclose(single["angle"], ellipses["angle"][0, 1])
@@ -0,0 +1,67 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+from .. import MetricsGenerator
+from ..decimation import arc_length_decimate
+from ..hull import upper_hull_mask
+
+
+def test_upper_hull_mask() -> None:
+    # Two ROC-like curves, one sorted by decreasing and one by increasing x,
+    # with a repeated point and a collinear point
+    x = np.array([1.0, 0.6, 0.5, 0.5, 0.25, 0.0, 0.0, 0.1, 0.2, 0.3, 1.0])
+    y = np.array([1.0, 0.7, 0.8, 0.8, 0.5, 0.0, 0.0, 0.4, 0.5, 0.6, 1.0])
+    offsets = np.array([0, 6, 11])
+    expected = [1, 0, 1, 0, 1, 1, 1, 1, 0, 1, 1]
+    np.testing.assert_array_equal(upper_hull_mask(x, y, offsets), expected)
+
+
+def test_upper_hull_mask_long_concave_chain() -> None:
+    # A high final point removes the chain's vertices one at a time from the
+    # end, which is quadratic unless the hull is found in a single pass
+    x = np.linspace(0, 1, 50000)
+    y = np.sqrt(x)
+    y[-1] = 2
+    start = time.perf_counter()
+    mask = upper_hull_mask(x, y, np.array([0, len(x)]))
+    assert time.perf_counter() - start < 5
+
+    # The kept points form a concave chain with every point on or below it
+    hx, hy = x[mask], y[mask]
+    assert mask[0] and mask[-1]
+    assert (np.diff(np.diff(hy) / np.diff(hx)) < 0).all()
+    assert (y <= np.interp(x, hx, hy) + 1e-12).all()
+
+
+def test_arc_length_decimate_bounds_points() -> None:
+    t = np.linspace(0, 1, 1001)
+    points = np.column_stack([t, t**2])
+    mask = arc_length_decimate(points, np.array([0, 1001]), max_points=11)
+    assert mask.sum() <= 11
+    assert mask[0] and mask[-1]
+
+
+def test_decimate_metrics() -> None:
+    rng = np.random.default_rng(123)
+    scores = rng.random(5000)
+    labels = (rng.random(5000) < scores).astype(int)
+    mg = MetricsGenerator(
+        pd.DataFrame({"label": labels, "probability": scores}),
+        num_bootstrap_samples=3,
+        seed=123,
+    )
+    metrics = mg.metrics.decimate(max_points=50)
+
+    curves = mg.metrics.curves
+    hull = upper_hull_mask(
+        curves["fpr"].to_numpy(),
+        curves["recall"].to_numpy(),
+        mg.metrics.get_index().offsets,
+    )
+    num_hull = curves.loc[hull].groupby("_bootstrap_sample", dropna=False).size()
+    num_kept = metrics.curves.groupby("_bootstrap_sample", dropna=False).size()
+    assert (num_kept <= 50 + num_hull).all()
+    assert set(curves.loc[hull, "thresh"]) <= set(metrics.curves["thresh"])
+    pd.testing.assert_frame_equal(metrics.scalars, mg.metrics.scalars)
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from .. import MetricsGenerator
+from ..plotter.dist import compute_binned_kde
+from ..utils import CurveIndex
+
+
+def test_binned_kde_matches_direct_kde() -> None:
+    rng = np.random.default_rng(123)
+    x = rng.normal(0, 1, 2000)
+    grid, pdf = compute_binned_kde(
+        x, np.ones(len(x)), np.array([0, len(x)]), num_points=500, kernel_size=5
+    )
+
+    bandwidth = 5 * (grid[1] - grid[0])
+    expected = np.exp(-0.5 * ((grid[:, None] - x) / bandwidth) ** 2).sum(axis=1)
+    expected /= len(x) * bandwidth * np.sqrt(2 * np.pi)
+    np.testing.assert_allclose(pdf[0], expected, atol=1e-3)
+    np.testing.assert_allclose(pdf[0].sum() * (grid[1] - grid[0]), 1, atol=1e-6)
+
+
+def test_pdf_curves_from_bootstrap_counts() -> None:
+    rng = np.random.default_rng(123)
+    df = pd.DataFrame(
+        {"label": rng.integers(0, 2, 500), "probability": rng.beta(2, 5, 500)}
+    )
+    mg = MetricsGenerator(df, num_bootstrap_samples=5, seed=123)
+    index = mg.metrics.get_index()
+    pdf_curves = mg._get_pdf_curves(
+        mg.metrics.curves,
+        index,
+        weighted=False,
+        label="all",
+        kernel_size=5,
+        num_points=100,
+        log_scale=False,
+        color_by="recall",
+    )
+
+    pdf_index = CurveIndex(pdf_curves)
+    assert list(pdf_index.keys[1:]) == list(index.keys[1:])
+    assert (pdf_index.lengths == pdf_index.lengths[0]).all()
+    assert pdf_curves["recall"].notnull().all()
+
+
+def test_class_cdfs_and_ks_statistic() -> None:
+    rng = np.random.default_rng(123)
+    labels = rng.integers(0, 2, 1000)
+    scores = np.round(rng.beta(2 + labels, 3, 1000), 3)
+    df = pd.DataFrame({"label": labels, "probability": scores})
+    mg = MetricsGenerator(df, num_bootstrap_samples=3, seed=123)
+
+    expected = stats.ks_2samp(scores[labels == 1], scores[labels == 0]).statistic
+    scalars = mg.metrics.scalars
+    main = scalars["_bootstrap_sample"].isnull()
+    np.testing.assert_allclose(scalars.loc[main, "ks"], expected)
+
+    result = mg.plot_cdf(label=1, bootstrapped=True, return_fig=True)
+    assert result is not None
+    main_curve = mg.metrics.get_curve(None)
+    thresh = main_curve["thresh"].to_numpy()[1:]
+    np.testing.assert_allclose(
+        main_curve["_cdf"].to_numpy()[1:],
+        (scores[labels == 1][:, None] <= thresh).mean(axis=0),
+    )
+
+
+def test_pdf_y_range_covers_bootstrap_curves() -> None:
+    rng = np.random.default_rng(123)
+    df = pd.DataFrame(
+        {"label": rng.integers(0, 2, 200), "probability": rng.beta(2, 5, 200)}
+    )
+    mg = MetricsGenerator(df, num_bootstrap_samples=20, seed=123)
+    result = mg.plot_pdf(bootstrapped=True, kernel_size=2, return_fig=True)
+    assert result is not None
+    _, ax = result
+    lines = ax.collections[0].get_segments()  # type: ignore
+    peak = max(segment[:, 1].max() for segment in lines)
+    assert ax.get_ylim()[1] >= peak
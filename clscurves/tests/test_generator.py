@@ -1,5 +1,6 @@
 import numpy as np
 import pandas as pd
+import pytest
 
 from .. import MetricsGenerator
 
@@ -27,3 +28,310 @@ def test_compute_confusion_matrix() -> None:
 
     # TODO: Make a real test
     assert mg is not None
+
+
+def test_get_curve_slices_bootstrap_samples() -> None:
+    rng = np.random.default_rng(123)
+    df = pd.DataFrame(
+        {"label": rng.integers(0, 2, 200), "probability": rng.random(200)}
+    )
+    mg = MetricsGenerator(df, num_bootstrap_samples=3, seed=123)
+    curves = mg.metrics.curves
+
+    for sample in [None, 0, 2]:
+        expected = (
+            curves.loc[curves["_bootstrap_sample"].isnull()]
+            if sample is None
+            else curves.loc[curves["_bootstrap_sample"] == sample]
+        )
+        pd.testing.assert_frame_equal(mg.metrics.get_curve(sample), expected)
+
+
+def test_optimal_thresholds_minimize_cost() -> None:
+    rng = np.random.default_rng(123)
+    scores = np.round(rng.random(2000), 3)
+    labels = (rng.random(2000) < scores**2).astype(int)
+    mg = MetricsGenerator(
+        pd.DataFrame({"label": labels, "probability": scores}),
+        num_bootstrap_samples=3,
+        seed=123,
+    )
+    cost_ratios = np.logspace(-2, 2, 9)
+    result = mg.get_optimal_thresholds(cost_ratios)
+    assert len(result) == 4 * len(cost_ratios)
+
+    for key in [None, 2]:
+        curve = mg.metrics.get_curve(key)
+        keys = result["_bootstrap_sample"].astype(float).fillna(-1)
+        points = result.loc[keys == (-1 if key is None else key)]
+        assert len(points) == len(cost_ratios)
+        for ratio, fp, fn in points[["cost_ratio", "fp", "fn"]].to_numpy():
+            best = (ratio * curve["fp"] + curve["fn"]).min()
+            assert np.isclose(ratio * fp + fn, best)
+
+
+def test_cost_sweep_matches_compute_cost() -> None:
+    rng = np.random.default_rng(123)
+    scores = np.round(rng.random(2000), 3)
+    labels = (rng.random(2000) < scores).astype(int)
+    mg = MetricsGenerator(
+        pd.DataFrame({"label": labels, "probability": scores}),
+        num_bootstrap_samples=5,
+        seed=123,
+    )
+    columns = list(mg.metrics.curves.columns)
+    sweep = mg.compute_cost_sweep([1, 2], [3, 1])
+    assert list(mg.metrics.curves.columns) == columns
+
+    mg.compute_cost(fn_cost_multiplier=2, fp_cost_multiplier=1)
+    main = mg.metrics.get_curve()
+    np.testing.assert_allclose(sweep.cost[1], main["cost"])
+    summary = sweep.summary.iloc[1]
+    assert summary["min_cost"] == main["cost"].min()
+    assert summary["optimal_thresh"] == main.loc[main["cost"].idxmin(), "thresh"]
+    assert summary["min_cost_lower"] <= summary["min_cost_upper"]
+
+
+def test_value_columns_match_weighted_metrics() -> None:
+    rng = np.random.default_rng(123)
+    df = pd.DataFrame(
+        {
+            "label": (rng.random(1000) < 0.3).astype(int),
+            "probability": np.round(rng.random(1000), 2),
+            "amount": rng.exponential(100, 1000),
+        }
+    )
+    mg_values = MetricsGenerator(df, value_columns=["amount"], imbalance_multiplier=2)
+    mg_weight = MetricsGenerator(df, weight_column="amount", imbalance_multiplier=2)
+
+    curves = mg_values.metrics.curves
+    expected = mg_weight.metrics.curves
+    for cell in ["tp", "fp", "fn", "tn"]:
+        np.testing.assert_allclose(curves[f"{cell}_amount"], expected[f"{cell}_w"])
+
+    mg_values.compute_cost(fn_col="fn_amount", fp_cost_multiplier=5)
+    np.testing.assert_allclose(curves["cost"], curves["fn_amount"] + 5 * curves["fp"])
+
+
+def test_reparameterize_without_recomputation() -> None:
+    rng = np.random.default_rng(123)
+    df = pd.DataFrame(
+        {
+            "label": (rng.random(1000) < 0.3).astype(int),
+            "probability": np.round(rng.random(1000), 2),
+            "weight": rng.random(1000),
+        }
+    )
+    kwargs = dict(weight_column="weight", num_bootstrap_samples=2, seed=123)
+    metrics = MetricsGenerator(df, **kwargs).metrics  # type: ignore
+    expected = MetricsGenerator(
+        df, imbalance_multiplier=5, reverse_thresh=True, **kwargs  # type: ignore
+    ).metrics
+
+    result = metrics.with_imbalance(5).with_reversed_thresh()
+    for actual, target in [
+        (result.curves, expected.curves),
+        (result.scalars, expected.scalars),
+    ]:
+        pd.testing.assert_frame_equal(
+            actual.reset_index(drop=True),
+            target.reset_index(drop=True),
+            check_dtype=False,
+        )
+
+    sweep = metrics.sweep_imbalance([1, 5])
+    assert len(sweep) == 2 * len(metrics.scalars)
+    np.testing.assert_allclose(
+        sweep.loc[sweep["imbalance_multiplier"] == 5, "pr_auc"],
+        metrics.with_imbalance(5).scalars["pr_auc"],
+    )
+
+
+def test_adaptive_bootstrap_stops_early() -> None:
+    rng = np.random.default_rng(123)
+    scores = np.round(rng.random(1000), 2)
+    df = pd.DataFrame(
+        {"label": (rng.random(1000) < scores).astype(int), "probability": scores}
+    )
+    kwargs = dict(num_bootstrap_samples=180, bootstrap_batch_size=60, seed=123)
+    mg = MetricsGenerator(df, bootstrap_tol=1.0, **kwargs)  # type: ignore
+    assert mg.num_bootstrap_samples_used == 120
+    assert mg.metrics.scalars["_bootstrap_sample"].nunique() == 120
+
+    # The samples drawn match those of a non-adaptive run with the same seed
+    expected = MetricsGenerator(df, **kwargs).metrics.scalars  # type: ignore
+    pd.testing.assert_frame_equal(
+        mg.metrics.scalars.reset_index(drop=True),
+        expected.iloc[:121].reset_index(drop=True),
+    )
+
+    mg = MetricsGenerator(df, bootstrap_tol=0.0, **kwargs)  # type: ignore
+    assert mg.num_bootstrap_samples_used == 180
+
+
+def test_poisson_bootstrap_counts_match_repeated_rows() -> None:
+    rng = np.random.default_rng(123)
+    scores = np.round(rng.random(300), 2)
+    labels = (rng.random(300) < scores).astype(int)
+    weights = rng.random(300)
+    counts = rng.poisson(1, size=300)
+
+    mg = MetricsGenerator()
+    weighted = mg._compute_metrics(scores, labels, weights, counts=counts)
+    repeated = mg._compute_metrics(
+        np.repeat(scores, counts),
+        np.repeat(labels, counts),
+        np.repeat(weights, counts),
+    )
+    pd.testing.assert_frame_equal(weighted.curves, repeated.curves)
+    assert (weighted.curves["num"] == 0).sum() == 1
+
+    df = pd.DataFrame({"label": labels, "probability": scores})
+    for method in ["poisson", "bayesian"]:
+        mg = MetricsGenerator(
+            df, num_bootstrap_samples=5, bootstrap_method=method, seed=123  # type: ignore
+        )
+        scalars = mg.metrics.scalars
+        assert scalars["_bootstrap_sample"].nunique() == 5
+        assert scalars["roc_auc"].nunique() == 6
+
+
+def test_stratified_and_cluster_bootstrap() -> None:
+    rng = np.random.default_rng(123)
+    customer = np.repeat(np.arange(50), 4)
+    df = pd.DataFrame(
+        {
+            "label": np.repeat(rng.integers(0, 2, 50), 4),
+            "probability": rng.random(200),
+            "customer": customer,
+        }
+    )
+    num_pos = df["label"].sum()
+    for method in ["resample", "bayesian"]:
+        mg = MetricsGenerator(
+            df,
+            num_bootstrap_samples=5,
+            bootstrap_method=method,  # type: ignore
+            bootstrap_strata="label",
+            seed=123,
+        )
+        scalars = mg.metrics.scalars
+        np.testing.assert_allclose(scalars["num_examples_pos"], num_pos)
+        np.testing.assert_allclose(scalars["num_examples"], 200)
+
+    # Whole customers are resampled, within each class
+    mg = MetricsGenerator(
+        df,
+        num_bootstrap_samples=5,
+        bootstrap_strata="label",
+        bootstrap_cluster="customer",
+        seed=123,
+    )
+    scalars = mg.metrics.scalars
+    assert (scalars["num_examples_pos"] == num_pos).all()
+    assert (scalars["num_examples"] == 200).all()
+    assert scalars["roc_auc"].nunique() == 6
+    curves = mg.metrics.curves.loc[lambda x: x["_bootstrap_sample"] == 0]
+    counts = df["probability"].map(curves.set_index("thresh")["num"]).fillna(0)
+    assert (counts.groupby(customer).nunique() == 1).all()
+
+    # Customers with mixed labels would let the class counts vary
+    df.loc[0, "label"] = 1 - df.loc[0, "label"]
+    with pytest.raises(ValueError, match="span multiple strata"):
+        MetricsGenerator(
+            df,
+            num_bootstrap_samples=5,
+            bootstrap_strata="label",
+            bootstrap_cluster="customer",
+            seed=123,
+        )
+
+
+def test_multiple_imputation_shares_default_metrics() -> None:
+    rng = np.random.default_rng(123)
+    scores = np.round(rng.random(500), 2)
+    labels = (rng.random(500) < scores).astype(float)
+    labels[rng.random(500) < 0.2] = np.nan
+    df = pd.DataFrame({"label": labels, "probability": scores})
+
+    # Filling with a constant matches computing metrics on filled labels
+    mg = MetricsGenerator(df, null_fill_method="1", seed=123)
+    expected = mg._compute_metrics(scores, np.nan_to_num(labels, nan=1))
+    scalars = mg.metrics.scalars_imputed
+    assert scalars is not None
+    pd.testing.assert_frame_equal(
+        scalars.drop(
+            columns=["_imputation", "_bootstrap_sample", "_null_fill_method"]
+        ).reset_index(drop=True),
+        expected.scalars,
+    )
+
+    mg = MetricsGenerator(
+        df,
+        null_fill_method="imb",
+        num_imputations=10,
+        num_bootstrap_samples=2,
+        seed=123,
+    )
+    default = MetricsGenerator(df, num_bootstrap_samples=2, seed=123).metrics
+    pd.testing.assert_frame_equal(mg.metrics.get_curve(None), default.get_curve(None))
+
+    # Imputations differ, and are indexed per bootstrap sample
+    scalars = mg.metrics.scalars_imputed
+    assert scalars is not None
+    assert len(scalars) == 30
+    assert scalars.loc[scalars["_bootstrap_sample"].isnull(), "roc_auc"].nunique() > 1
+    curve = mg.metrics.get_curve(1, imputed=True, imputation=9)
+    assert (curve["_bootstrap_sample"] == 1).all()
+    assert (curve["_imputation"] == 9).all()
+    assert mg.get_optimal_thresholds(1, imputed=True).shape[0] == 30
+
+
+@pytest.mark.parametrize("bootstrap_method", ["resample", "poisson"])
+def test_imputation_keeps_default_bootstrap(bootstrap_method: str) -> None:
+    rng = np.random.default_rng(7)
+    scores = np.round(rng.random(400), 2)
+    labels = (rng.random(400) < scores).astype(float)
+    labels[rng.random(400) < 0.3] = np.nan
+    df = pd.DataFrame({"label": labels, "probability": scores})
+
+    # Bootstrap default metrics don't depend on whether nulls are imputed
+    scalars = [
+        MetricsGenerator(
+            df,
+            null_fill_method=null_fill_method,  # type: ignore
+            num_bootstrap_samples=3,
+            bootstrap_method=bootstrap_method,  # type: ignore
+            seed=7,
+        ).metrics.scalars
+        for null_fill_method in [None, "imb"]
+    ]
+    pd.testing.assert_frame_equal(
+        scalars[1].drop(columns="_null_fill_method"),
+        scalars[0].drop(columns="_null_fill_method"),
+    )
+
+
+def test_prob_imputation_uses_null_prob_column() -> None:
+    rng = np.random.default_rng(123)
+    scores = np.round(rng.random(500), 2)
+    labels = (rng.random(500) < scores).astype(float)
+    labels[rng.random(500) < 0.2] = np.nan
+    df = pd.DataFrame({"label": labels, "probability": scores, "cal": 1.0})
+
+    # Certain probabilities reproduce a constant fill
+    kwargs = dict(num_bootstrap_samples=3, seed=123)
+    mg = MetricsGenerator(
+        df, null_fill_method="prob", null_prob_column="cal", **kwargs  # type: ignore
+    )
+    expected = MetricsGenerator(df, null_fill_method="1", **kwargs)  # type: ignore
+    pd.testing.assert_frame_equal(
+        mg.metrics.scalars_imputed.drop(columns="_null_fill_method"),  # type: ignore
+        expected.metrics.scalars_imputed.drop(  # type: ignore
+            columns="_null_fill_method"
+        ),
+    )
+
+    df["cal"] = np.nan
+    with pytest.raises(ValueError):
+        MetricsGenerator(df, null_fill_method="prob", null_prob_column="cal")
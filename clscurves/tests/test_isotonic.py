@@ -0,0 +1,30 @@
+import numpy as np
+import pandas as pd
+
+from .. import MetricsGenerator
+from ..isotonic import IsotonicCalibration, pool_adjacent_violators
+
+
+def test_pool_adjacent_violators() -> None:
+    starts, values = pool_adjacent_violators(np.array([0.0, 1, 0, 1, 1]), np.ones(5))
+    np.testing.assert_array_equal(starts, [0, 1, 3])
+    np.testing.assert_allclose(values, [0, 0.5, 1])
+
+
+def test_isotonic_calibration_from_curve_matches_fit() -> None:
+    rng = np.random.default_rng(123)
+    scores = np.round(rng.random(2000), 2)
+    labels = (rng.random(2000) < scores**2).astype(int)
+    df = pd.DataFrame({"label": labels, "probability": scores})
+    mg = MetricsGenerator(df, num_bootstrap_samples=0, seed=123)
+
+    iso = mg.fit_isotonic_calibration()
+    expected = IsotonicCalibration.fit(scores, labels)
+    np.testing.assert_allclose(iso.thresholds, expected.thresholds)
+    np.testing.assert_allclose(iso.values, expected.values)
+
+    # Calibrated scores are monotone and preserve the proportion positive
+    calibrated = iso.predict(scores)
+    order = np.argsort(scores, kind="stable")
+    assert (np.diff(calibrated[order]) >= 0).all()
+    np.testing.assert_allclose(calibrated.mean(), labels.mean())
@@ -0,0 +1,41 @@
+import numpy as np
+import pandas as pd
+
+from .. import MetricsGenerator
+from ..multilabel import MultilabelMetricsGenerator
+
+
+def test_multilabel_matches_single_label() -> None:
+    rng = np.random.default_rng(123)
+    scores = np.round(rng.random((500, 5)), 2)
+    labels = (rng.random((500, 5)) < scores).astype(int)
+
+    mlg = MultilabelMetricsGenerator(scores, labels, chunk_size=2, num_workers=1)
+
+    for i in range(5):
+        mg = MetricsGenerator(
+            pd.DataFrame({"label": labels[:, i], "probability": scores[:, i]})
+        )
+        expected = mg.metrics.curves.drop(
+            columns=["_bootstrap_sample", "_null_fill_method"]
+        )
+        actual = mlg.get_label_metrics(i).curves.drop(columns=["_label"])
+        pd.testing.assert_frame_equal(
+            expected.reset_index(drop=True),
+            actual,
+            check_dtype=False,
+        )
+
+    assert set(mlg.averages.index) == {"micro", "macro"}
+    assert np.isclose(
+        mlg.averages.loc["macro", "roc_auc"],
+        mlg.metrics.scalars["roc_auc"].mean(),
+    )
+
+
+def test_multiclass_labels_are_one_hot_encoded() -> None:
+    scores = np.array([[0.9, 0.1], [0.2, 0.8], [0.6, 0.4]])
+    mlg = MultilabelMetricsGenerator(scores, np.array([0, 1, 1]), num_workers=1)
+    scalars = mlg.metrics.scalars.set_index("_label")
+    assert scalars.loc[0, "num_examples_pos"] == 1
+    assert scalars.loc[1, "num_examples_pos"] == 2
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+from ..plotter import prob_calibration
+
+
+def test_accumulator_matches_assess_prob_calibration() -> None:
+    rng = np.random.default_rng(123)
+    scores = np.round(rng.random(5000), 3)
+    df = pd.DataFrame(
+        {"label": (rng.random(5000) < scores).astype(int), "prob": scores}
+    )
+    original = df.copy()
+
+    expected = prob_calibration.assess_prob_calibration(df)
+    pd.testing.assert_frame_equal(df, original)
+
+    acc = prob_calibration.ProbCalibrationAccumulator()
+    for chunk in np.array_split(np.arange(len(df)), 7):
+        acc.update(df.iloc[chunk])
+    pd.testing.assert_frame_equal(
+        acc.get_calibration().reset_index(drop=True),
+        expected.reset_index(drop=True),
+        check_dtype=False,
+    )
+
+    # Accumulators of separate partitions can be merged
+    merged = prob_calibration.ProbCalibrationAccumulator().update(df.iloc[:1000])
+    merged.merge(prob_calibration.ProbCalibrationAccumulator().update(df.iloc[1000:]))
+    pd.testing.assert_frame_equal(merged.get_summary(), acc.get_summary())
+
+    summary = prob_calibration.compute_calibration_errors(expected)
+    assert list(summary.index) == ["score", "quantile"]
+    assert (summary["ece"] <= summary["mce"]).all()
+
+
+def test_bootstrap_calibration_errors() -> None:
+    rng = np.random.default_rng(123)
+    scores = rng.random(5000)
+    df = pd.DataFrame(
+        {"label": (rng.random(5000) < scores**2).astype(int), "prob": scores}
+    )
+    calibration = prob_calibration.assess_prob_calibration(df)
+    errors = prob_calibration.bootstrap_calibration_errors(calibration, seed=123)
+
+    assert (errors["lower"] <= errors["estimate"]).all()
+    assert (errors["estimate"] <= errors["upper"]).all()
+    np.testing.assert_allclose(
+        errors.xs("ece", level="metric")["estimate"],
+        prob_calibration.compute_calibration_errors(calibration)["ece"],
+    )
+
+
+def test_prediction_histogram_chunks() -> None:
+    rng = np.random.default_rng(123)
+    actual = rng.gamma(2, 3, 5000)
+    df = pd.DataFrame(
+        {"label": actual, "pred": actual * np.exp(rng.normal(0, 0.3, 5000))}
+    )
+    hist = prob_calibration.PredictionHistogram(
+        rng=(0.1, 100), num_bins=50, log_scale=True
+    )
+    hist.update(df.iloc[:2000]).merge(
+        prob_calibration.PredictionHistogram(
+            rng=(0.1, 100), num_bins=50, log_scale=True
+        ).update(df.iloc[2000:])
+    )
+
+    expected, _, _ = np.histogram2d(
+        df["pred"], df["label"], bins=[hist.edges, hist.edges]
+    )
+    np.testing.assert_allclose(hist.counts, expected)
+    summary = hist.get_summary()
+    np.testing.assert_allclose(
+        summary["rmse"], np.sqrt(((df["label"] - df["pred"]) ** 2).mean())
+    )
+    np.testing.assert_allclose(summary["qi"], df["pred"].sum() / df["label"].sum())
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+import pytest
+from typing_extensions import Literal
+
+from .. import MetricsGenerator, query
+
+
+@pytest.mark.parametrize("side", ["left", "right"])
+def test_batched_searchsorted_matches_numpy(side: Literal["left", "right"]) -> None:
+    a = np.array([0, 1, 1, 3, 2, 2, 5, 7])
+    lo = np.array([0, 0, 4, 4])
+    hi = np.array([4, 4, 8, 8])
+    v = np.array([1, 2, 2, 6])
+    expected = [
+        lo[i] + np.searchsorted(a[lo[i] : hi[i]], v[i], side=side)
+        for i in range(len(v))
+    ]
+    np.testing.assert_array_equal(
+        query.batched_searchsorted(a, lo, hi, v, side=side), expected
+    )
+
+
+def test_query_operating_points() -> None:
+    rng = np.random.default_rng(123)
+    scores = np.round(rng.random(1000), 2)
+    labels = (rng.random(1000) < scores).astype(int)
+    mg = MetricsGenerator(
+        pd.DataFrame({"label": labels, "probability": scores}),
+        num_bootstrap_samples=5,
+        seed=123,
+    )
+
+    result = mg.query_operating_points("recall", [0.5, 0.9], columns=["recall"])
+    assert (result["estimate"] >= result["value"]).all()
+    assert (result["lower"] <= result["upper"]).all()
+
+    # The operating point is the smallest recall still above the target
+    main = mg.metrics.curves.loc[lambda x: x["_bootstrap_sample"].isnull()]
+    expected = main.loc[main["recall"] >= 0.9, "recall"].min()
+    assert result.loc[result["value"] == 0.9, "estimate"].iloc[0] == expected
+
+    with pytest.raises(ValueError):
+        query.OperatingPointQuery(mg.metrics.curves).find_rows("precision", 0.5)
+
+
+def test_interpolate_curves_matches_numpy() -> None:
+    # Two decreasing curves, the second with repeated x values
+    x = np.array([1.0, 0.5, 0.0, 1.0, 1.0, 0.6, 0.6, 0.2])
+    y = np.array([3.0, 1.0, 0.0, 2.0, 1.8, 1.5, 1.0, 0.0])
+    offsets = np.array([0, 3, 8])
+    grid = np.array([0.0, 0.1, 0.3, 0.6, 0.8, 1.0])
+
+    result = query.interpolate_curves(x, y, offsets, grid)
+    np.testing.assert_allclose(result[0], np.interp(grid, x[2::-1], y[2::-1]))
+    np.testing.assert_allclose(
+        result[1], [np.nan, np.nan, 0.25, 1.0, 1.65, 1.8], equal_nan=True
+    )
@@ -1,6 +1,7 @@
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
 
@@ -25,3 +26,317 @@ class MetricsResult:
     scalars: pd.DataFrame
     curves_imputed: Optional[pd.DataFrame] = None
     scalars_imputed: Optional[pd.DataFrame] = None
+    _indexes: Dict[bool, Tuple[pd.DataFrame, "CurveIndex"]] = field(
+        default_factory=dict,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+
+    def __post_init__(self) -> None:
+        """Index each bootstrap sample's curve, making its rows contiguous."""
+        for imputed in [False, True]:
+            curves = self.curves_imputed if imputed else self.curves
+            if curves is None or "_bootstrap_sample" not in curves.columns:
+                continue
+            columns = get_curve_key_columns(curves)
+            try:
+                index = CurveIndex(curves, column=columns)
+            except ValueError:
+                curves = curves.sort_values(columns, na_position="first", kind="stable")
+                index = CurveIndex(curves, column=columns)
+            if imputed:
+                self.curves_imputed = curves
+            else:
+                self.curves = curves
+            self._indexes[imputed] = (curves, index)
+
+    def get_index(self, imputed: bool = False) -> "CurveIndex":
+        """Get the (cached) row offsets of each bootstrap sample's curve.
+
+        Parameters
+        ----------
+        imputed : bool
+            Whether to index the imputed curves.
+        """
+        curves = self.curves_imputed if imputed else self.curves
+        if curves is None:
+            raise ValueError("No imputed curves are available.")
+        cached = self._indexes.get(imputed)
+        if cached is None or cached[0] is not curves:
+            cached = (curves, CurveIndex(curves, column=get_curve_key_columns(curves)))
+            self._indexes[imputed] = cached
+        return cached[1]
+
+    def get_curve(
+        self,
+        bootstrap_sample: Optional[int] = None,
+        imputed: bool = False,
+        imputation: int = 0,
+    ) -> pd.DataFrame:
+        """Get the curve of a single bootstrap sample by slicing.
+
+        Parameters
+        ----------
+        bootstrap_sample : Optional[int]
+            Bootstrap sample number, or `None` for the main curve.
+        imputed : bool
+            Whether to get an imputed curve.
+        imputation : int
+            Imputation number, if the imputed curves hold several
+            imputations of each bootstrap sample.
+        """
+        index = self.get_index(imputed)
+        curves, _ = self._indexes[imputed]
+        key = (
+            bootstrap_sample
+            if len(index.columns) == 1
+            else (bootstrap_sample, imputation)
+        )
+        return curves.iloc[index.get_slice(key)]
+
+    def decimate(
+        self,
+        max_points: int,
+        columns: Optional[List[str]] = None,
+    ) -> "MetricsResult":
+        """Get a copy with every curve reduced to at most ``max_points`` rows.
+
+        Rows are kept at uniform arc length along each curve (see
+        ``clscurves.decimation.decimate_curves``), always including the
+        endpoints and ROC convex hull vertices of every curve. This is useful
+        for shrinking curves with millions of unique thresholds before they
+        are plotted or saved.
+
+        Parameters
+        ----------
+        max_points : int
+            Maximum number of rows to keep per curve, not counting ROC convex
+            hull vertices.
+        columns : Optional[List[str]]
+            Columns to measure arc length over. Defaults to "fpr", "recall",
+            "precision", and "frac".
+
+        Returns
+        -------
+        MetricsResult
+            Decimated curves, with the scalars unchanged.
+        """
+
+        # Imported here since the decimation module depends on this one
+        from clscurves.decimation import decimate_curves
+
+        def decimate(curves: pd.DataFrame, imputed: bool) -> pd.DataFrame:
+            if "_bootstrap_sample" in curves.columns:
+                offsets = self.get_index(imputed).offsets
+            else:
+                offsets = np.array([0, len(curves)])
+            rows = decimate_curves(curves, offsets, max_points, columns)
+            return curves.iloc[rows].reset_index(drop=True)
+
+        return MetricsResult(
+            curves=decimate(self.curves, imputed=False),
+            scalars=self.scalars,
+            curves_imputed=(
+                None
+                if self.curves_imputed is None
+                else decimate(self.curves_imputed, imputed=True)
+            ),
+            scalars_imputed=self.scalars_imputed,
+        )
+
+    def with_imbalance(self, imbalance_multiplier: float) -> "MetricsResult":
+        """Get a copy with metrics recomputed for a new imbalance multiplier.
+
+        All rates, AUCs, and other derived metrics are recomputed from the
+        per-threshold counts stored in the curves (see
+        ``clscurves.confusion.recompute_confusion_curves``), so no examples
+        are regrouped or resampled.
+
+        Parameters
+        ----------
+        imbalance_multiplier : float
+            Positive value to artifically increase the positive class example
+            count by; this replaces (rather than compounds) the multiplier
+            the metrics were computed with.
+        """
+        return self._recompute(imbalance_multiplier=imbalance_multiplier)
+
+    def with_reversed_thresh(self) -> "MetricsResult":
+        """Get a copy with the threshold direction of every curve reversed.
+
+        Examples which were predicted positive above a threshold are instead
+        predicted positive below it (or vice versa), keeping the current
+        imbalance multiplier.
+        """
+        multiplier = self.scalars["imbalance_multiplier"].iloc[0]
+        return self._recompute(imbalance_multiplier=multiplier, reverse_thresh=True)
+
+    def sweep_imbalance(
+        self,
+        imbalance_multipliers: Union[Sequence[float], np.ndarray],
+        imputed: bool = False,
+    ) -> pd.DataFrame:
+        """Compute scalar metrics for many imbalance multipliers at once.
+
+        The curves are tiled once per multiplier and every derived metric is
+        recomputed for all of them in a single vectorized pass.
+
+        Parameters
+        ----------
+        imbalance_multipliers : Union[Sequence[float], np.ndarray]
+            Imbalance multipliers to compute metrics for.
+        imputed : bool
+            Whether to use the imputed curves.
+
+        Returns
+        -------
+        pd.DataFrame
+            Scalars for every (multiplier, curve) pair, with the multiplier
+            in the "imbalance_multiplier" column.
+        """
+        from clscurves.confusion import recompute_confusion_curves
+
+        curves = self.curves_imputed if imputed else self.curves
+        if curves is None:
+            raise ValueError("No imputed curves are available.")
+        multipliers = np.asarray(imbalance_multipliers, dtype=float)
+        num_curves = (curves["num"] == 0).sum()
+        tiled = pd.concat([curves] * len(multipliers), ignore_index=True)
+        metrics = recompute_confusion_curves(
+            tiled, imbalance_multiplier=np.repeat(multipliers, num_curves)
+        )
+        return metrics.scalars
+
+    def _recompute(
+        self,
+        imbalance_multiplier: float,
+        reverse_thresh: bool = False,
+    ) -> "MetricsResult":
+        """Recompute default and imputed metrics from stored counts."""
+        # Imported here since the confusion module depends on this one
+        from clscurves.confusion import recompute_confusion_curves
+
+        default = recompute_confusion_curves(
+            self.curves, imbalance_multiplier, reverse_thresh
+        )
+        imputed = None
+        if self.curves_imputed is not None:
+            imputed = recompute_confusion_curves(
+                self.curves_imputed, imbalance_multiplier, reverse_thresh
+            )
+        return MetricsResult(
+            curves=default.curves,
+            scalars=default.scalars,
+            curves_imputed=None if imputed is None else imputed.curves,
+            scalars_imputed=None if imputed is None else imputed.scalars,
+        )
+
+
+class CurveIndex:
+    """Row offsets of each curve within a DataFrame of concatenated curves.
+
+    Curves DataFrames hold one curve per bootstrap sample (plus the main,
+    non-bootstrapped curve), stacked on top of each other. This class records
+    where each curve starts and ends so that any one curve can be selected by
+    slicing rather than by scanning the whole DataFrame.
+
+    Parameters
+    ----------
+    curves : pd.DataFrame
+        DataFrame of concatenated curves, with the rows of each curve
+        contiguous.
+    column : Union[str, List[str]]
+        Column identifying which curve each row belongs to. Null values
+        identify the main curve. If a list of columns is given (e.g. a
+        bootstrap sample column and an imputation column), curves are keyed
+        by tuples of their values, and the main curve is the first curve with
+        a null value in the first column.
+    """
+
+    def __init__(
+        self,
+        curves: pd.DataFrame,
+        column: Union[str, List[str]] = "_bootstrap_sample",
+    ) -> None:
+        self.column = column
+        self.columns = [column] if isinstance(column, str) else list(column)
+        values = [
+            curves[col].to_numpy() if len(curves) else np.array([])
+            for col in self.columns
+        ]
+        changed = np.zeros(len(curves), dtype=bool)
+        changed[:1] = True
+        for keys in values:
+            is_null = pd.isnull(keys)
+            changed[1:] |= (keys[1:] != keys[:-1]) & ~(is_null[1:] & is_null[:-1])
+        starts = np.flatnonzero(changed)
+
+        if isinstance(column, str):
+            self.keys = values[0][starts]
+        else:
+            self.keys = np.empty(len(starts), dtype=object)
+            self.keys[:] = list(zip(*[keys[starts] for keys in values]))
+        self.offsets = np.append(starts, len(curves))
+        self._positions = {self._normalize(key): i for i, key in enumerate(self.keys)}
+        if len(self._positions) != len(starts):
+            raise ValueError(f"Curves must be contiguous in the '{column}' column.")
+
+        # The main curve is the first curve with a null (first) key
+        first_keys = values[0][starts]
+        main = np.flatnonzero(pd.isnull(first_keys))[:1]
+        self.is_main = np.zeros(len(starts), dtype=bool)
+        self.is_main[main] = True
+        self._main_key = self._normalize(self.keys[main[0]]) if len(main) else None
+
+    @staticmethod
+    def _normalize(key):
+        """Replace null key values with `None`, so that they compare equal."""
+        if isinstance(key, tuple):
+            return tuple(None if pd.isnull(k) else k for k in key)
+        return None if pd.isnull(key) else key
+
+    @property
+    def num_curves(self) -> int:
+        return len(self.keys)
+
+    @property
+    def lengths(self) -> np.ndarray:
+        return np.diff(self.offsets)
+
+    def get_key_frame(self) -> pd.DataFrame:
+        """Get a DataFrame of the key column values of each curve."""
+        if isinstance(self.column, str):
+            return pd.DataFrame({self.column: self.keys})
+        return pd.DataFrame(list(self.keys), columns=self.columns)
+
+    def get_position(self, key) -> int:
+        """Get the position of the curve with a given key (`None` for main)."""
+        key = self._main_key if key is None else self._normalize(key)
+        if key not in self._positions:
+            raise KeyError(f"No curve with {self.column} = {key}.")
+        return self._positions[key]
+
+    def get_positions(self, df: pd.DataFrame) -> np.ndarray:
+        """Get the position of the curve matching the keys of each row of
+        a DataFrame (e.g. metrics.scalars) holding the key columns."""
+        keys = df[self.columns].itertuples(index=False, name=None)
+        if isinstance(self.column, str):
+            keys = (key[0] for key in keys)
+        return np.array([self._positions[self._normalize(key)] for key in keys])
+
+    def get_slice(self, key=None) -> slice:
+        """Get the rows of the curve with a given key (`None` for main)."""
+        i = self.get_position(key)
+        return slice(self.offsets[i], self.offsets[i + 1])
+
+
+def get_curve_key_columns(curves: pd.DataFrame) -> Union[str, List[str]]:
+    """Get the columns identifying each curve of a curves DataFrame.
+
+    Curves are keyed by bootstrap sample, and also by imputation number if
+    there is an "_imputation" column.
+    """
+    if "_imputation" in curves.columns:
+        return ["_bootstrap_sample", "_imputation"]
+    return "_bootstrap_sample"